@@ -0,0 +1,159 @@
+import time
+import threading
+from collections import deque
+from urllib.parse import urlparse
+
+THROUGHPUT_WINDOW = 3.0  # Seconds of transfer history behind the reported throughput
+_MAX_SLEEP = 0.2  # Longest single wait, so rate changes and cancellation apply quickly
+
+# Hosts that are the same service as far as limits are concerned
+HOST_ALIASES = {"youtu.be": "youtube.com"}
+# Second-level labels under which country domains register sites (bbc.co.uk,
+# abc.net.au, nhk.or.jp), so those sites keep a third label
+SECOND_LEVEL_LABELS = {"ac", "co", "com", "edu", "gov", "go", "ne", "net", "or", "org"}
+
+
+def host_key(url):
+    """
+    Returns the site a URL counts against: its registered domain, e.g. youtube.com
+    or bbc.co.uk.
+    """
+    host = (urlparse(url).hostname or "").lower()
+    if not host.replace(".", "").isdigit():  # IP addresses are kept whole
+        labels = host.split(".")
+        keep = 2
+        # A two-letter country code under a known second level, e.g. co.uk
+        if len(labels) > 2 and len(labels[-1]) == 2 and labels[-2] in SECOND_LEVEL_LABELS:
+            keep = 3
+        host = ".".join(labels[-keep:])
+    return HOST_ALIASES.get(host, host)
+
+
+class BandwidthGovernor:
+    """
+    Shared token bucket capping the combined transfer rate of every active download,
+    plus a limit on simultaneous downloads per site. Download threads report the
+    bytes they receive through consume(), which blocks while the bucket is in debt;
+    both limits can be changed at any time and apply immediately. A rate or host
+    limit of 0 means unlimited. Listeners are called with the new rate whenever
+    it is set.
+    """
+
+    def __init__(self, rate=0, per_host=0):
+        self.condition = threading.Condition()
+        self.rate = 0
+        self.tokens = 0.0
+        self.last_refill = time.monotonic()
+        self.per_host = max(0, int(per_host))
+        self.active_hosts = {}  # Host -> number of downloads holding a slot
+        self.total_bytes = 0
+        self.samples = deque()  # (time, bytes) of recent transfers
+        self.listeners = []
+        self.set_rate(rate)
+
+    def set_rate(self, rate):
+        """Sets the combined limit in bytes per second (0 for unlimited)."""
+        with self.condition:
+            self.rate = max(0, int(rate))
+            # One second of burst; any debt from a lower rate is forgiven
+            self.tokens = float(self.rate)
+            self.last_refill = time.monotonic()
+        for listener in list(self.listeners):
+            listener(self.rate)
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def set_host_limit(self, per_host):
+        """Sets the number of simultaneous downloads allowed per site (0 for unlimited)."""
+        with self.condition:
+            self.per_host = max(0, int(per_host))
+            self.condition.notify_all()
+
+    def _prune(self, horizon):
+        while self.samples and self.samples[0][0] < horizon:
+            self.samples.popleft()
+
+    def _refill(self, now):
+        if self.rate:
+            self.tokens = min(self.tokens + (now - self.last_refill) * self.rate, self.rate)
+        self.last_refill = now
+
+    def _count(self, now, nbytes):
+        self.total_bytes += nbytes
+        self.samples.append((now, nbytes))
+        self._prune(now - THROUGHPUT_WINDOW)
+
+    def record(self, nbytes):
+        """Counts nbytes received elsewhere (e.g. in a worker process) without throttling."""
+        if nbytes > 0:
+            with self.condition:
+                self._count(time.monotonic(), nbytes)
+
+    def consume(self, nbytes, is_cancelled=None):
+        """
+        Accounts for nbytes just received and waits until the bucket allows more.
+        Returns early (False) if is_cancelled becomes true while waiting.
+        """
+        if nbytes <= 0:
+            return True
+        with self.condition:
+            now = time.monotonic()
+            self._count(now, nbytes)
+            self._refill(now)
+            if self.rate:
+                self.tokens -= nbytes
+        while True:
+            with self.condition:
+                self._refill(time.monotonic())
+                if not self.rate or self.tokens >= 0:
+                    return True
+                wait = min(-self.tokens / self.rate, _MAX_SLEEP)
+            if is_cancelled is not None and is_cancelled():
+                return False
+            time.sleep(wait)
+
+    def acquire_host(self, url, is_cancelled=None):
+        """
+        Waits for a free download slot on url's site. Returns the host to pass to
+        release_host(), or None if is_cancelled became true first.
+        """
+        host = host_key(url)
+        with self.condition:
+            while self.per_host and self.active_hosts.get(host, 0) >= self.per_host:
+                if is_cancelled is not None and is_cancelled():
+                    return None
+                self.condition.wait(_MAX_SLEEP)
+            self.active_hosts[host] = self.active_hosts.get(host, 0) + 1
+        return host
+
+    def release_host(self, host):
+        with self.condition:
+            count = self.active_hosts.get(host, 0) - 1
+            if count > 0:
+                self.active_hosts[host] = count
+            else:
+                self.active_hosts.pop(host, None)
+            self.condition.notify_all()
+
+    def throughput(self):
+        """Returns the combined transfer rate of the last few seconds, in bytes per second."""
+        with self.condition:
+            self._prune(time.monotonic() - THROUGHPUT_WINDOW)
+            return sum(nbytes for _, nbytes in self.samples) / THROUGHPUT_WINDOW
+
+    def stats(self):
+        """Returns the limits, achieved throughput and per-site slot usage as a dict."""
+        throughput = self.throughput()
+        with self.condition:
+            return {
+                "rate_limit": self.rate,
+                "per_host": self.per_host,
+                "throughput": round(throughput),
+                "total_bytes": self.total_bytes,
+                "active_hosts": dict(self.active_hosts),
+            }
@@ -0,0 +1,104 @@
+"""
+Compares download performance profiles against a local media server.
+
+Downloads a fragmented HLS stream (or a progressive file) through the same
+engine.download_video() used by the GUI and CLI, once per profile, and reports
+wall time and throughput. Per-request latency and per-connection bandwidth are
+simulated by the server, so fragment concurrency can be compared offline.
+
+    python benchmarks/fragment_bench.py --segments 40 --segment-size 262144 --delay 50
+    python benchmarks/fragment_bench.py --kind progressive --size 20000000 --rate 4000000
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import statistics
+import tempfile
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from engine import DOWNLOAD_PROFILES, download_video  # noqa: E402
+from media_server import MediaServer  # noqa: E402
+
+
+def media_url(server, args):
+    limits = f"delay={args.delay}&rate={args.rate}"
+    if args.kind == "hls":
+        return (
+            f"{server.base_url}/hls/bench/index.m3u8?"
+            f"segments={args.segments}&size={args.segment_size}&{limits}"
+        )
+    return f"{server.base_url}/video/bench.mp4?size={args.size}&{limits}"
+
+
+def run_profile(url, profile_opts, total_bytes):
+    with tempfile.TemporaryDirectory() as output:
+        started = time.perf_counter()
+        download_video(
+            url,
+            "best",
+            output,
+            quiet=True,
+            archive=False,
+            # No ffmpeg fixups: only the transfer is measured
+            profile_opts=dict(profile_opts, fixup="never"),
+        )
+        elapsed = time.perf_counter() - started
+        on_disk = sum(
+            os.path.getsize(os.path.join(output, name)) for name in os.listdir(output)
+        )
+    if on_disk < total_bytes:
+        raise Exception(f"incomplete download: {on_disk} of {total_bytes} bytes")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--kind", choices=("hls", "progressive"), default="hls")
+    parser.add_argument("--segments", type=int, default=40)
+    parser.add_argument("--segment-size", type=int, default=256 * 1024)
+    parser.add_argument("--size", type=int, default=16 * 1024 * 1024)
+    parser.add_argument("--delay", type=int, default=50, help="Latency per request (ms)")
+    parser.add_argument("--rate", type=int, default=0, help="Bytes/s per connection")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument(
+        "--profile", action="append", help="Profile label to run (default: all)"
+    )
+    args = parser.parse_args()
+
+    total_bytes = (
+        args.segments * args.segment_size if args.kind == "hls" else args.size
+    )
+    results = []
+    with MediaServer() as server:
+        url = media_url(server, args)
+        for label, options in DOWNLOAD_PROFILES:
+            if args.profile and label not in args.profile:
+                continue
+            if "external_downloader" in options and not shutil.which("aria2c"):
+                results.append({"profile": label, "skipped": "aria2c not installed"})
+                continue
+            try:
+                times = [run_profile(url, options, total_bytes) for _ in range(args.runs)]
+            except Exception as e:
+                results.append({"profile": label, "error": str(e)})
+                continue
+            median = statistics.median(times)
+            results.append(
+                {
+                    "profile": label,
+                    "median_seconds": round(median, 3),
+                    "throughput_mb_s": round(total_bytes / median / 1024 / 1024, 2),
+                }
+            )
+    print(json.dumps({"kind": args.kind, "bytes": total_bytes, "results": results}, indent=2))
+    return 1 if any("error" in r for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Records a live HLS stand-in stream from the local media server with LiveRecorder.
+
+The server publishes one segment every --duration seconds and ends the stream
+after --segments. Each run records it once in full and once with a rolling
+--window, and checks that every segment arrived, that the windowed recording
+holds just the window, and that memory use stays bounded by the segment size.
+Reports the delay between the end of the stream and the finished file.
+
+    python benchmarks/live_bench.py --segments 40 --duration 0.5 --window 5
+    python benchmarks/live_bench.py --segments 20 --segment-size 2097152 --delay 100
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from live_capture import CHUNK_SIZE, LiveRecorder  # noqa: E402
+from media_server import MediaServer  # noqa: E402
+
+
+def record(server, args, name, window):
+    url = (
+        f"{server.base_url}/live/{name}/index.m3u8?segments={args.segments}"
+        f"&duration={args.duration}&size={args.segment_size}&delay={args.delay}"
+    )
+    with tempfile.TemporaryDirectory() as output:
+        recorder = LiveRecorder(url, os.path.join(output, f"{name}.ts"), window=window)
+        tracemalloc.start()
+        started = time.perf_counter()
+        path = recorder.record()
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        size = os.path.getsize(path) if path else 0
+        leftovers = sorted(set(os.listdir(output)) - {os.path.basename(path or "")})
+    return {
+        "segments": recorder.segments,
+        "missed": recorder.missed,
+        "bytes": size,
+        "seconds": round(elapsed, 3),
+        # The stream ends segments * duration after the first playlist request
+        "finish_lag_s": round(elapsed - args.segments * args.duration, 3),
+        "peak_memory": peak,
+        "leftovers": leftovers,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--segments", type=int, default=24)
+    parser.add_argument("--duration", type=float, default=0.25, help="Seconds per segment")
+    parser.add_argument("--segment-size", type=int, default=512 * 1024)
+    parser.add_argument("--window", type=float, default=2.0, help="Seconds kept")
+    parser.add_argument("--delay", type=int, default=0, help="Latency per request (ms)")
+    args = parser.parse_args()
+
+    failures = []
+    with MediaServer() as server:
+        full = record(server, args, "full", None)
+        windowed = record(server, args, "windowed", args.window)
+    expected = args.segments * args.segment_size
+    kept = min(int(round(args.window / args.duration)), args.segments)
+    for label, result, size in (
+        ("full", full, expected),
+        ("windowed", windowed, kept * args.segment_size),
+    ):
+        if result["missed"] or result["bytes"] != size:
+            failures.append(f"{label}: {result['bytes']} bytes instead of {size}")
+        if result["leftovers"]:
+            failures.append(f"{label}: files left behind: {result['leftovers']}")
+        # Segments are streamed in chunks, never held whole
+        if result["peak_memory"] > 4 * CHUNK_SIZE + 1024 * 1024:
+            failures.append(f"{label}: peak memory {result['peak_memory']} bytes")
+    print(
+        json.dumps(
+            {"full": full, "windowed": windowed, "failures": failures}, indent=2
+        )
+    )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,326 @@
+"""
+Local HTTP server serving synthetic media, so benchmarks run without the internet.
+
+Paths:
+    /video/<name>.mp4?size=<bytes>              progressive file (Range supported)
+    /hls/<name>/index.m3u8?segments=<n>&size=<bytes>&duration=<s>
+                                                HLS VOD playlist of n segments
+    /hls/<name>/seg<i>.ts?size=<bytes>          one HLS segment
+    /live/<name>/index.m3u8?segments=<n>&duration=<s>&window=<n>&size=<bytes>
+                                                live HLS playlist: a segment appears
+                                                every duration seconds from the first
+                                                request, the last window are listed,
+                                                and it ends after n segments
+    /live/<name>/seg<i>.ts?size=<bytes>         one live segment
+    /api/video/<id>.json?size=<bytes>&segments=<n>
+                                                metadata of a fake video with a
+                                                progressive, a DASH video+audio
+                                                and an HLS format (see bench_formats);
+                                                with live=1 a live stream instead
+    /api/playlist/<id>.json?count=<n>&page=<p>&page_size=<n>&newest=1
+                                                one page of a fake playlist; with
+                                                newest=1 its highest-numbered
+                                                entries come first, like a channel
+
+Every path also accepts delay=<ms> (added latency per request) and rate=<bytes/s>
+(per-connection bandwidth cap), so fragment concurrency has something to hide.
+The /api paths are what the fake yt-dlp extractor in yt_dlp_plugins/ reads.
+"""
+
+import re
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, urlencode
+
+DEFAULT_VIDEO_SIZE = 1024 * 1024
+DEFAULT_SEGMENTS = 20
+DEFAULT_SEGMENT_SIZE = 256 * 1024
+DEFAULT_SEGMENT_DURATION = 4
+DEFAULT_PLAYLIST_SIZE = 100
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_LIVE_WINDOW = 6  # Segments listed in a live playlist
+CHUNK = 64 * 1024
+
+
+def synthetic_bytes(offset, length):
+    """Deterministic filler content, so repeated or resumed downloads are identical."""
+    pattern = bytes(range(256)) * (CHUNK // 256)
+    out = bytearray()
+    position = offset
+    while len(out) < length:
+        start = position % len(pattern)
+        piece = pattern[start : start + (length - len(out))]
+        out += piece
+        position += len(piece)
+    return bytes(out)
+
+
+class MediaRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    live_started = {}  # Live stream name -> time of its first playlist request
+    live_lock = threading.Lock()
+    # Playlist id -> entry count used instead of count=, so a benchmark can publish
+    # new uploads to a playlist whose URL stays the same
+    playlist_sizes = {}
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+    def do_HEAD(self):
+        self.handle_request(send_body=False)
+
+    def do_GET(self):
+        self.handle_request(send_body=True)
+
+    def handle_request(self, send_body):
+        parsed = urlparse(self.path)
+        self.query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        delay = float(self.query.get("delay", 0)) / 1000
+        if delay:
+            time.sleep(delay)
+        if parsed.path.startswith("/video/"):
+            size = int(self.query.get("size", DEFAULT_VIDEO_SIZE))
+            self.send_media(size, "video/mp4", send_body)
+        elif parsed.path.startswith("/hls/") and parsed.path.endswith(".m3u8"):
+            self.send_text(
+                self.hls_playlist(parsed.query), "application/vnd.apple.mpegurl", send_body
+            )
+        elif parsed.path.startswith("/live/") and parsed.path.endswith(".m3u8"):
+            name = parsed.path.split("/")[2]
+            self.send_text(
+                self.live_playlist(name, parsed.query),
+                "application/vnd.apple.mpegurl",
+                send_body,
+            )
+        elif parsed.path.startswith(("/hls/", "/live/")) and parsed.path.endswith(".ts"):
+            size = int(self.query.get("size", DEFAULT_SEGMENT_SIZE))
+            self.send_media(size, "video/mp2t", send_body)
+        elif parsed.path.startswith("/api/video/"):
+            video_id = parsed.path[len("/api/video/") :].rsplit(".", 1)[0]
+            self.send_json(self.video_info(video_id), send_body)
+        elif parsed.path.startswith("/api/playlist/"):
+            playlist_id = parsed.path[len("/api/playlist/") :].rsplit(".", 1)[0]
+            self.send_json(self.playlist_page(playlist_id), send_body)
+        else:
+            self.send_error(404)
+
+    def video_info(self, video_id):
+        """Metadata of a fake video whose formats point back at this server."""
+        base = f"http://{self.headers.get('Host')}"
+        size = int(self.query.get("size", DEFAULT_VIDEO_SIZE))
+        segments = int(self.query.get("segments", 8))
+        limits = {key: self.query[key] for key in ("delay", "rate") if key in self.query}
+        if self.query.get("live"):
+            live = {
+                key: self.query[key]
+                for key in ("segments", "duration", "window", "size")
+                if key in self.query
+            }
+            return {
+                "id": video_id,
+                "title": f"Bench live {video_id}",
+                "is_live": True,
+                "live_status": "is_live",
+                "formats": [
+                    {
+                        "format_id": "live-720",
+                        "url": f"{base}/live/{video_id}/index.m3u8?"
+                        + urlencode(dict(live, **limits)),
+                        "ext": "mp4",
+                        "protocol": "m3u8_native",
+                        "vcodec": "avc1.4d401f",
+                        "acodec": "mp4a.40.2",
+                        "width": 1280,
+                        "height": 720,
+                    }
+                ],
+            }
+        return {
+            "id": video_id,
+            "title": f"Bench video {video_id}",
+            "duration": segments * DEFAULT_SEGMENT_DURATION,
+            "formats": bench_formats(base, video_id, size, segments, limits),
+        }
+
+    def playlist_page(self, playlist_id):
+        count = self.playlist_sizes.get(
+            playlist_id, int(self.query.get("count", DEFAULT_PLAYLIST_SIZE))
+        )
+        page = int(self.query.get("page", 0))
+        page_size = int(self.query.get("page_size", DEFAULT_PAGE_SIZE))
+        first = page * page_size
+        numbers = range(first, min(first + page_size, count))
+        if self.query.get("newest") == "1":
+            numbers = [count - 1 - i for i in numbers]
+        return {
+            "id": playlist_id,
+            "title": f"Bench playlist {playlist_id}",
+            "entries": [
+                {"id": f"{playlist_id}-{i}", "title": f"Bench video {i}"} for i in numbers
+            ],
+            "next": first + page_size < count,
+        }
+
+    def send_json(self, data, send_body):
+        self.send_text(json.dumps(data), "application/json", send_body)
+
+    def hls_playlist(self, raw_query):
+        """Builds a VOD media playlist whose segments carry the same query parameters."""
+        segments = int(self.query.get("segments", DEFAULT_SEGMENTS))
+        duration = float(self.query.get("duration", DEFAULT_SEGMENT_DURATION))
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:3",
+            f"#EXT-X-TARGETDURATION:{int(duration + 0.999)}",
+            "#EXT-X-MEDIA-SEQUENCE:0",
+            "#EXT-X-PLAYLIST-TYPE:VOD",
+        ]
+        for i in range(segments):
+            lines.append(f"#EXTINF:{duration:.3f},")
+            lines.append(f"seg{i}.ts?{raw_query}")
+        lines.append("#EXT-X-ENDLIST")
+        return "\n".join(lines) + "\n"
+
+    def live_playlist(self, name, raw_query):
+        """Builds the current state of a live media playlist, ending after n segments."""
+        segments = int(self.query.get("segments", DEFAULT_SEGMENTS))
+        duration = float(self.query.get("duration", DEFAULT_SEGMENT_DURATION))
+        window = int(self.query.get("window", DEFAULT_LIVE_WINDOW))
+        with self.live_lock:
+            started = self.live_started.setdefault(name, time.monotonic())
+        available = min(int((time.monotonic() - started) / duration), segments)
+        first = max(available - window, 0)
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:3",
+            f"#EXT-X-TARGETDURATION:{int(duration + 0.999)}",
+            f"#EXT-X-MEDIA-SEQUENCE:{first}",
+        ]
+        for i in range(first, available):
+            lines.append(f"#EXTINF:{duration:.3f},")
+            lines.append(f"seg{i}.ts?{raw_query}")
+        if available >= segments:
+            lines.append("#EXT-X-ENDLIST")
+        return "\n".join(lines) + "\n"
+
+    def send_text(self, text, content_type, send_body):
+        body = text.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def send_media(self, size, content_type, send_body):
+        start, end = 0, size - 1
+        status = 200
+        match = re.match(r"bytes=(\d*)-(\d*)", self.headers.get("Range", ""))
+        if match and (match.group(1) or match.group(2)):
+            if match.group(1):
+                start = int(match.group(1))
+                if match.group(2):
+                    end = min(int(match.group(2)), size - 1)
+            else:
+                start = max(size - int(match.group(2)), 0)
+            if start >= size:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            status = 206
+        length = end - start + 1
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(length))
+        self.send_header("Accept-Ranges", "bytes")
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+        if not send_body:
+            return
+        rate = float(self.query.get("rate", 0))
+        position = start
+        while position <= end:
+            piece = min(CHUNK, end - position + 1)
+            self.wfile.write(synthetic_bytes(position, piece))
+            position += piece
+            if rate:
+                time.sleep(piece / rate)
+
+
+def bench_formats(base, video_id, size, segments, limits):
+    """
+    yt-dlp format dicts of a fake video: progressive "18", DASH-style separate
+    video "137" and audio "140" streams (as YouTube serves them), and HLS "hls-720".
+    """
+    query = urlencode(limits)
+    video = f"{base}/video/{video_id}"
+    return [
+        {
+            "format_id": "18",
+            "url": f"{video}.mp4?size={size}&{query}",
+            "ext": "mp4",
+            "vcodec": "avc1.42001E",
+            "acodec": "mp4a.40.2",
+            "width": 640,
+            "height": 360,
+            "filesize": size,
+        },
+        {
+            "format_id": "137",
+            "url": f"{video}-video.mp4?size={size}&{query}",
+            "ext": "mp4",
+            "vcodec": "avc1.640028",
+            "acodec": "none",
+            "width": 1920,
+            "height": 1080,
+            "filesize": size,
+        },
+        {
+            "format_id": "140",
+            "url": f"{video}-audio.m4a?size={size // 4}&{query}",
+            "ext": "m4a",
+            "vcodec": "none",
+            "acodec": "mp4a.40.2",
+            "filesize": size // 4,
+        },
+        {
+            "format_id": "hls-720",
+            "url": (
+                f"{base}/hls/{video_id}/index.m3u8?"
+                f"segments={segments}&size={max(size // segments, 1)}&{query}"
+            ),
+            "ext": "mp4",
+            "protocol": "m3u8_native",
+            "vcodec": "avc1.4d401f",
+            "acodec": "mp4a.40.2",
+            "width": 1280,
+            "height": 720,
+        },
+    ]
+
+
+class MediaServer:
+    """Runs MediaRequestHandler on a free localhost port in a background thread."""
+
+    def __init__(self, handler=MediaRequestHandler):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,345 @@
+"""
+Offline benchmark and regression suite for the GUI threads and the download engine.
+
+Replaces YouTube with the local media server and the fake "bench" yt-dlp extractor
+(yt_dlp_plugins/extractor/bench.py) and measures, on the offscreen Qt platform:
+    info_fetch        InfoFetchThread extraction time of one video (cache disabled)
+    playlist_stream   PlaylistStreamThread time to the first and the last batch
+    playlist_populate time to fill the playlist view with all entries and repaint
+    download          throughput of progressive, DASH video+audio and HLS downloads
+    progress_signals  cost per progress record delivered as a Qt signal
+    playlist_e2e      streaming a playlist into DownloadScheduler until all are done
+    playlist_e2e_serial  the same without look-ahead extraction (ExtractionPipeline)
+Everything runs in a temporary folder (config, journal, metadata cache, output),
+so no network access and no existing settings are involved. With --baseline the
+results are compared to an earlier --save file and the run fails if any timing is
+more than --tolerance slower, or any throughput that much lower.
+
+    python benchmarks/offline_bench.py --playlist-size 200 --save baseline.json
+    python benchmarks/offline_bench.py --baseline baseline.json --tolerance 0.25
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import statistics
+import tempfile
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+# Set before Qt and the metadata cache are imported
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+START_DIR = os.getcwd()  # --save and --baseline paths are relative to it
+WORK_DIR = tempfile.mkdtemp(prefix="ytd-bench-")
+os.environ["XDG_CACHE_HOME"] = os.path.join(WORK_DIR, "cache")
+os.chdir(WORK_DIR)
+
+from PyQt5.QtCore import QEventLoop, QTimer  # noqa: E402
+import main  # noqa: E402
+import engine  # noqa: E402
+from telemetry import JobMetrics, MetricsRecorder, summarize  # noqa: E402
+from media_server import MediaServer  # noqa: E402
+
+TIMEOUT_MS = 120000  # Upper bound for any single measurement
+
+# (name, yt-dlp format) of the download throughput measurements
+DOWNLOAD_KINDS = [("progressive", "18"), ("dash", "137,140"), ("hls", "hls-720")]
+
+
+def wait_until(done, signals, timeout_ms=TIMEOUT_MS):
+    """Runs the Qt event loop until done() is true after one of signals fired."""
+    loop = QEventLoop()
+
+    def check(*args):
+        if done():
+            loop.quit()
+
+    for signal in signals:
+        signal.connect(check)
+    QTimer.singleShot(timeout_ms, loop.quit)  # Never hang the benchmark
+    if not done():
+        loop.exec_()
+    if not done():
+        raise Exception("measurement timed out")
+
+
+def stats(values):
+    return {
+        "median": round(statistics.median(values), 4),
+        "min": round(min(values), 4),
+        "max": round(max(values), 4),
+    }
+
+
+def bench_url(server, path, args, **params):
+    query = "&".join(f"{key}={value}" for key, value in params.items())
+    return f"{server.base_url}/bench/{path}?{query}&delay={args.delay}"
+
+
+def measure_info_fetch(server, args):
+    times = []
+    for run in range(args.runs):
+        url = bench_url(server, "watch", args, v=f"info{run}", size=args.size)
+        result = {}
+        thread = main.InfoFetchThread(url, flat=False, use_cache=False)
+        thread.info_signal.connect(lambda info: result.setdefault("info", info))
+        thread.error_signal.connect(lambda error: result.setdefault("error", error))
+        started = time.perf_counter()
+        thread.start()
+        wait_until(lambda: result, [thread.info_signal, thread.error_signal])
+        times.append(time.perf_counter() - started)
+        thread.wait()
+        if "error" in result:
+            raise Exception(
+                f"info fetch failed ({result['error']}); is the bench extractor plugin "
+                "loaded? Run the script from the benchmarks folder."
+            )
+    return stats(times)
+
+
+def measure_playlist_stream(server, args):
+    first, last = [], []
+    for run in range(args.runs):
+        url = bench_url(
+            server, "playlist", args, list=f"stream{run}", count=args.playlist_size
+        )
+        model = main.PlaylistModel()
+        thread = main.PlaylistStreamThread(url)
+        marks = {}
+
+        def on_batch(videos):
+            marks.setdefault("first", time.perf_counter())
+            model.append_entries(videos)
+
+        thread.entries_signal.connect(on_batch)
+        started = time.perf_counter()
+        thread.start()
+        wait_until(lambda: thread.isFinished(), [thread.finished])
+        if thread.failed or len(model) != args.playlist_size:
+            raise Exception(f"playlist stream delivered {len(model)} entries")
+        first.append(marks["first"] - started)
+        last.append(time.perf_counter() - started)
+    return {"first_batch": stats(first), "last_batch": stats(last)}
+
+
+def measure_playlist_populate(window, args):
+    app = main.QApplication.instance()
+    videos = [
+        {"title": f"Bench video {i}", "url": f"http://127.0.0.1/bench/watch?v=p{i}"}
+        for i in range(args.playlist_size)
+    ]
+    set_times, append_times = [], []
+    for _ in range(args.runs):
+        window.playlist_model.clear()
+        app.processEvents()
+        started = time.perf_counter()
+        window.playlist_model.set_entries(videos)
+        window.playlist_list.viewport().repaint()
+        set_times.append(time.perf_counter() - started)
+
+        window.playlist_model.clear()
+        app.processEvents()
+        started = time.perf_counter()
+        # The way streamed playlists arrive: one batch at a time, repainting in between
+        for start in range(0, len(videos), engine.DEFAULT_STREAM_BATCH):
+            window.playlist_model.append_entries(
+                videos[start : start + engine.DEFAULT_STREAM_BATCH]
+            )
+            window.playlist_list.viewport().repaint()
+        append_times.append(time.perf_counter() - started)
+    window.playlist_model.clear()
+    return {"set_entries": stats(set_times), "append_batches": stats(append_times)}
+
+
+def measure_downloads(server, args):
+    results = {}
+    for name, format_spec in DOWNLOAD_KINDS:
+        url = bench_url(server, "watch", args, v=f"dl-{name}", size=args.size)
+        speeds, records = [], []
+        for _ in range(args.runs):
+            with tempfile.TemporaryDirectory(dir=WORK_DIR) as output:
+                job = JobMetrics(url)
+                started = time.perf_counter()
+                engine.download_video(
+                    url,
+                    format_spec,
+                    output,
+                    quiet=True,
+                    archive=False,
+                    # The media is synthetic: no ffmpeg fixups, only the transfer counts
+                    profile_opts={"fixup": "never"},
+                    metrics=job,
+                )
+                elapsed = time.perf_counter() - started
+                on_disk = sum(
+                    os.path.getsize(os.path.join(output, filename))
+                    for filename in os.listdir(output)
+                )
+                speeds.append(on_disk / elapsed)
+                records.append(job.record("done"))
+        results[name] = {
+            "throughput": stats(speeds),
+            "ttfb_s": stats([r["ttfb_s"] for r in records if r["ttfb_s"] is not None]),
+        }
+    return results
+
+
+def run_download_thread(url, progress_rate):
+    """Downloads url through a DownloadThread; returns (seconds, signals received)."""
+    received = []
+    with tempfile.TemporaryDirectory(dir=WORK_DIR) as output:
+        thread = main.DownloadThread(
+            url, "18", output, progress_rate=progress_rate, profile_opts={"fixup": "never"}
+        )
+        thread.progress_signal.connect(received.append)
+        started = time.perf_counter()
+        thread.start()
+        wait_until(lambda: thread.isFinished(), [thread.finished])
+        elapsed = time.perf_counter() - started
+    return elapsed, len(received)
+
+
+def measure_progress_signals(server, args):
+    url = bench_url(server, "watch", args, v="signals", size=args.size * 4)
+    results = {}
+    for label, rate in (("unthrottled", 0), ("coalesced", engine.DEFAULT_PROGRESS_RATE)):
+        times, counts = [], []
+        for _ in range(args.runs):
+            elapsed, count = run_download_thread(url, rate)
+            times.append(elapsed)
+            counts.append(count)
+        results[label] = {"seconds": stats(times), "signals": max(counts)}
+    # Records dropped by the coalescer cost nothing, so the difference is the signal cost
+    extra = results["unthrottled"]["signals"] - results["coalesced"]["signals"]
+    delta = (
+        results["unthrottled"]["seconds"]["median"] - results["coalesced"]["seconds"]["median"]
+    )
+    results["per_signal_us"] = round(max(delta, 0) / extra * 1e6, 2) if extra > 0 else None
+    return results
+
+
+def measure_playlist_e2e(server, args, pipeline=True):
+    # Separate playlist ids, so one run cannot reuse the streams the other cached
+    list_id = "e2e" if pipeline else "e2e-serial"
+    url = bench_url(
+        server, "playlist", args, list=list_id, count=args.e2e_size, size=args.e2e_item_size
+    )
+    quality_format = engine.quality_format_for("Medium 360p")
+    recorder = MetricsRecorder(None)  # In memory only
+    scheduler = main.DownloadScheduler(max_workers=args.workers, metrics=recorder)
+    if not pipeline:
+        scheduler.pipeline = None
+    thread = main.PlaylistStreamThread(url)
+    queued = []
+    with tempfile.TemporaryDirectory(dir=WORK_DIR) as output:
+
+        def on_batch(videos):
+            for video in videos:
+                scheduler.enqueue(
+                    len(queued), video["url"], quality_format, output, {"fixup": "never"}
+                )
+                queued.append(video["url"])
+            scheduler.start()
+
+        def done():
+            return thread.isFinished() and queued and not scheduler.is_active()
+
+        thread.entries_signal.connect(on_batch)
+        started = time.perf_counter()
+        thread.start()
+        wait_until(done, [thread.finished, scheduler.finished_signal])
+        elapsed = time.perf_counter() - started
+    counts = scheduler.counts()
+    if counts.get(engine.STATE_DONE, 0) != args.e2e_size:
+        raise Exception(f"playlist run ended with {counts}")
+    metrics = summarize(recorder.records())
+    return {
+        "seconds": round(elapsed, 4),
+        "videos_per_s": round(args.e2e_size / elapsed, 2),
+        "mean_extraction_s": metrics["mean_extraction_s"],
+        "mean_ttfb_s": metrics["mean_ttfb_s"],
+        "mean_throughput": metrics["mean_throughput"],
+    }
+
+
+def flatten(results, prefix=""):
+    """Yields (dotted key, value) for every number in the nested results."""
+    for key, value in results.items():
+        if isinstance(value, dict):
+            yield from flatten(value, f"{prefix}{key}.")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield f"{prefix}{key}", value
+
+
+def compare(results, baseline, tolerance):
+    """Returns regressions of results against baseline; higher is better for speeds."""
+    failures = []
+    previous = dict(flatten(baseline))
+    for key, value in flatten(results):
+        old = previous.get(key)
+        if not old or key.endswith(".signals") or key.endswith(".max"):
+            continue
+        higher_is_better = "throughput" in key or key.endswith("_per_s")
+        change = (old - value) / old if higher_is_better else (value - old) / old
+        if change > tolerance:
+            failures.append(f"{key}: {value} vs {old} in the baseline ({change:+.0%})")
+    return failures
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--delay", type=int, default=0, help="Latency per request (ms)")
+    parser.add_argument("--size", type=int, default=8 * 1024 * 1024, help="Bytes per video")
+    parser.add_argument("--playlist-size", type=int, default=500)
+    parser.add_argument(
+        "--e2e-size", type=int, default=20, help="Videos downloaded end to end"
+    )
+    parser.add_argument("--e2e-item-size", type=int, default=512 * 1024)
+    parser.add_argument("--workers", type=int, default=engine.DEFAULT_MAX_WORKERS)
+    parser.add_argument("--save", metavar="FILE", help="Write the results to FILE")
+    parser.add_argument("--baseline", metavar="FILE", help="Fail on regressions against FILE")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    app = main.QApplication(sys.argv)
+    started = time.perf_counter()
+    yt_dlp = engine.load_yt_dlp()
+    results = {
+        "yt_dlp_version": yt_dlp.version.__version__,
+        "yt_dlp_import_s": round(time.perf_counter() - started, 4),
+    }
+    with MediaServer() as server:
+        results["info_fetch"] = measure_info_fetch(server, args)
+        results["playlist_stream"] = measure_playlist_stream(server, args)
+        window = main.MainWindow()
+        window.resize(600, 600)
+        window.show()
+        app.processEvents()
+        results["playlist_populate"] = measure_playlist_populate(window, args)
+        results["download"] = measure_downloads(server, args)
+        results["progress_signals"] = measure_progress_signals(server, args)
+        results["playlist_e2e"] = measure_playlist_e2e(server, args)
+        results["playlist_e2e_serial"] = measure_playlist_e2e(server, args, pipeline=False)
+        window.close()
+
+    os.chdir(START_DIR)
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
+    failures = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures = compare(results, json.load(f), args.tolerance)
+    results["failures"] = failures
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_bench())
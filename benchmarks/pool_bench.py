@@ -0,0 +1,73 @@
+"""
+Measures per-item latency of a playlist-style run with and without the YoutubeDL pool.
+
+Downloads a series of small files from the local media server one after another
+through engine.download_video(), first building a fresh YoutubeDL per item (pool
+with no idle instances) and then reusing pooled instances.
+
+    python benchmarks/pool_bench.py --items 30 --size 65536
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import tempfile
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import engine  # noqa: E402
+from ydl_pool import YoutubeDLPool  # noqa: E402
+from media_server import MediaServer  # noqa: E402
+
+
+def run_items(server, args, pool):
+    engine.ydl_pool = pool
+    latencies = []
+    with tempfile.TemporaryDirectory() as output:
+        for i in range(args.items):
+            url = f"{server.base_url}/video/item{i}.mp4?size={args.size}&delay={args.delay}"
+            started = time.perf_counter()
+            engine.download_video(url, "best", output, quiet=True, archive=False)
+            latencies.append(time.perf_counter() - started)
+    pool.clear()
+    return latencies
+
+
+def summary(latencies):
+    ordered = sorted(latencies)
+    return {
+        "median_ms": round(statistics.median(ordered) * 1000, 1),
+        "p90_ms": round(ordered[int(len(ordered) * 0.9) - 1] * 1000, 1),
+        "total_s": round(sum(ordered), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=30)
+    parser.add_argument("--size", type=int, default=64 * 1024)
+    parser.add_argument("--delay", type=int, default=0, help="Latency per request (ms)")
+    args = parser.parse_args()
+
+    # Import yt_dlp up front so neither variant pays for it
+    engine.load_yt_dlp()
+    with MediaServer() as server:
+        fresh = run_items(server, args, YoutubeDLPool(max_idle=0))
+        pool = YoutubeDLPool()
+        pooled = run_items(server, args, pool)
+    results = {
+        "items": args.items,
+        "fresh": summary(fresh),
+        "pooled": summary(pooled),
+        "pool": pool.stats(),
+    }
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
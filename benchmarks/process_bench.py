@@ -0,0 +1,106 @@
+"""
+Measures metadata throughput against core count, with threads and with worker processes.
+
+Extracts --videos videos from the local media server through the fake "bench"
+extractor, whose extraction keeps the CPU busy for --cpu ms per video like real
+signature solving. Each core count runs the same extractions on an
+ExtractionPipeline with that many threads, and on a ProcessWorkerPool with that
+many extraction processes (spawned and warmed up before timing). Threads share
+one interpreter lock, so they should stay near the one-core rate; processes
+should scale with the cores up to os.cpu_count().
+
+    python benchmarks/process_bench.py --videos 48 --cpu 50 --cores 1,2,4,8
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+# Set before the metadata cache is imported; worker processes inherit it
+os.environ["XDG_CACHE_HOME"] = tempfile.mkdtemp(prefix="ytd-bench-cache-")
+
+import engine  # noqa: E402
+from worker_pool import ProcessWorkerPool  # noqa: E402
+from media_server import MediaServer  # noqa: E402
+
+
+def video_urls(server, args, run):
+    return [
+        f"{server.base_url}/bench/watch?v={run}-{i}&cpu={args.cpu}&delay={args.delay}"
+        for i in range(args.videos)
+    ]
+
+
+def run_threads(server, args, cores):
+    pipeline = engine.ExtractionPipeline(cores)
+    urls = video_urls(server, args, f"t{cores}")
+    started = time.perf_counter()
+    for url in urls:
+        pipeline.prefetch(url)
+    resolved = sum(pipeline.resolved_info(url) is not None for url in urls)
+    elapsed = time.perf_counter() - started
+    pipeline.shutdown()
+    return resolved, elapsed
+
+
+def run_processes(server, args, cores):
+    pool = ProcessWorkerPool(processes=1, extractors=cores)
+    try:
+        # Spawning the processes and importing yt-dlp in them is not timed
+        started = time.perf_counter()
+        warmup = video_urls(server, args, f"w{cores}")[:cores]
+        for future in [pool.extract(url) for url in warmup]:
+            future.result()
+        spawn = time.perf_counter() - started
+        pipeline = pool.pipeline()
+        urls = video_urls(server, args, f"p{cores}")
+        started = time.perf_counter()
+        for url in urls:
+            pipeline.prefetch(url)
+        resolved = sum(pipeline.resolved_info(url) is not None for url in urls)
+        elapsed = time.perf_counter() - started
+    finally:
+        pool.shutdown()
+    return resolved, elapsed, spawn
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--videos", type=int, default=24)
+    parser.add_argument("--cpu", type=float, default=50, help="CPU time per extraction (ms)")
+    parser.add_argument("--cores", default="1,2,4", help="Comma-separated worker counts")
+    parser.add_argument("--delay", type=int, default=0, help="Latency per request (ms)")
+    args = parser.parse_args()
+
+    engine.load_yt_dlp()
+    results = {"cpu_count": os.cpu_count(), "videos": args.videos, "runs": []}
+    failures = []
+    with MediaServer() as server:
+        for cores in [int(c) for c in args.cores.split(",") if c.strip()]:
+            threads_ok, threads_s = run_threads(server, args, cores)
+            processes_ok, processes_s, spawn_s = run_processes(server, args, cores)
+            for label, resolved in (("threads", threads_ok), ("processes", processes_ok)):
+                if resolved != args.videos:
+                    failures.append(f"{label} x{cores}: {resolved}/{args.videos} resolved")
+            results["runs"].append(
+                {
+                    "cores": cores,
+                    "threads_videos_per_s": round(args.videos / threads_s, 2),
+                    "processes_videos_per_s": round(args.videos / processes_s, 2),
+                    "speedup": round(threads_s / processes_s, 2),
+                    "process_spawn_s": round(spawn_s, 3),
+                }
+            )
+    results["failures"] = failures
+    print(json.dumps(results, indent=2))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Startup-time benchmark for main.py.
+
+Launches the GUI in fresh processes on the offscreen Qt platform and measures:
+    first_paint  seconds from process start to the first paint of MainWindow
+    first_fetch  seconds from process start to the first InfoFetchThread result
+It also checks that yt_dlp has not been imported by the time the window paints.
+The fetch targets a local media server, so no network access is needed.
+
+    python benchmarks/startup_bench.py --runs 5 --max-first-paint 1.5
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+
+def child(url):
+    """Runs inside the measured process; prints one JSON result line."""
+    t0 = float(os.environ["BENCH_T0"])
+    import main
+    from PyQt5.QtCore import QEvent, QObject, QTimer
+
+    result = {}
+    app = main.QApplication(sys.argv)
+    window = main.MainWindow()
+
+    class PaintWatcher(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint and "first_paint" not in result:
+                result["first_paint"] = time.time() - t0
+                result["yt_dlp_loaded_at_paint"] = "yt_dlp" in sys.modules
+                QTimer.singleShot(0, start_fetch)
+            return False
+
+    def start_fetch():
+        window.start_warmup()
+        thread = main.InfoFetchThread(url, flat=False, use_cache=False)
+        thread.info_signal.connect(lambda info: finish(None))
+        thread.error_signal.connect(finish)
+        window.bench_thread = thread  # Keep a reference while it runs
+        thread.start()
+
+    def finish(error):
+        result["first_fetch"] = time.time() - t0
+        if error:
+            result["fetch_error"] = error
+        app.quit()
+
+    watcher = PaintWatcher()
+    window.installEventFilter(watcher)
+    window.resize(600, 600)
+    window.show()
+    QTimer.singleShot(60000, app.quit)  # Never hang the benchmark
+    app.exec_()
+    print(json.dumps(result))
+
+
+def run_once(url):
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    with tempfile.TemporaryDirectory() as workdir:
+        # Fresh config, journal and metadata cache for every run
+        env["XDG_CACHE_HOME"] = workdir
+        env["BENCH_T0"] = repr(time.time())
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", url],
+            cwd=workdir,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--url", help="URL to fetch (default: local media server)")
+    parser.add_argument("--max-first-paint", type=float, help="Fail above this median")
+    parser.add_argument("--max-first-fetch", type=float, help="Fail above this median")
+    parser.add_argument("--child", metavar="URL", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child)
+        return 0
+
+    from media_server import MediaServer
+
+    with MediaServer() as server:
+        url = args.url or f"{server.base_url}/video/startup.mp4"
+        results = [run_once(url) for _ in range(args.runs)]
+
+    failures = []
+    summary = {"runs": args.runs}
+    for key, limit in (
+        ("first_paint", args.max_first_paint),
+        ("first_fetch", args.max_first_fetch),
+    ):
+        values = [r[key] for r in results if key in r]
+        if not values:
+            failures.append(f"{key} was never reached")
+            continue
+        summary[key] = {
+            "median": round(statistics.median(values), 4),
+            "min": round(min(values), 4),
+            "max": round(max(values), 4),
+        }
+        if limit is not None and statistics.median(values) > limit:
+            failures.append(f"{key} median {statistics.median(values):.3f}s > {limit}s")
+    if any(r.get("yt_dlp_loaded_at_paint") for r in results):
+        failures.append("yt_dlp was imported before the window painted")
+    errors = [r["fetch_error"] for r in results if "fetch_error" in r]
+    if errors:
+        failures.append(f"fetch failed: {errors[0]}")
+    summary["failures"] = failures
+    print(json.dumps(summary, indent=2))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
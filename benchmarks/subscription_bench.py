@@ -0,0 +1,97 @@
+"""
+Measures how long syncing a subscription list takes, full and incremental.
+
+Subscribes to --channels newest-first playlists of --entries entries on the local
+media server (pages of --page-size, --delay ms per request). The first sync lists
+every entry, like the full flat extraction each run used to do; the entries are
+then marked seen, --uploads new ones are published to every other channel, and
+the second sync should stop paging at the known entries and find exactly those.
+
+    python benchmarks/subscription_bench.py --channels 100 --entries 300 --delay 50
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import engine  # noqa: E402
+from subscriptions import SYNC_WORKERS, SubscriptionList  # noqa: E402
+from media_server import MediaRequestHandler, MediaServer  # noqa: E402
+
+
+def timed_sync(subscriptions, workers):
+    started = time.perf_counter()
+    results = subscriptions.sync(workers=workers)
+    elapsed = time.perf_counter() - started
+    seconds = [result.seconds for result in results]
+    return results, {
+        "elapsed_s": round(elapsed, 3),
+        "mean_subscription_s": round(sum(seconds) / len(seconds), 3),
+        "max_subscription_s": round(max(seconds), 3),
+        "entries_checked": sum(result.checked for result in results),
+        "new": sum(len(result.new) for result in results),
+        "stopped_early": sum(1 for result in results if result.stopped_early),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--channels", type=int, default=100)
+    parser.add_argument("--entries", type=int, default=300, help="Entries per channel")
+    parser.add_argument("--page-size", type=int, default=30)
+    parser.add_argument(
+        "--uploads", type=int, default=2, help="New entries per changed channel"
+    )
+    parser.add_argument("--delay", type=int, default=50, help="Latency per request (ms)")
+    parser.add_argument("--workers", type=int, default=SYNC_WORKERS)
+    args = parser.parse_args()
+
+    engine.load_yt_dlp()
+    path = os.path.join(tempfile.mkdtemp(prefix="ytd-bench-subs-"), "subscriptions.json")
+    subscriptions = SubscriptionList(path)
+    failures = []
+    with MediaServer() as server:
+        for i in range(args.channels):
+            url = (
+                f"{server.base_url}/bench/playlist?list=ch{i}&count={args.entries}"
+                f"&page_size={args.page_size}&newest=1&delay={args.delay}"
+            )
+            subscriptions.add(url, tempfile.gettempdir(), newest_first=True)
+        results, full = timed_sync(subscriptions, args.workers)
+        for result in results:
+            subscriptions.mark_seen(result.url, [video["id"] for video in result.new])
+        for i in range(0, args.channels, 2):
+            MediaRequestHandler.playlist_sizes[f"ch{i}"] = args.entries + args.uploads
+        results, incremental = timed_sync(subscriptions, args.workers)
+    for i, result in enumerate(results):
+        expected = args.uploads if i % 2 == 0 else 0
+        if result.error or len(result.new) != expected:
+            failures.append(
+                f"ch{i}: {len(result.new)} new, expected {expected} ({result.error})"
+            )
+    if full["new"] != args.channels * args.entries:
+        failures.append(f"full sync found {full['new']} entries")
+    print(
+        json.dumps(
+            {
+                "channels": args.channels,
+                "entries": args.entries,
+                "full": full,
+                "incremental": incremental,
+                "speedup": round(full["elapsed_s"] / incremental["elapsed_s"], 1),
+                "failures": failures,
+            },
+            indent=2,
+        )
+    )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
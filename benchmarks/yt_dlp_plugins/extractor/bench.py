@@ -0,0 +1,88 @@
+"""
+Fake yt-dlp extractors for the local media server (benchmarks/media_server.py).
+
+yt-dlp loads them as plugins when the benchmarks/ folder is on sys.path (the
+benchmark scripts run from there), so the engine, the GUI threads and pooled
+YoutubeDL instances all see them without any patching:
+
+    http://127.0.0.1:<port>/bench/watch?v=<id>&size=<bytes>&delay=<ms>&cpu=<ms>
+    http://127.0.0.1:<port>/bench/playlist?list=<id>&count=<n>&size=<bytes>&newest=1
+
+Extra query parameters are passed on to the server, which uses them for the
+metadata request and for the media URLs of the formats. cpu stands in for the
+signature and n-challenge solving of real extractors: the extraction keeps the
+CPU busy in Python, holding the GIL, for that many milliseconds.
+"""
+
+import time
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+from yt_dlp.extractor.common import InfoExtractor
+
+
+def _split_url(url):
+    """Returns (server base URL, query parameters) of a bench URL."""
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}", dict(parse_qsl(parsed.query))
+
+
+def _burn_cpu(milliseconds):
+    deadline = time.thread_time() + milliseconds / 1000
+    value = 0
+    while time.thread_time() < deadline:
+        for i in range(1000):
+            value = (value * 31 + i) % 1000003
+    return value
+
+
+class BenchVideoIE(InfoExtractor):
+    IE_NAME = "bench"
+    _VALID_URL = r"https?://[^/]+/bench/watch\?(?:[^#]*&)?v=(?P<id>[\w-]+)"
+
+    def _real_extract(self, url):
+        video_id = self._match_id(url)
+        base, params = _split_url(url)
+        params.pop("v", None)
+        _burn_cpu(float(params.pop("cpu", 0)))
+        info = self._download_json(
+            f"{base}/api/video/{video_id}.json?{urlencode(params)}", video_id
+        )
+        info["webpage_url"] = url
+        return info
+
+
+class BenchPlaylistIE(InfoExtractor):
+    IE_NAME = "bench:playlist"
+    _VALID_URL = r"https?://[^/]+/bench/playlist\?(?:[^#]*&)?list=(?P<id>[\w-]+)"
+
+    def _entries(self, base, playlist_id, params):
+        media = {k: v for k, v in params.items() if k not in ("count", "page_size", "newest")}
+        page = 0
+        while True:
+            data = self._download_json(
+                f"{base}/api/playlist/{playlist_id}.json?{urlencode(dict(params, page=page))}",
+                playlist_id,
+                note=f"Downloading page {page + 1}",
+            )
+            for entry in data["entries"]:
+                query = urlencode(dict(media, v=entry["id"]))
+                yield self.url_result(
+                    f"{base}/bench/watch?{query}",
+                    BenchVideoIE.ie_key(),
+                    entry["id"],
+                    entry["title"],
+                )
+            if not data.get("next"):
+                return
+            page += 1
+
+    def _real_extract(self, url):
+        playlist_id = self._match_id(url)
+        base, params = _split_url(url)
+        params.pop("list", None)
+        # Pages are requested as the entries are consumed, like real playlist extractors
+        return self.playlist_result(
+            self._entries(base, playlist_id, params),
+            playlist_id,
+            f"Bench playlist {playlist_id}",
+        )
@@ -0,0 +1,589 @@
+"""
+Headless batch downloader sharing the download engine with the Qt GUI.
+
+Prints one JSON object per line on stdout (state changes, progress and a final
+summary) so it can be driven from cron or other scripts. Never imports PyQt5.
+
+Example:
+    python cli.py --quality "High 720p" --output ~/Videos --concurrency 4 URL [URL ...]
+    python cli.py --file urls.txt --output ~/Videos
+    python cli.py --subscribe CHANNEL_URL --output ~/Videos/channel
+    python cli.py --sync --sync-interval 60
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+from download_journal import DownloadJournal
+from telemetry import MetricsRecorder
+from content_store import DEFAULT_STORE_DIR
+from clips import make_clip, parse_range
+from worker_pool import ProcessWorkerPool
+from subscriptions import (
+    DEFAULT_SUBSCRIPTIONS_PATH,
+    SYNC_WORKERS,
+    SubscriptionList,
+    is_settled,
+)
+from postprocess import (
+    AUDIO_FORMATS,
+    VIDEO_CONTAINERS,
+    DEFAULT_POSTPROCESS,
+    DEFAULT_POSTPROCESS_WORKERS,
+)
+from engine import (
+    QUALITY_PRESETS,
+    DOWNLOAD_PROFILES,
+    DEFAULT_PROFILE,
+    DEFAULT_MAX_WORKERS,
+    PIPELINE_WORKERS,
+    STATE_FAILED,
+    BatchDownloader,
+    bandwidth_governor,
+    content_store,
+    cookie_manager,
+    expand_urls,
+    quality_format_for,
+    profile_options_for,
+)
+
+
+def read_url_file(path):
+    """Reads one URL per line, skipping blank lines and # comments. '-' reads stdin."""
+    handle = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    try:
+        return [
+            line.strip()
+            for line in handle
+            if line.strip() and not line.strip().startswith("#")
+        ]
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+class JsonLinePrinter:
+    """Writes events from any thread as JSON lines."""
+
+    def __init__(self, stream=sys.stdout):
+        self.stream = stream
+        self.lock = threading.Lock()
+
+    def __call__(self, event):
+        with self.lock:
+            self.stream.write(json.dumps(event) + "\n")
+            self.stream.flush()
+
+
+class LimitsMonitor(threading.Thread):
+    """
+    Reports the achieved throughput every interval seconds and applies changes
+    to the --control file ({"max_rate": MB/s, "per_host": n}) while a batch runs.
+    """
+
+    def __init__(self, emit, interval, control_path=None):
+        super().__init__(name="limits-monitor", daemon=True)
+        self.emit = emit
+        self.interval = interval
+        self.control_path = control_path
+        self.control_mtime = None
+        self.stopped = threading.Event()
+
+    def apply_control(self):
+        try:
+            mtime = os.stat(self.control_path).st_mtime
+            if mtime == self.control_mtime:
+                return
+            self.control_mtime = mtime
+            with open(self.control_path, "r", encoding="utf-8") as f:
+                control = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.debug("Could not read control file: %s", e)
+            return
+        if "max_rate" in control:
+            bandwidth_governor.set_rate(float(control["max_rate"]) * 1024 * 1024)
+        if "per_host" in control:
+            bandwidth_governor.set_host_limit(control["per_host"])
+        self.emit(dict(event="limits", **bandwidth_governor.stats()))
+
+    def run(self):
+        last_report = time.monotonic()
+        while not self.stopped.wait(1.0):
+            if self.control_path:
+                self.apply_control()
+            if self.interval and time.monotonic() - last_report >= self.interval:
+                last_report = time.monotonic()
+                self.emit(dict(event="throughput", **bandwidth_governor.stats()))
+
+    def stop(self):
+        self.stopped.set()
+
+
+class SubscriptionSync:
+    """
+    Syncs the subscription list, downloads the new entries of each output folder
+    with a BatchDownloader from make_downloader(output, on_event), and records
+    the entries that need no further attempt as seen.
+    """
+
+    def __init__(self, subscriptions, make_downloader, emit, workers=SYNC_WORKERS):
+        self.subscriptions = subscriptions
+        self.make_downloader = make_downloader
+        self.emit = emit
+        self.workers = workers
+        self.downloader = None  # BatchDownloader of the folder being downloaded
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+        if self.downloader is not None:
+            self.downloader.cancel()
+
+    def sync(self):
+        """Lists every subscription and returns their SyncResults, reporting each one."""
+        started = time.monotonic()
+        results = self.subscriptions.sync(
+            workers=self.workers,
+            on_result=lambda result: self.emit(
+                {
+                    "event": "sync",
+                    "url": result.url,
+                    "new": len(result.new),
+                    "checked": result.checked,
+                    "stopped_early": result.stopped_early,
+                    "seconds": round(result.seconds, 3),
+                    "error": result.error,
+                }
+            ),
+            is_cancelled=lambda: self.cancelled,
+        )
+        self.emit(
+            {
+                "event": "sync_summary",
+                "subscriptions": len(results),
+                "new": sum(len(result.new) for result in results),
+                "checked": sum(result.checked for result in results),
+                "errors": sum(1 for result in results if result.error),
+                "elapsed": round(time.monotonic() - started, 3),
+            }
+        )
+        return results
+
+    def mark_seen(self, results):
+        """Records every new entry as seen without downloading it."""
+        for result in results:
+            self.subscriptions.mark_seen(result.url, [video["id"] for video in result.new])
+
+    def download(self, results):
+        """Downloads the new entries folder by folder; returns the number that failed."""
+        outputs = {s["url"]: s["output"] for s in self.subscriptions.all()}
+        batches = {}  # Output folder -> [(subscription URL, video)]
+        for result in results:
+            for video in result.new:
+                batches.setdefault(outputs[result.url], []).append((result.url, video))
+        failed = 0
+        for output, entries in batches.items():
+            if self.cancelled:
+                break
+            settled = {}  # Subscription URL -> ids, filled from the worker threads
+            by_url = {video["url"]: (url, video) for url, video in entries}
+
+            def on_event(event, by_url=by_url, settled=settled):
+                self.emit(event)
+                if event.get("event") == "state" and is_settled(
+                    event["state"], event.get("kind"), event.get("reason")
+                ):
+                    # By URL: entries resumed from the journal follow these ones
+                    url, video = by_url.get(event["url"], (None, None))
+                    if url is not None:
+                        settled.setdefault(url, []).append(video["id"])
+
+            self.downloader = self.make_downloader(output, on_event)
+            summary = self.downloader.run([video for _, video in entries])
+            for url, ids in settled.items():
+                self.subscriptions.mark_seen(url, ids)
+            failed += summary["counts"].get(STATE_FAILED, 0)
+        return failed
+
+
+def _time_range(text):
+    try:
+        return parse_range(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def _chapter_pattern(text):
+    try:
+        re.compile(text)
+    except re.error as e:
+        raise argparse.ArgumentTypeError(f"invalid chapter pattern {text!r}: {e}")
+    return text
+
+
+def build_parser():
+    presets = ", ".join(label for label, _ in QUALITY_PRESETS)
+    profiles = ", ".join(label for label, _ in DOWNLOAD_PROFILES)
+    parser = argparse.ArgumentParser(
+        description="Download YouTube videos and playlists without the GUI."
+    )
+    parser.add_argument("urls", nargs="*", help="Video or playlist URLs")
+    parser.add_argument(
+        "-f",
+        "--file",
+        action="append",
+        default=[],
+        help="File with one URL per line ('-' for stdin). May be repeated.",
+    )
+    parser.add_argument(
+        "-q",
+        "--quality",
+        default="High 720p",
+        help=f"Quality preset: {presets}",
+    )
+    parser.add_argument(
+        "-p",
+        "--profile",
+        default=DEFAULT_PROFILE,
+        help=f"Download performance profile: {profiles}",
+    )
+    parser.add_argument(
+        "--max-size",
+        type=float,
+        help="Pick the best formats whose combined size fits this many MB per video",
+    )
+    parser.add_argument(
+        "--max-bitrate",
+        type=float,
+        help="Pick the best formats whose combined bitrate fits this many kbit/s",
+    )
+    parser.add_argument(
+        "--container",
+        choices=VIDEO_CONTAINERS,
+        default=DEFAULT_POSTPROCESS["container"],
+        help="Container videos are merged or remuxed into (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--audio-format",
+        choices=AUDIO_FORMATS,
+        default=DEFAULT_POSTPROCESS["audio_format"],
+        help="Format audio-only downloads are converted to (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--embed-thumbnail", action="store_true", help="Embed the video thumbnail"
+    )
+    parser.add_argument(
+        "--normalize-audio", action="store_true", help="Normalise audio loudness"
+    )
+    parser.add_argument(
+        "--postprocess-workers",
+        type=int,
+        default=DEFAULT_POSTPROCESS_WORKERS,
+        help="Number of parallel ffmpeg jobs (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-o", "--output", default=".", help="Output directory (default: current directory)"
+    )
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        default=DEFAULT_MAX_WORKERS,
+        help=f"Number of parallel downloads (default: {DEFAULT_MAX_WORKERS})",
+    )
+    parser.add_argument(
+        "--journal",
+        help="Record per-entry state in this download journal file",
+    )
+    parser.add_argument(
+        "--no-archive",
+        action="store_true",
+        help="Do not skip or record videos in the output folder's download_archive.txt",
+    )
+    parser.add_argument(
+        "--scan-output",
+        action="store_true",
+        help="Also skip videos whose title already appears in the output folder",
+    )
+    parser.add_argument(
+        "--max-rate",
+        type=float,
+        default=0,
+        help="Combined speed limit of all downloads in MB/s (default: unlimited)",
+    )
+    parser.add_argument(
+        "--per-host",
+        type=int,
+        default=0,
+        help="Simultaneous downloads allowed per site (default: unlimited)",
+    )
+    parser.add_argument(
+        "--control",
+        help="JSON file with max_rate and/or per_host, re-read whenever it changes, "
+        "to adjust the limits of a running batch",
+    )
+    parser.add_argument(
+        "--throughput-interval",
+        type=float,
+        default=5.0,
+        help="Seconds between throughput lines (0 disables them, default: 5)",
+    )
+    parser.add_argument(
+        "--metrics",
+        help="Append per-download metrics (timings, throughput, retries) to this "
+        "file: JSON lines, or CSV if it ends in .csv",
+    )
+    parser.add_argument(
+        "--store",
+        nargs="?",
+        const=DEFAULT_STORE_DIR,
+        help="Keep each video once in this content store folder (default: "
+        f"{DEFAULT_STORE_DIR}) and hardlink it into output folders",
+    )
+    parser.add_argument(
+        "--gc",
+        action="store_true",
+        help="Remove content store files no output folder links to any more, and exit",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="With --gc, also remove store files whose checksum no longer matches",
+    )
+    parser.add_argument(
+        "--live",
+        action="store_true",
+        help="Record live streams and premieres (waiting for scheduled ones to start)",
+    )
+    parser.add_argument(
+        "--live-window",
+        type=float,
+        default=0,
+        help="With --live, keep only the last this many minutes (default: everything)",
+    )
+    parser.add_argument(
+        "--section",
+        action="append",
+        default=[],
+        type=_time_range,
+        metavar="START-END",
+        help="Download only this time range of every video, e.g. 1:30-4:00 or 10:00- "
+        "(repeatable; one file per range)",
+    )
+    parser.add_argument(
+        "--chapter",
+        action="append",
+        default=[],
+        type=_chapter_pattern,
+        metavar="REGEX",
+        help="Download only the chapters whose title matches (repeatable)",
+    )
+    parser.add_argument(
+        "--split-chapters",
+        action="store_true",
+        help="With --chapter, write one file per chapter instead of joining adjacent ones",
+    )
+    parser.add_argument(
+        "--precise-cuts",
+        action="store_true",
+        help="Cut sections at the exact times by re-encoding around the cuts",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=0,
+        help="Run extractions and downloads in this many worker processes, to use "
+        "several CPU cores (default: threads of this process)",
+    )
+    parser.add_argument(
+        "--subscribe",
+        action="append",
+        default=[],
+        metavar="URL",
+        help="Add a channel or playlist to the subscription list, downloading into "
+        "--output (repeatable)",
+    )
+    parser.add_argument(
+        "--order",
+        choices=("newest", "oldest"),
+        help="With --subscribe, the order the site lists entries in (default: newest "
+        "first for channels, oldest first for playlists)",
+    )
+    parser.add_argument(
+        "--unsubscribe",
+        action="append",
+        default=[],
+        metavar="URL",
+        help="Remove a channel or playlist from the subscription list (repeatable)",
+    )
+    parser.add_argument(
+        "--subscriptions",
+        default=DEFAULT_SUBSCRIPTIONS_PATH,
+        help="Subscription list file (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="Download the entries added to the subscriptions since the last sync",
+    )
+    parser.add_argument(
+        "--sync-interval",
+        type=float,
+        default=0,
+        help="With --sync, sync again every this many minutes (default: once)",
+    )
+    parser.add_argument(
+        "--sync-workers",
+        type=int,
+        default=SYNC_WORKERS,
+        help="Subscriptions listed at the same time (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--mark-seen",
+        action="store_true",
+        help="With --sync, record the new entries as seen without downloading them",
+    )
+    parser.add_argument(
+        "--no-pipeline",
+        action="store_true",
+        help="Do not extract the next videos while the current ones download",
+    )
+    parser.add_argument(
+        "--progress-rate",
+        type=float,
+        default=1.0,
+        help="Maximum progress lines per second per entry (default: 1)",
+    )
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    quality_format = quality_format_for(args.quality)
+    if quality_format is None:
+        parser.error(f"unknown quality preset: {args.quality}")
+    profile_opts = profile_options_for(args.profile)
+    if profile_opts is None:
+        parser.error(f"unknown download profile: {args.profile}")
+    if args.gc:
+        content_store.set_root(args.store or DEFAULT_STORE_DIR)
+        print(json.dumps(dict(content_store.gc(verify=args.verify), event="gc")))
+        return 0
+    content_store.set_root(args.store)
+    format_limits = {}
+    if args.max_size:
+        format_limits["max_bytes"] = int(args.max_size * 1024 * 1024)
+    if args.max_bitrate:
+        format_limits["max_bitrate"] = args.max_bitrate
+    urls = list(args.urls)
+    for path in args.file:
+        urls.extend(read_url_file(path))
+    if urls and args.sync:
+        parser.error("--sync downloads the subscriptions; give other URLs in another run")
+    subscriptions = SubscriptionList(args.subscriptions)
+    order = {"newest": True, "oldest": False}.get(args.order)
+    for url in args.subscribe:
+        subscription = subscriptions.add(url, os.path.abspath(args.output), order)
+        print(
+            json.dumps(
+                {
+                    "event": "subscribed",
+                    "url": url,
+                    "output": subscription["output"],
+                    "newest_first": subscription["newest_first"],
+                }
+            )
+        )
+    for url in args.unsubscribe:
+        found = subscriptions.remove(url)
+        print(json.dumps({"event": "unsubscribed", "url": url, "found": found}))
+    if not urls and not args.sync:
+        if args.subscribe or args.unsubscribe:
+            return 0
+        parser.error("no URLs given")
+
+    printer = JsonLinePrinter()
+    bandwidth_governor.set_rate(args.max_rate * 1024 * 1024)
+    bandwidth_governor.set_host_limit(args.per_host)
+    monitor = LimitsMonitor(printer, args.throughput_interval, args.control)
+    monitor.start()
+    # Cookies refreshed on disk during a long batch are used from the next download on
+    cookie_manager.start_watching()
+    journal = DownloadJournal(args.journal) if args.journal else None
+    metrics = MetricsRecorder(args.metrics) if args.metrics else None
+    worker_pool = None
+    if args.processes > 0:
+        worker_pool = ProcessWorkerPool(
+            args.processes, min(args.concurrency, PIPELINE_WORKERS)
+        )
+
+    def make_downloader(output, on_event=printer):
+        return BatchDownloader(
+            quality_format,
+            output,
+            concurrency=args.concurrency,
+            on_event=on_event,
+            journal=journal,
+            progress_rate=args.progress_rate,
+            archive=not args.no_archive,
+            scan_output=args.scan_output,
+            profile_opts=profile_opts,
+            format_limits=format_limits,
+            postprocess={
+                "container": args.container,
+                "audio_format": args.audio_format,
+                "embed_thumbnail": args.embed_thumbnail,
+                "normalize_audio": args.normalize_audio,
+            },
+            postprocess_workers=args.postprocess_workers,
+            metrics=metrics,
+            pipeline=not args.no_pipeline,
+            live={"window": args.live_window * 60 or None} if args.live else None,
+            clip=make_clip(args.section, args.chapter, args.split_chapters, args.precise_cuts),
+            worker_pool=worker_pool,
+        )
+
+    if args.sync:
+        downloader = SubscriptionSync(
+            subscriptions, make_downloader, printer, args.sync_workers
+        )
+    else:
+        downloader = make_downloader(args.output)
+    try:
+        while args.sync:
+            results = downloader.sync()
+            if args.mark_seen:
+                downloader.mark_seen(results)
+                failed = 0
+            else:
+                failed = downloader.download(results)
+            if not args.sync_interval or downloader.cancelled:
+                return 1 if failed else 0
+            time.sleep(args.sync_interval * 60)
+        # Playlists are paged in lazily, so early entries download during enumeration
+        summary = downloader.run(
+            expand_urls(urls, is_cancelled=lambda: downloader.cancelled)
+        )
+    except KeyboardInterrupt:
+        downloader.cancel()
+        return 130
+    except Exception as e:
+        printer({"event": "error", "stage": "extract", "error": str(e)})
+        return 2
+    finally:
+        monitor.stop()
+        if worker_pool is not None:
+            worker_pool.shutdown()
+    return 1 if summary["counts"].get(STATE_FAILED) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
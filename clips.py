@@ -0,0 +1,116 @@
+import re
+import json
+
+_TIMESTAMP_RE = re.compile(r"^(?:(\d+):)?(?:(\d+):)?(\d+(?:\.\d+)?)$")
+
+
+def parse_timestamp(text):
+    """Parses "SS", "MM:SS" or "HH:MM:SS" (fractions allowed) into seconds. Raises ValueError."""
+    match = _TIMESTAMP_RE.match(text.strip())
+    if not match:
+        raise ValueError(f"invalid time: {text!r}")
+    parts = [float(p) for p in match.groups() if p is not None]
+    seconds = 0.0
+    for part in parts:
+        seconds = seconds * 60 + part
+    return seconds
+
+
+def format_timestamp(seconds):
+    if seconds == float("inf"):
+        return "end"
+    seconds = int(seconds)
+    return f"{seconds // 3600:d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def parse_range(text):
+    """
+    Parses a time range such as "1:00-5:30"; either end may be left out ("-5:30"
+    from the start, "1:00-" to the end). Returns [start, end] with end None for
+    the end of the video. Raises ValueError.
+    """
+    start, sep, end = text.partition("-")
+    if not sep:
+        raise ValueError(f"invalid time range: {text!r}")
+    start = parse_timestamp(start) if start.strip() else 0.0
+    end = parse_timestamp(end) if end.strip() else None
+    if end is not None and end <= start:
+        raise ValueError(f"time range ends before it starts: {text!r}")
+    return [start, end]
+
+
+def make_clip(ranges=(), chapters=(), split=False, precise=False):
+    """
+    Returns clip options for download_video(), or None when nothing is selected:
+    ranges are [start, end] pairs in seconds, chapters regular expressions matched
+    against chapter titles. With split, every chapter becomes its own file;
+    otherwise adjacent chapters are joined. precise cuts at the exact times by
+    re-encoding around the cuts instead of at the nearest keyframes.
+    """
+    if not ranges and not chapters:
+        return None
+    return {
+        "ranges": [list(r) for r in ranges],
+        "chapters": list(chapters),
+        "split": bool(split),
+        "precise": bool(precise),
+    }
+
+
+class ClipRanges:
+    """
+    yt-dlp "download_ranges" callable that turns clip options into the sections of
+    a video. yt-dlp then fetches only the parts of the streams covering each
+    section and writes one file per section.
+    """
+
+    def __init__(self, clip):
+        self.clip = clip
+
+    def __repr__(self):
+        return f"ClipRanges({json.dumps(self.clip, sort_keys=True)})"
+
+    def __call__(self, info_dict, ydl=None):
+        return self.sections(info_dict)
+
+    def sections(self, info):
+        """Returns the sections of info as dicts with start_time, end_time, title and index."""
+        duration = info.get("duration") or float("inf")
+        sections = []
+        for start, end in self.clip.get("ranges", []):
+            end = duration if end is None else min(end, duration)
+            title = f"{format_timestamp(start)}-{format_timestamp(end)}".replace(":", ".")
+            sections.append({"start_time": start, "end_time": end, "title": title})
+        patterns = [re.compile(p, re.IGNORECASE) for p in self.clip.get("chapters", [])]
+        if patterns:
+            chapters = [
+                c
+                for c in info.get("chapters") or []
+                if any(p.search(c.get("title") or "") for p in patterns)
+            ]
+            if not chapters:
+                raise ValueError("The video has no chapter matching the selected chapters.")
+            for chapter in chapters:
+                previous = sections[-1] if sections else None
+                if (
+                    not self.clip.get("split")
+                    and previous is not None
+                    and previous.get("chapter")
+                    and abs(previous["end_time"] - chapter["start_time"]) < 0.5
+                ):
+                    # Adjacent chapters become one clip unless split per chapter
+                    previous["end_time"] = chapter["end_time"]
+                    previous["title"] += f" + {chapter.get('title')}"
+                    continue
+                sections.append(
+                    {
+                        "start_time": chapter["start_time"],
+                        "end_time": chapter["end_time"],
+                        "title": chapter.get("title") or "chapter",
+                        "chapter": True,
+                    }
+                )
+        for index, section in enumerate(sections, 1):
+            section["index"] = index
+            section.pop("chapter", None)
+        return sections
@@ -0,0 +1,273 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+
+DEFAULT_STORE_DIR = os.path.join(
+    os.environ.get("XDG_DATA_HOME")
+    or os.path.join(os.path.expanduser("~"), ".local", "share"),
+    "youtube-downloader",
+    "store",
+)
+INDEX_NAME = "index.json"
+LOCK_NAME = "index.lock"
+_FICLONE = 0x40049409  # Linux ioctl that clones a file on copy-on-write filesystems
+
+
+def store_key(info, format_ids, options=None):
+    """
+    Returns the store key of a video downloaded as format_ids (e.g. "137+140"),
+    e.g. "youtube/dQw4w9WgXcQ/137+140/3f2a9c1e". The last part identifies the
+    post-processing options, which change the resulting file.
+    """
+    extractor = (info.get("extractor_key") or info.get("extractor") or "generic").lower()
+    variant = json.dumps(options, sort_keys=True)
+    digest = hashlib.sha1(variant.encode("utf-8")).hexdigest()[:8]
+    return f"{extractor}/{info['id']}/{format_ids}/{digest}"
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _reflink(source, dest):
+    """Clones source to dest sharing its blocks (Btrfs, XFS). Raises OSError if unsupported."""
+    try:
+        import fcntl
+    except ImportError:
+        raise OSError("reflinks are not supported on this platform")
+    with open(source, "rb") as src, open(dest, "wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+        except OSError:
+            dst.close()
+            os.remove(dest)
+            raise
+
+
+def link_file(source, dest):
+    """
+    Makes dest a hardlink of source, or a reflink where hardlinks are impossible
+    (e.g. another filesystem), or else a copy. Returns "hardlink", "reflink" or "copy".
+    """
+    try:
+        os.link(source, dest)
+        return "hardlink"
+    except FileExistsError:
+        raise
+    except OSError:
+        pass
+    try:
+        _reflink(source, dest)
+        return "reflink"
+    except OSError:
+        pass
+    shutil.copy2(source, dest)
+    return "copy"
+
+
+class ContentStore:
+    """
+    Content-addressed store of finished downloads. Each file is kept once under
+    objects/, named by its SHA-256, and index.json maps store keys (video id,
+    format ids and post-processing options, see store_key()) to the object, its
+    file name and the output paths linked to it. Output folders get hardlinks to
+    the objects, so a video in several mirrored playlists is downloaded and stored
+    once. gc() removes objects no output folder refers to any more. Disabled
+    while root is None.
+    """
+
+    def __init__(self, root=None):
+        self.root = os.path.abspath(root) if root else None
+        self.lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.root)
+
+    def set_root(self, root):
+        with self.lock:
+            self.root = os.path.abspath(root) if root else None
+
+    @contextmanager
+    def _locked(self):
+        """Holds the index lock, across processes too where flock is available."""
+        with self.lock:
+            os.makedirs(self.root, exist_ok=True)
+            with open(os.path.join(self.root, LOCK_NAME), "a") as lock_file:
+                try:
+                    import fcntl
+
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)  # Released on close
+                except ImportError:
+                    pass  # Only this process's threads are kept apart
+                yield
+
+    def _object_path(self, digest, ext):
+        return os.path.join(self.root, "objects", digest[:2], digest + ext)
+
+    def _load(self):
+        try:
+            with open(os.path.join(self.root, INDEX_NAME), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logging.warning("Could not read the content store index: %s", e)
+            return {}
+
+    def _save(self, index):
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(index, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, os.path.join(self.root, INDEX_NAME))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def lookup(self, key):
+        """Returns the index entry of key if its object is present and intact in size."""
+        if not self.enabled:
+            return None
+        with self._locked():
+            entry = self._load().get(key)
+        if entry is None:
+            return None
+        try:
+            if os.path.getsize(entry["object"]) == entry["size"]:
+                return entry
+        except OSError:
+            pass
+        return None
+
+    def link(self, key, folder):
+        """
+        Links the stored file of key into folder under its original name. Returns
+        the linked path, or None if key is not stored or another file has that name.
+        """
+        entry = self.lookup(key)
+        if entry is None:
+            return None
+        dest = os.path.join(folder, entry["name"])
+        if os.path.exists(dest):
+            if not _refers_to(dest, entry):
+                return None
+            method = "existing"
+        else:
+            os.makedirs(folder, exist_ok=True)
+            method = link_file(entry["object"], dest)
+        self._add_link(key, dest)
+        logging.info("Linked %s from the content store (%s)", dest, method)
+        return dest
+
+    def add(self, key, path):
+        """
+        Stores the finished file at path under key and leaves path as a hardlink
+        to the stored object. A file whose content is already stored is replaced
+        by a link to the existing object.
+        """
+        if not self.enabled:
+            return
+        digest = file_sha256(path)
+        size = os.path.getsize(path)
+        obj = self._object_path(digest, os.path.splitext(path)[1])
+        with self._locked():
+            os.makedirs(os.path.dirname(obj), exist_ok=True)
+            if not os.path.exists(obj):
+                link_file(path, obj)
+            elif not os.path.samefile(path, obj):
+                # Same content under another key: keep one copy on disk
+                tmp_path = f"{path}.store.tmp"
+                link_file(obj, tmp_path)
+                os.replace(tmp_path, path)
+            index = self._load()
+            previous = index.get(key)
+            links = previous["links"] if previous and previous["object"] == obj else []
+            if os.path.abspath(path) not in links:
+                links.append(os.path.abspath(path))
+            index[key] = {
+                "object": obj,
+                "sha256": digest,
+                "size": size,
+                "name": os.path.basename(path),
+                "stored": round(time.time()),
+                "links": links,
+            }
+            self._save(index)
+
+    def _add_link(self, key, path):
+        with self._locked():
+            index = self._load()
+            entry = index.get(key)
+            if entry is None:
+                return
+            path = os.path.abspath(path)
+            if path not in entry["links"]:
+                entry["links"].append(path)
+                self._save(index)
+
+    def gc(self, verify=False):
+        """
+        Removes objects that no output path refers to any more, and index entries
+        whose object is gone. With verify, objects whose checksum no longer matches
+        are removed too. Returns {"objects", "removed", "freed", "corrupt"}.
+        """
+        if not self.enabled:
+            return {"objects": 0, "removed": 0, "freed": 0, "corrupt": 0}
+        with self._locked():
+            index = self._load()
+            corrupt = set()
+            if verify:
+                for entry in index.values():
+                    obj = entry["object"]
+                    if obj not in corrupt and os.path.exists(obj):
+                        if file_sha256(obj) != entry["sha256"]:
+                            logging.warning("Content store object %s is corrupt", obj)
+                            corrupt.add(obj)
+            live = set()
+            for key, entry in list(index.items()):
+                entry["links"] = [p for p in entry["links"] if _refers_to(p, entry)]
+                if not entry["links"] or entry["object"] in corrupt:
+                    del index[key]
+                elif os.path.exists(entry["object"]):
+                    live.add(entry["object"])
+                else:
+                    del index[key]
+            removed = freed = 0
+            objects_dir = os.path.join(self.root, "objects")
+            for dirpath, _, names in os.walk(objects_dir):
+                for name in names:
+                    obj = os.path.join(dirpath, name)
+                    if obj in live:
+                        continue
+                    try:
+                        size = os.path.getsize(obj)
+                        os.remove(obj)
+                    except OSError as e:
+                        logging.warning("Could not remove %s: %s", obj, e)
+                        continue
+                    removed += 1
+                    freed += size
+            self._save(index)
+        return {"objects": len(live), "removed": removed, "freed": freed, "corrupt": len(corrupt)}
+
+
+def _refers_to(path, entry):
+    """Whether path still holds the stored object: a hardlink, or a reflink/copy of equal size."""
+    try:
+        if os.path.samefile(path, entry["object"]):
+            return True
+        return os.path.getsize(path) == entry["size"]
+    except OSError:
+        return False
@@ -0,0 +1,230 @@
+import os
+import time
+import logging
+import threading
+from collections import namedtuple
+from http.cookiejar import Cookie
+
+DEFAULT_COOKIE_PATH = os.path.join(os.path.expanduser("~"), "Downloads", "cookies.txt")
+CHECK_INTERVAL = 2.0  # Seconds between checks of the file by the watcher thread
+EXPIRY_WARNING = 3 * 24 * 3600  # Warn when the sign-in expires sooner than this
+
+# Cookies of a YouTube sign-in; which ones are present varies between exports
+AUTH_COOKIES = (
+    "SID",
+    "HSID",
+    "SSID",
+    "APISID",
+    "SAPISID",
+    "__Secure-1PSID",
+    "__Secure-3PSID",
+    "LOGIN_INFO",
+)
+AUTH_DOMAIN = "youtube.com"
+
+# Cookie file states
+COOKIES_OK = "ok"
+COOKIES_EXPIRING = "expiring"  # Signed in, but the sign-in expires soon
+COOKIES_EXPIRED = "expired"
+COOKIES_NO_AUTH = "no_auth"  # Readable, but without YouTube sign-in cookies
+COOKIES_MISSING = "missing"
+COOKIES_INVALID = "invalid"  # Unreadable or not a Netscape cookie file
+# States in which downloads of restricted videos will fail
+COOKIE_PROBLEMS = (COOKIES_EXPIRED, COOKIES_NO_AUTH, COOKIES_MISSING, COOKIES_INVALID)
+
+# state, a message for the user, and when the sign-in expires (epoch seconds or None)
+CookieStatus = namedtuple("CookieStatus", "state message expires")
+
+
+def parse_cookie_file(path):
+    """
+    Parses a Netscape/Mozilla cookies.txt file (as exported by browser extensions)
+    into a list of http.cookiejar.Cookie, including the #HttpOnly_ lines the
+    standard library skips. Raises ValueError if the file has no cookie lines.
+    """
+    cookies = []
+    malformed = 0
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.rstrip("\r\n")
+            http_only = line.startswith("#HttpOnly_")
+            if http_only:
+                line = line[len("#HttpOnly_") :]
+            elif not line.strip() or line.startswith("#"):
+                continue
+            fields = line.split("\t")
+            if len(fields) != 7:
+                malformed += 1
+                continue
+            domain, subdomains, path, secure, expires, name, value = fields
+            try:
+                expires = int(float(expires)) or None  # 0 marks a session cookie
+            except ValueError:
+                malformed += 1
+                continue
+            cookies.append(
+                Cookie(
+                    version=0,
+                    name=name,
+                    value=value,
+                    port=None,
+                    port_specified=False,
+                    domain=domain,
+                    domain_specified=subdomains.upper() == "TRUE",
+                    domain_initial_dot=domain.startswith("."),
+                    path=path,
+                    path_specified=True,
+                    secure=secure.upper() == "TRUE",
+                    expires=expires,
+                    discard=expires is None,
+                    comment=None,
+                    comment_url=None,
+                    rest={"HttpOnly": None} if http_only else {},
+                )
+            )
+    if malformed and not cookies:
+        raise ValueError("not a Netscape cookies.txt file")
+    if malformed:
+        logging.warning("Skipped %d malformed lines in %s", malformed, path)
+    return cookies
+
+
+def validate_cookies(cookies, now=None):
+    """Returns the CookieStatus of parsed cookies, judged by their YouTube sign-in cookies."""
+    now = time.time() if now is None else now
+    auth = [
+        c
+        for c in cookies
+        if c.name in AUTH_COOKIES and c.domain.lstrip(".").endswith(AUTH_DOMAIN)
+    ]
+    if not auth:
+        return CookieStatus(
+            COOKIES_NO_AUTH, "The cookies file has no YouTube sign-in cookies.", None
+        )
+    expired = sorted(c.name for c in auth if c.expires is not None and c.expires <= now)
+    if expired:
+        return CookieStatus(
+            COOKIES_EXPIRED,
+            f"The YouTube sign-in cookies have expired ({', '.join(expired)}).",
+            min(c.expires for c in auth if c.expires is not None),
+        )
+    expiries = [c.expires for c in auth if c.expires is not None]
+    expires = min(expiries) if expiries else None
+    if expires is not None and expires - now < EXPIRY_WARNING:
+        hours = (expires - now) / 3600
+        return CookieStatus(
+            COOKIES_EXPIRING, f"The YouTube sign-in expires in {hours:.0f} hours.", expires
+        )
+    return CookieStatus(COOKIES_OK, "Signed in to YouTube.", expires)
+
+
+class CookieManager:
+    """
+    Parses the cookies file once and shares the result with every YoutubeDL
+    instance, instead of each instance re-reading it. The file is reloaded when
+    its modification time or size changes; a watcher thread (start_watching())
+    does that and re-validates expiry in the background, so status() can be read
+    from the GUI thread without touching the disk. Listeners are called from the
+    watcher thread with the new CookieStatus whenever the file is reloaded or its
+    state changes.
+    """
+
+    def __init__(self, path=DEFAULT_COOKIE_PATH, check_interval=CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self.lock = threading.Lock()
+        self.cookies = []
+        self.generation = 0  # Incremented on every reload
+        self.signature = None  # (mtime_ns, size) of the loaded file
+        self.current = None  # CookieStatus of the loaded file
+        self.listeners = []
+        self.stop_event = threading.Event()
+        self.watcher = None
+
+    def refresh(self):
+        """Reloads the file if it changed and re-validates expiry. Returns the status."""
+        try:
+            stat = os.stat(self.path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signature = None
+        with self.lock:
+            previous = self.current
+            reload = previous is None or signature != self.signature
+        if reload:
+            cookies = []
+            if signature is None:
+                status = CookieStatus(
+                    COOKIES_MISSING, f"The cookies file was not found at {self.path}.", None
+                )
+            else:
+                try:
+                    cookies = parse_cookie_file(self.path)
+                    status = validate_cookies(cookies)
+                except (OSError, ValueError) as e:
+                    status = CookieStatus(
+                        COOKIES_INVALID, f"The cookies file could not be read: {e}", None
+                    )
+            with self.lock:
+                self.cookies = cookies
+                self.signature = signature
+                self.generation += 1
+                self.current = status
+            logging.debug("Loaded %d cookies from %s: %s", len(cookies), self.path, status)
+        elif previous.state in (COOKIES_OK, COOKIES_EXPIRING):
+            # Unchanged file: only the passing time can change its state
+            status = validate_cookies(self.cookies)
+            with self.lock:
+                self.current = status
+        else:
+            status = previous
+        if reload or status.state != previous.state:
+            for listener in list(self.listeners):
+                listener(status)
+        return status
+
+    def status(self):
+        """Returns the last CookieStatus; loads the file only if it was never loaded."""
+        with self.lock:
+            current = self.current
+        return current if current is not None else self.refresh()
+
+    def install(self, cookiejar, generation=None):
+        """
+        Copies the parsed cookies into a YoutubeDL cookie jar, unless the jar was
+        already filled from the current generation. Returns the generation to pass
+        next time.
+        """
+        if self.current is None:
+            self.refresh()
+        with self.lock:
+            cookies, current = list(self.cookies), self.generation
+        if generation == current:
+            return current
+        cookiejar.clear()
+        for cookie in cookies:
+            cookiejar.set_cookie(cookie)
+        return current
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def start_watching(self):
+        if self.watcher is not None:
+            return
+        self.stop_event.clear()
+
+        def watch():
+            while not self.stop_event.is_set():
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logging.error("Error checking the cookies file: %s", e)
+                self.stop_event.wait(self.check_interval)
+
+        self.watcher = threading.Thread(target=watch, name="cookie-watcher", daemon=True)
+        self.watcher.start()
+
+    def stop_watching(self):
+        self.stop_event.set()
+        self.watcher = None
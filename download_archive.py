@@ -0,0 +1,113 @@
+import os
+import re
+from urllib.parse import urlparse, parse_qs
+
+ARCHIVE_FILE_NAME = "download_archive.txt"
+
+_YOUTUBE_ID_RE = re.compile(r"(?:youtu\.be/|/shorts/|/live/|/embed/)([\w-]{11})")
+_BRACKETED_ID_RE = re.compile(r"\[([\w-]{11})\]")
+_HEIGHT_SUFFIX_RE = re.compile(r"_(?:\d+|NA|None)p$")
+_PARTIAL_SUFFIXES = (".part", ".ytdl", ".tmp", ".temp")
+_YOUTUBE_DOMAINS = ("youtube.com", "youtu.be")
+
+
+def archive_path_for(output_path):
+    """Returns the archive file kept in an output folder."""
+    return os.path.join(output_path, ARCHIVE_FILE_NAME)
+
+
+def archive_id_for_url(url):
+    """
+    Returns the yt-dlp archive id ("<extractor> <video id>") for a URL without any
+    network access, or None if it cannot be derived from the URL alone.
+    """
+    parsed = urlparse(url)
+    host = (parsed.hostname or "").lower()
+    # The domains themselves or their subdomains (www., m.), never e.g. notyoutube.com
+    if not any(host == domain or host.endswith("." + domain) for domain in _YOUTUBE_DOMAINS):
+        return None
+    video_id = parse_qs(parsed.query).get("v", [None])[0]
+    if not video_id:
+        match = _YOUTUBE_ID_RE.search(url)
+        video_id = match.group(1) if match else None
+    return f"youtube {video_id}" if video_id else None
+
+
+def normalize_title(title):
+    """Reduces a title or file name to lowercase letters and digits for loose matching."""
+    return "".join(ch for ch in title.casefold() if ch.isalnum())
+
+
+class DownloadArchive:
+    """
+    Set of downloaded videos in yt-dlp's download_archive format: one
+    "<extractor> <video id>" line per video. yt-dlp appends to the same file
+    when it is passed as the download_archive option, so this class only reads it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.ids = set()
+        self.load()
+
+    def load(self):
+        self.ids.clear()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        self.ids.add(line)
+        except OSError:
+            pass
+
+    def __contains__(self, archive_id):
+        return archive_id in self.ids
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class FolderIndex:
+    """
+    Index of the media files already in an output folder: video ids in [brackets]
+    and normalized titles with the _<height>p suffix used by the output template removed.
+    """
+
+    def __init__(self, folder):
+        self.ids = set()
+        self.titles = set()
+        try:
+            names = os.listdir(folder)
+        except OSError:
+            names = []
+        for name in names:
+            if name.endswith(_PARTIAL_SUFFIXES) or name == ARCHIVE_FILE_NAME:
+                continue
+            stem = os.path.splitext(name)[0]
+            for video_id in _BRACKETED_ID_RE.findall(stem):
+                self.ids.add(f"youtube {video_id}")
+            title = normalize_title(_HEIGHT_SUFFIX_RE.sub("", stem))
+            if title:
+                self.titles.add(title)
+
+    def contains(self, archive_id=None, title=None):
+        if archive_id and archive_id in self.ids:
+            return True
+        return bool(title) and normalize_title(title) in self.titles
+
+
+class ArchiveFilter:
+    """Decides, before any extraction, whether a video was already downloaded."""
+
+    def __init__(self, output_path, use_archive=True, scan_folder=False):
+        self.archive = DownloadArchive(archive_path_for(output_path)) if use_archive else None
+        self.folder_index = FolderIndex(output_path) if scan_folder else None
+
+    def is_downloaded(self, url, title=None):
+        archive_id = archive_id_for_url(url)
+        if self.archive is not None and archive_id and archive_id in self.archive:
+            return True
+        if self.folder_index is not None:
+            return self.folder_index.contains(archive_id, title)
+        return False
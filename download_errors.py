@@ -0,0 +1,199 @@
+import re
+import random
+from collections import namedtuple
+
+# Error kinds
+ERROR_AUTH = "auth"  # Sign-in required, private video, expired cookies
+# HTTP 403 with no sign-in message: usually an expired or throttled stream URL
+ERROR_FORBIDDEN = "forbidden"
+ERROR_GEO = "geo"  # Not available in this country
+ERROR_REMOVED = "removed"  # Deleted, terminated account, 404/410
+ERROR_THROTTLED = "throttled"  # HTTP 429 or the site rate-limiting this client
+ERROR_NETWORK = "network"  # Timeouts, resets, DNS failures, 5xx responses
+ERROR_FFMPEG = "ffmpeg"  # Merging or conversion failed
+ERROR_UNKNOWN = "unknown"
+
+# job_retries: whole-download attempts after the first one, waiting an exponential
+# backoff between base_delay and max_delay seconds (with jitter). Permanent kinds
+# have no job retries. Fragment and HTTP retries inside one attempt are handled
+# by yt-dlp with FRAGMENT_RETRIES/HTTP_RETRIES and retry_sleep().
+RetryPolicy = namedtuple("RetryPolicy", "job_retries base_delay max_delay")
+RETRY_POLICIES = {
+    ERROR_AUTH: RetryPolicy(0, 0, 0),
+    ERROR_GEO: RetryPolicy(0, 0, 0),
+    ERROR_REMOVED: RetryPolicy(0, 0, 0),
+    ERROR_FFMPEG: RetryPolicy(0, 0, 0),
+    ERROR_FORBIDDEN: RetryPolicy(2, 5, 30),
+    ERROR_THROTTLED: RetryPolicy(4, 30, 300),
+    ERROR_NETWORK: RetryPolicy(5, 2, 60),
+    ERROR_UNKNOWN: RetryPolicy(1, 5, 5),
+}
+PERMANENT_ERRORS = (ERROR_AUTH, ERROR_GEO, ERROR_REMOVED, ERROR_FFMPEG)
+
+HTTP_RETRIES = 5
+FRAGMENT_RETRIES = 10
+EXTRACTOR_RETRIES = 3
+
+# What the user can do about each kind, for error dialogs
+ERROR_HINTS = {
+    ERROR_AUTH: "The video requires signing in, or the cookies are expired or invalid.",
+    ERROR_FORBIDDEN: "The site refused the video stream. This usually passes; if it "
+    "keeps happening, export fresh cookies.",
+    ERROR_GEO: "The video is not available in your country.",
+    ERROR_REMOVED: "The video was removed, made private, or its account was terminated.",
+    ERROR_THROTTLED: "The site is rate-limiting downloads. Lower the speed or "
+    "downloads-per-site limit and try again later.",
+    ERROR_NETWORK: "The connection failed repeatedly. Check your network connection.",
+    ERROR_FFMPEG: "Merging or converting the download failed. Check that FFmpeg is "
+    "installed and up to date.",
+}
+
+# yt-dlp exception class names, checked along the exception chain
+_CLASS_KINDS = {
+    "GeoRestrictedError": ERROR_GEO,
+    "PostProcessingError": ERROR_FFMPEG,
+    "FFmpegPostProcessorError": ERROR_FFMPEG,
+    "TransportError": ERROR_NETWORK,
+    "IncompleteRead": ERROR_NETWORK,
+    "ContentTooShortError": ERROR_NETWORK,
+    "ConnectionError": ERROR_NETWORK,
+    "TimeoutError": ERROR_NETWORK,
+    "timeout": ERROR_NETWORK,
+}
+
+# Messages showing that a refusal (e.g. an HTTP 403) is about signing in
+_SIGN_IN = (
+    r"sign in to confirm|private video|members.only|login required|cookies|"
+    r"http error 401|unauthorized|authenticat"
+)
+_SIGN_IN_RE = re.compile(_SIGN_IN, re.IGNORECASE)
+
+# Fallback for errors that only survive as text (yt-dlp reports most extractor
+# errors as ExtractorError with a message); the first matching pattern wins
+_MESSAGE_KINDS = [
+    (ERROR_GEO, r"available (?:in|from) your (?:country|location)|geo.?restrict"),
+    (ERROR_THROTTLED, r"http error 429|too many requests|rate.?limit"),
+    (ERROR_AUTH, _SIGN_IN),
+    (ERROR_FORBIDDEN, r"http error 403|forbidden"),
+    (
+        ERROR_REMOVED,
+        r"video unavailable|has been removed|no longer available|account .* terminated|"
+        r"http error 404|http error 410|does not exist",
+    ),
+    (ERROR_FFMPEG, r"ffmpeg|ffprobe|postprocessing|merging of multiple formats"),
+    (
+        ERROR_NETWORK,
+        r"timed? ?out|connection (?:reset|refused|aborted)|name resolution|"
+        r"network is unreachable|incompleteread|http error 5\d\d|eof occurred",
+    ),
+]
+_MESSAGE_RES = [(kind, re.compile(p, re.IGNORECASE)) for kind, p in _MESSAGE_KINDS]
+
+
+class ClassifiedError(Exception):
+    """A download or extraction failure with its kind (one of the ERROR_* constants)."""
+
+    def __init__(self, message, kind=ERROR_UNKNOWN):
+        super().__init__(message)
+        self.kind = kind
+
+    def __reduce__(self):
+        # Keeps the kind when the error is passed back from a worker process
+        return (type(self), (str(self), self.kind))
+
+    @property
+    def permanent(self):
+        return self.kind in PERMANENT_ERRORS
+
+
+def _exception_chain(error):
+    """Yields error and the exceptions it wraps (yt-dlp's exc_info, causes, contexts)."""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        yield error
+        exc_info = getattr(error, "exc_info", None)
+        if isinstance(exc_info, tuple) and len(exc_info) > 1 and exc_info[1] is not error:
+            error = exc_info[1]
+        else:
+            error = error.__cause__ or error.__context__
+
+
+def _http_status(error):
+    for attribute in ("status", "code"):
+        status = getattr(error, attribute, None)
+        if isinstance(status, int) and 100 <= status < 600:
+            return status
+    response = getattr(error, "response", None)
+    status = getattr(response, "status", None)
+    return status if isinstance(status, int) else None
+
+
+def _kind_for_status(status):
+    if status == 429:
+        return ERROR_THROTTLED
+    if status == 401:
+        return ERROR_AUTH
+    if status == 403:
+        return ERROR_FORBIDDEN
+    if status in (404, 410):
+        return ERROR_REMOVED
+    if status >= 500:
+        return ERROR_NETWORK
+    return None
+
+
+def classify_error(error):
+    """
+    Returns the kind of an exception or error message. Exceptions are classified
+    by their type and HTTP status along the wrapped exception chain first, and by
+    their message only when that is inconclusive. A 403 counts as ERROR_AUTH only
+    when a message in the chain is about signing in.
+    """
+    if isinstance(error, ClassifiedError):
+        return error.kind
+    if isinstance(error, BaseException):
+        kind = _chain_kind(error)
+        if kind == ERROR_FORBIDDEN and any(
+            _SIGN_IN_RE.search(str(exc)) for exc in _exception_chain(error)
+        ):
+            return ERROR_AUTH
+        if kind is not None:
+            return kind
+    message = str(error)
+    for kind, pattern in _MESSAGE_RES:
+        if pattern.search(message):
+            return kind
+    return ERROR_UNKNOWN
+
+
+def _chain_kind(error):
+    """Returns the kind given by the first HTTP status or known type in error's chain."""
+    for exc in _exception_chain(error):
+        status = _http_status(exc)
+        kind = _kind_for_status(status) if status else None
+        if kind is None:
+            kind = next(
+                (
+                    _CLASS_KINDS[cls.__name__]
+                    for cls in type(exc).__mro__
+                    if cls.__name__ in _CLASS_KINDS
+                ),
+                None,
+            )
+        if kind is not None:
+            return kind
+    return None
+
+
+def backoff_delay(attempt, base_delay, max_delay):
+    """Exponential backoff with jitter for the given (0-based) retry attempt."""
+    return random.uniform(base_delay / 2, min(max_delay, base_delay * 2**attempt))
+
+
+def retry_sleep(n):
+    """
+    Seconds yt-dlp waits before its n-th (0-based) HTTP, fragment or extractor
+    retry. yt-dlp passes n by keyword, so the parameter name is fixed.
+    """
+    return backoff_delay(n, 1, 30)
@@ -0,0 +1,179 @@
+import os
+import json
+import time
+import uuid
+import logging
+import tempfile
+import threading
+
+DEFAULT_JOURNAL_PATH = "download_journal.jsonl"
+
+# Entry statuses that need no further work when a run is resumed
+COMPLETE_STATUSES = ("done",)
+
+
+class DownloadJournal:
+    """
+    Append-only JSONL record of a download run. Every line is a self-contained
+    event, written with a single append and fsync, so a crash loses at most the
+    line being written. replay() folds the events back into per-entry state,
+    matching updates to entries by URL.
+    """
+
+    def __init__(self, path=DEFAULT_JOURNAL_PATH):
+        self.path = path
+        self.run_id = None
+        self.lock = threading.Lock()
+
+    def start_run(self, entries, quality_format, output_path):
+        """
+        Begins a new run. entries is a list of dicts with index, url and title.
+        The previous run is dropped by atomically replacing the journal file.
+        """
+        self.run_id = uuid.uuid4().hex
+        lines = [
+            {
+                "event": "run",
+                "run": self.run_id,
+                "time": time.time(),
+                "quality": quality_format,
+                "output": output_path,
+            }
+        ]
+        for entry in entries:
+            lines.append(
+                {
+                    "event": "entry",
+                    "run": self.run_id,
+                    "index": entry["index"],
+                    "url": entry["url"],
+                    "title": entry.get("title", ""),
+                    "status": "queued",
+                }
+            )
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            with self.lock:
+                fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    for line in lines:
+                        f.write(json.dumps(line) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.error("Could not start download journal: %s", e)
+        return self.run_id
+
+    def resume_run(self, run_id):
+        """Continues appending to a run found by replay()."""
+        self.run_id = run_id
+        # Terminate a torn final line so the next record starts on its own line
+        try:
+            with open(self.path, "rb+") as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell():
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        f.write(b"\n")
+        except OSError:
+            pass
+
+    def add_entries(self, entries):
+        """Appends entries discovered after the run started, e.g. from a streamed playlist."""
+        self._append(
+            *[
+                {
+                    "event": "entry",
+                    "run": self.run_id,
+                    "index": entry["index"],
+                    "url": entry["url"],
+                    "title": entry.get("title", ""),
+                    "status": "queued",
+                }
+                for entry in entries
+            ]
+        )
+
+    def record(self, index, url, status=None, filename=None, bytes_done=None):
+        """Appends a status, output file and/or byte count update for one entry."""
+        line = {"event": "update", "run": self.run_id, "index": index, "url": url}
+        if status is not None:
+            line["status"] = status
+        if filename is not None:
+            line["filename"] = filename
+        if bytes_done is not None:
+            line["bytes"] = bytes_done
+        self._append(line)
+
+    def close_run(self):
+        """Marks the current run as finished or abandoned so it is not offered for resume."""
+        self._append({"event": "closed", "run": self.run_id})
+
+    def _append(self, *lines):
+        if self.run_id is None or not lines:
+            return
+        data = "".join(json.dumps(line) + "\n" for line in lines).encode("utf-8")
+        try:
+            with self.lock:
+                fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, data)
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+        except OSError as e:
+            logging.error("Could not append to download journal: %s", e)
+
+    def replay(self):
+        """
+        Folds the journal into the state of its last run. Returns None if there is
+        no open run, otherwise a dict with run, quality, output and an ordered list
+        of entries (index, url, title, status, filename, bytes).
+        """
+        run = None
+        entries = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for raw in f:
+                    try:
+                        line = json.loads(raw)
+                    except ValueError:
+                        continue  # A torn final line from a crash mid-write
+                    event = line.get("event")
+                    if event == "run":
+                        run = dict(line)
+                        entries = {}
+                    elif run is None or line.get("run") != run["run"]:
+                        continue
+                    elif event == "entry":
+                        entries[line["url"]] = {
+                            "index": line["index"],
+                            "url": line["url"],
+                            "title": line.get("title", ""),
+                            "status": line.get("status", "queued"),
+                            "filename": None,
+                            "bytes": 0,
+                        }
+                    elif event == "update" and line.get("url") in entries:
+                        entry = entries[line["url"]]
+                        entry["status"] = line.get("status", entry["status"])
+                        entry["filename"] = line.get("filename", entry["filename"])
+                        entry["bytes"] = line.get("bytes", entry["bytes"])
+                    elif event == "closed":
+                        run = None
+                        entries = {}
+        except OSError:
+            return None
+        if run is None:
+            return None
+        run["entries"] = sorted(entries.values(), key=lambda e: e["index"])
+        return run
+
+    def incomplete(self):
+        """Returns (run, entries) for the entries of the last open run still to download."""
+        run = self.replay()
+        if run is None:
+            return None, []
+        pending = [e for e in run["entries"] if e["status"] not in COMPLETE_STATUSES]
+        return run, pending
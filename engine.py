@@ -0,0 +1,1241 @@
+import os
+import re
+import copy
+import time
+import logging
+import threading
+import itertools
+from collections import deque, namedtuple
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from metadata_cache import MetadataCache
+from download_archive import ArchiveFilter, archive_path_for
+from ydl_pool import YoutubeDLPool
+from cookie_manager import COOKIE_PROBLEMS, COOKIES_MISSING, CookieManager
+from content_store import ContentStore, store_key
+from bandwidth import BandwidthGovernor
+from download_errors import (
+    ERROR_AUTH,
+    ERROR_FORBIDDEN,
+    EXTRACTOR_RETRIES,
+    FRAGMENT_RETRIES,
+    HTTP_RETRIES,
+    RETRY_POLICIES,
+    ClassifiedError,
+    backoff_delay,
+    classify_error,
+    retry_sleep,
+)
+from format_selector import limits_for_quality, select_formats
+from postprocess import (
+    DEFAULT_POSTPROCESS,
+    DEFAULT_POSTPROCESS_WORKERS,
+    PostProcessPool,
+    ffmpeg_available,
+    output_stem,
+    postprocess_files,
+)
+from clips import ClipRanges
+from live_capture import UPCOMING_POLL, LiveRecorder, is_live_info, live_format
+from telemetry import JobMetrics, summarize
+
+# Quality presets as (label, yt-dlp format) pairs, shared by the GUI and the CLI
+QUALITY_PRESETS = [
+    ("Low 144p", "best[height<=144]"),
+    ("Low 240p", "best[height<=240]"),
+    ("Medium 360p", "best[height<=360]"),
+    ("Medium 480p", "best[height<=480]"),
+    ("High 720p", "best[height<=720]"),
+    ("High 1080p", "best[height<=1080]"),
+    ("Audio Only", "bestaudio"),
+    ("Best Quality", "best"),
+]
+DEFAULT_QUALITY = "best[height<=720]"
+
+# Download performance profiles as (label, extra yt-dlp options). More can be
+# added under "download_profiles" in config.json; see load_download_profiles().
+DOWNLOAD_PROFILES = [
+    ("Standard", {}),
+    (
+        "Fast (4 fragments)",
+        {
+            "concurrent_fragment_downloads": 4,
+            "http_chunk_size": 10 * 1024 * 1024,
+            "buffersize": 1024 * 1024,
+        },
+    ),
+    (
+        "Maximum (8 fragments)",
+        {
+            "concurrent_fragment_downloads": 8,
+            "http_chunk_size": 10 * 1024 * 1024,
+            "buffersize": 4 * 1024 * 1024,
+        },
+    ),
+    (
+        "aria2c (16 connections)",
+        {
+            "external_downloader": {"default": "aria2c"},
+            "external_downloader_args": {
+                "aria2c": ["-x", "16", "-s", "16", "-k", "1M", "--file-allocation=none"]
+            },
+        },
+    ),
+    ("Limited (2 MB/s)", {"ratelimit": 2 * 1024 * 1024}),
+]
+DEFAULT_PROFILE = "Standard"
+# Option names a profile may set
+PROFILE_OPTIONS = (
+    "concurrent_fragment_downloads",
+    "http_chunk_size",
+    "buffersize",
+    "ratelimit",
+    "external_downloader",
+    "external_downloader_args",
+)
+
+# Per-entry download states
+STATE_QUEUED = "queued"
+STATE_RUNNING = "running"
+STATE_PROCESSING = "processing"  # Downloaded, waiting for or in post-processing
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+STATE_SKIPPED = "skipped"
+
+DEFAULT_MAX_WORKERS = 3
+DEFAULT_STREAM_BATCH = 50  # Playlist entries per batch when streaming extraction
+DEFAULT_PROGRESS_RATE = 10  # Progress updates per second per download
+PIPELINE_WORKERS = 2  # Look-ahead extractions running at the same time
+
+# Compact, fixed-shape progress update passed across threads instead of the
+# full yt-dlp status dict
+ProgressRecord = namedtuple(
+    "ProgressRecord",
+    "index status downloaded_bytes total_bytes speed eta filename",
+)
+
+_FORMAT_PAIR_RE = re.compile(r"^[\w-]+(\+[\w-]+)+$")
+
+# Results of the format selection made during extraction; dropped from prefetched
+# info so the download selects formats with its own options
+_SELECTION_KEYS = (
+    "requested_formats",
+    "requested_downloads",
+    "requested_subtitles",
+    "filepath",
+    "_filename",
+    "filename",
+)
+
+# Shared on-disk cache of extract_info results
+metadata_cache = MetadataCache()
+
+# Optional store that keeps each finished video once and links it into output
+# folders; disabled until a root folder is set
+content_store = ContentStore()
+
+# Parsed cookies.txt, watched for changes and shared by every YoutubeDL instance
+cookie_manager = CookieManager()
+
+# Shared YoutubeDL instances, reused across downloads and metadata fetches
+ydl_pool = YoutubeDLPool(cookies=cookie_manager)
+
+# Combined rate limit and per-site download slots shared by every download
+bandwidth_governor = BandwidthGovernor()
+
+
+class DownloadCancelled(Exception):
+    """Raised from the progress hook to cooperatively stop a download."""
+
+
+def load_yt_dlp():
+    """
+    Imports yt_dlp on first use. It pulls in hundreds of extractor modules, so it
+    is kept off the startup path; call this from a background thread to warm up.
+    """
+    import yt_dlp
+
+    return yt_dlp
+
+
+class ProgressCoalescer:
+    """
+    Turns yt-dlp progress hook calls into ProgressRecords delivered to emit at no
+    more than rate updates per second. Intermediate "downloading" updates are
+    dropped; "finished" updates are always delivered immediately.
+    """
+
+    def __init__(self, index, emit, rate=DEFAULT_PROGRESS_RATE):
+        self.index = index
+        self.emit = emit
+        self.interval = 1.0 / rate if rate and rate > 0 else 0
+        self.last_emit = 0.0
+
+    def __call__(self, d):
+        status = d.get("status")
+        now = time.monotonic()
+        if status == "downloading" and now - self.last_emit < self.interval:
+            return
+        self.last_emit = now
+        self.emit(
+            ProgressRecord(
+                self.index,
+                status,
+                d.get("downloaded_bytes") or 0,
+                d.get("total_bytes") or d.get("total_bytes_estimate") or 0,
+                d.get("speed") or 0,
+                d.get("eta"),
+                d.get("filename"),
+            )
+        )
+
+
+def get_cookie_file_path():
+    """Returns the absolute path of the cookies.txt file located in the Downloads folder."""
+    return cookie_manager.path
+
+
+def check_cookies_exist():
+    """
+    Check if cookies.txt file exists and warn the user if it doesn't. Uses the
+    cookie manager's last check, so it does no file access once it is watching.
+    """
+    status = cookie_manager.status()
+    if status.state == COOKIES_MISSING:
+        logging.warning(f"Cookies file not found at: {cookie_manager.path}")
+        return False
+    logging.debug(f"Cookies file found at: {cookie_manager.path} ({status.state})")
+    return True
+
+
+def cookie_problem():
+    """Returns the CookieStatus if the cookies will not get past a sign-in check, else None."""
+    status = cookie_manager.status()
+    return status if status.state in COOKIE_PROBLEMS else None
+
+
+def load_download_profiles(custom=None):
+    """
+    Returns DOWNLOAD_PROFILES followed by custom profiles ({label: options}, e.g.
+    from config.json). Unknown option names are dropped with a warning.
+    """
+    profiles = list(DOWNLOAD_PROFILES)
+    for label, options in (custom or {}).items():
+        unknown = set(options) - set(PROFILE_OPTIONS)
+        if unknown:
+            logging.warning(
+                "Ignoring unknown options %s in download profile %s", sorted(unknown), label
+            )
+        profiles.append(
+            (label, {key: value for key, value in options.items() if key in PROFILE_OPTIONS})
+        )
+    return profiles
+
+
+def profile_options_for(label, profiles=DOWNLOAD_PROFILES):
+    """Returns the yt-dlp options of a profile label (case-insensitive), or None."""
+    for profile_label, options in profiles:
+        if profile_label.lower() == label.strip().lower():
+            return options
+    return None
+
+
+def quality_format_for(preset):
+    """Returns the yt-dlp format for a preset label (case-insensitive), or None."""
+    for label, quality_format in QUALITY_PRESETS:
+        if label.lower() == preset.strip().lower():
+            return quality_format
+    return None
+
+
+def build_info_opts():
+    """Returns the yt-dlp options used for metadata extraction."""
+    return {
+        "skip_download": True,
+        "quiet": True,
+        # No cookiefile: ydl_pool fills each instance's jar from cookie_manager
+        "extractor_args": {"youtube": {"player_client": ["web"]}},
+        "ignoreerrors": True,
+        "nocheckcertificate": True,
+        "extractor_retries": EXTRACTOR_RETRIES,
+        "retry_sleep_functions": {"extractor": retry_sleep},
+        "js_runtimes": {"node": {}},
+    }
+
+
+def extract_video_info(url, flat=False, use_cache=True):
+    """
+    Runs yt-dlp extraction for a video or playlist URL and returns a JSON-safe info dict.
+    Results are served from and stored in metadata_cache. Raises on failure.
+    """
+    flat = flat and "list=" in url
+    if use_cache:
+        info = metadata_cache.get(url, flat)
+        if info is not None:
+            return info
+    ydl_opts = build_info_opts()
+    if flat:
+        ydl_opts["extract_flat"] = True
+    else:
+        ydl_opts["ignoreerrors"] = False  # Raise the real error so it can be classified
+    yt_dlp = load_yt_dlp()
+    try:
+        with ydl_pool.lease(ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=False)
+    except Exception as e:
+        raise ClassifiedError(str(e), classify_error(e)) from e
+    if info is None:
+        raise Exception(
+            "No information could be extracted. The video may be unavailable, private, or requires authentication."
+        )
+    if info.get("_type") == "playlist" or "entries" in info:
+        pass
+    elif not info.get("formats") and info.get("live_status") != "is_upcoming":
+        raise Exception(
+            "No formats available for this video. It may be unavailable or requires authentication."
+        )
+    # Make the result JSON-safe (lazy entries become lists) before caching it
+    info = yt_dlp.YoutubeDL.sanitize_info(info)
+    if not is_live_info(info):  # A live stream's state and manifests change constantly
+        metadata_cache.put(url, flat, info)
+    return info
+
+
+def entry_video(entry, fallback_url=""):
+    """Returns {"title", "url"} for one (flat) playlist entry."""
+    title = entry.get("title") or "Unknown Title"
+    video_url = entry.get("webpage_url")
+    # If extract_flat was used, webpage_url may be missing; use the entry URL or video id
+    if not video_url:
+        entry_url = entry.get("url") or ""
+        video_id = entry.get("id")
+        if entry_url.startswith(("http://", "https://")):
+            video_url = entry_url
+        elif video_id:
+            video_url = f"https://www.youtube.com/watch?v={video_id}"
+        else:
+            video_url = fallback_url
+    return {"title": title, "url": video_url}
+
+
+def playlist_entries(info, fallback_url=""):
+    """Returns [{"title", "url"}] for the entries of a (flat) playlist info dict."""
+    return [
+        entry_video(entry, fallback_url)
+        for entry in info.get("entries", [])
+        if entry is not None
+    ]
+
+
+def _lazy_playlist_opts():
+    ydl_opts = build_info_opts()
+    ydl_opts["extract_flat"] = True
+    ydl_opts["lazy_playlist"] = True  # Request pages only as entries are consumed
+    return ydl_opts
+
+
+def _open_lazy_playlist(ydl, url):
+    """Returns the info of url with "entries" as the extractor's lazy page generator."""
+    # process=False keeps the entries unevaluated
+    info = ydl.extract_info(url, download=False, process=False)
+    while info and info.get("_type") in ("url", "url_transparent"):
+        info = ydl.extract_info(
+            info["url"], download=False, process=False, ie_key=info.get("ie_key")
+        )
+    if info is None:
+        raise Exception(
+            "No information could be extracted. The video may be unavailable, private, or requires authentication."
+        )
+    return info
+
+
+def iter_playlist_entries(url, is_cancelled=None):
+    """
+    Yields {"id", "title", "url"} for the entries of a playlist or channel, in the
+    site's order, as yt-dlp pages through it. Pages are requested only as entries
+    are consumed, so closing the generator early saves the remaining requests.
+    Nothing is cached. A single video yields just itself.
+    """
+    with ydl_pool.lease(_lazy_playlist_opts()) as ydl:
+        info = _open_lazy_playlist(ydl, url)
+        if "entries" not in info:
+            video = entry_video(info, url)
+            yield dict(video, id=info.get("id") or video["url"])
+            return
+        try:
+            for entry in info["entries"]:
+                if is_cancelled is not None and is_cancelled():
+                    return
+                if entry is None:
+                    continue
+                video = entry_video(entry, url)
+                yield dict(video, id=entry.get("id") or video["url"])
+        except GeneratorExit:
+            pass  # Closed early; the lease ends normally, so the instance is reused
+
+
+def iter_playlist_batches(
+    url, batch_size=DEFAULT_STREAM_BATCH, is_cancelled=None, use_cache=True
+):
+    """
+    Yields lists of {"title", "url"} while yt-dlp pages through a playlist, instead
+    of waiting for the complete flat extraction. A URL that turns out to be a single
+    video yields one batch with that video. The finished listing is cached.
+    """
+    if use_cache:
+        info = metadata_cache.get(url, True)
+        if info is not None:
+            videos = playlist_entries(info, url)
+            for start in range(0, len(videos), batch_size):
+                yield videos[start : start + batch_size]
+            return
+    entries = []
+    batch = []
+    with ydl_pool.lease(_lazy_playlist_opts()) as ydl:
+        info = _open_lazy_playlist(ydl, url)
+        if "entries" not in info:
+            yield [
+                {
+                    "title": info.get("title") or "Unknown Title",
+                    "url": info.get("webpage_url") or url,
+                }
+            ]
+            return
+        for entry in info["entries"]:
+            if is_cancelled is not None and is_cancelled():
+                return
+            if entry is None:
+                continue
+            video = entry_video(entry, url)
+            entries.append({"id": entry.get("id"), "title": video["title"], "url": video["url"]})
+            batch.append(video)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+    metadata_cache.put(
+        url,
+        True,
+        {
+            "_type": "playlist",
+            "id": info.get("id"),
+            "title": info.get("title"),
+            "webpage_url": info.get("webpage_url") or url,
+            "entries": entries,
+        },
+    )
+
+
+def expand_urls(urls, is_cancelled=None):
+    """
+    Yields {"title", "url"} for every video behind urls, streaming playlist entries
+    as they are paged in; other URLs are passed through as they are. Playlists are
+    always listed afresh, so a scheduled run sees every new upload.
+    """
+    for url in urls:
+        if "list=" in url:
+            for batch in iter_playlist_batches(
+                url, is_cancelled=is_cancelled, use_cache=False
+            ):
+                yield from batch
+        else:
+            yield {"title": "", "url": url}
+
+
+def resolve_format(url, quality_format, format_limits=None):
+    """
+    Returns the format to download url with. Without format_limits this is
+    quality_format itself; with {"max_bytes", "max_bitrate"} the video's format
+    list (from metadata_cache when possible) is ranked by select_formats() and the
+    best video+audio pair within the preset's height and the budget is used.
+    """
+    if not format_limits:
+        return quality_format
+    info = extract_video_info(url)
+    max_height, audio_only = limits_for_quality(quality_format)
+    choice = select_formats(
+        info.get("formats"),
+        info.get("duration"),
+        max_height=max_height,
+        audio_only=audio_only,
+        **format_limits,
+    )
+    if choice is None:
+        return quality_format
+    if not choice.fits:
+        logging.warning(
+            "No format of %s fits the size limit, using the smallest (%s bytes)",
+            url,
+            choice.predicted_bytes,
+        )
+    return choice.format_spec
+
+
+class ExtractionPipeline:
+    """
+    Resolves the full info (format list and stream URLs) of upcoming downloads in
+    the background while earlier ones transfer, so the next download can start
+    without extracting first. Results are stored in metadata_cache;
+    resolved_info() hands them out while their stream URLs are still valid,
+    waiting for an extraction that is already under way. With executor (e.g. a
+    worker_pool.ProcessWorkerPool's extraction processes) extractions run there
+    instead of on the pipeline's own threads.
+    """
+
+    def __init__(self, max_workers=PIPELINE_WORKERS, executor=None):
+        self.own_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=max(1, int(max_workers)), thread_name_prefix="pipeline"
+        )
+        self.lock = threading.Lock()
+        self.pending = {}  # URL -> Future of its extraction
+
+    def prefetch(self, url):
+        """Starts resolving url unless that is under way or its streams are cached."""
+        if "list=" in url:
+            return  # Only single videos are resolved ahead
+        with self.lock:
+            if url in self.pending:
+                return
+        if metadata_cache.get(url, False, need_streams=True) is not None:
+            return
+        with self.lock:
+            if url not in self.pending:
+                self.pending[url] = self.executor.submit(self._extract, url)
+
+    @staticmethod
+    def _extract(url):
+        try:
+            return extract_video_info(url, use_cache=False)
+        except Exception as e:
+            # The download extracts again and reports the error itself
+            logging.debug("Look-ahead extraction of %s failed: %s", url, e)
+            return None
+
+    def resolved_info(self, url, is_cancelled=None):
+        """Returns the full info of url with unexpired stream URLs, or None."""
+        with self.lock:
+            future = self.pending.pop(url, None)
+        if future is None:
+            info = metadata_cache.get(url, False, need_streams=True)
+        else:
+            while True:
+                if is_cancelled is not None and is_cancelled():
+                    return None
+                try:
+                    info = future.result(timeout=0.25)
+                    break
+                except FutureTimeout:
+                    continue
+                except CancelledError:
+                    return None
+        if not info or "entries" in info or not info.get("formats"):
+            return None
+        return strip_selection(info)
+
+    def cancel(self):
+        """Drops all look-ahead extractions that have not started yet."""
+        with self.lock:
+            for future in self.pending.values():
+                future.cancel()
+            self.pending.clear()
+
+    def shutdown(self):
+        self.cancel()
+        if self.own_executor:
+            self.executor.shutdown(wait=False)
+
+
+class ResolvedInfo:
+    """
+    Stand-in for an ExtractionPipeline that hands out one already resolved info,
+    e.g. to pass it on to a download in a worker process.
+    """
+
+    def __init__(self, url, info):
+        self.url = url
+        self.info = info
+
+    def resolved_info(self, url, is_cancelled=None):
+        return self.info if url == self.url else None
+
+
+def strip_selection(info):
+    """Returns info without the results of the format selection made when extracting."""
+    return {key: value for key, value in info.items() if key not in _SELECTION_KEYS}
+
+
+def is_format_pair(quality_format):
+    """Whether quality_format names exact formats to merge, e.g. "137+140"."""
+    return bool(_FORMAT_PAIR_RE.match(quality_format))
+
+
+def downloaded_paths(files, container):
+    """
+    Returns the final paths of a download_video() result: yt-dlp's merged file if
+    it merged separately downloaded formats into container, else the files.
+    """
+    if len(files) > 1 and not is_final(files):
+        merged = f"{output_stem(files)}.{container}"
+        if os.path.exists(merged):
+            return [merged]
+    return [f["filename"] for f in files]
+
+
+def wait_for_live(url, info, is_cancelled=None):
+    """Waits for a scheduled stream or premiere to start; returns its info from then on."""
+    while info.get("live_status") == "is_upcoming":
+        start = info.get("release_timestamp") or 0
+        # Checked again at least every UPCOMING_POLL seconds, as start times can move
+        deadline = time.monotonic() + min(max(start - time.time(), 5), UPCOMING_POLL)
+        logging.info("Waiting for %s to start", url)
+        while time.monotonic() < deadline:
+            if is_cancelled is not None and is_cancelled():
+                raise DownloadCancelled("Download cancelled by user")
+            time.sleep(0.5)
+        info = strip_selection(extract_video_info(url, use_cache=False))
+    return info
+
+
+def record_live(info, quality_format, output_path, progress_hook, is_cancelled, live):
+    """
+    Records a running live stream into output_path as an MPEG-TS file named like
+    downloads. progress_hook receives the recording's progress and its "finished"
+    update; returns the recorded path or None if nothing was recorded.
+    """
+    fmt = live_format(info.get("formats") or [], quality_format)
+    if fmt is None:
+        raise Exception("This live stream has no HLS format that can be recorded.")
+    yt_dlp = load_yt_dlp()
+    title = info.get("title") or info.get("id") or "live"
+    name = yt_dlp.utils.sanitize_filename(f"{title}_{fmt.get('height') or 'NA'}p")
+    output = os.path.join(output_path, f"{name}.ts")
+    copy = 1
+    while os.path.exists(output):  # Never overwrite an earlier recording
+        copy += 1
+        output = os.path.join(output_path, f"{name} ({copy}).ts")
+    recorder = LiveRecorder(
+        fmt["url"],
+        output,
+        window=live.get("window"),
+        progress_hook=progress_hook,
+        is_cancelled=is_cancelled,
+        http_headers=fmt.get("http_headers") or info.get("http_headers"),
+        info_dict=dict(info, **fmt),
+    )
+    return recorder.record()
+
+
+def selected_store_key(ydl, info, options):
+    """
+    Runs ydl's format selection on full info without downloading and returns the
+    content store key of the result made with options (post-processing and clip
+    options), or None if nothing would be selected.
+    """
+    if not info.get("formats") or not info.get("id"):
+        return None
+    try:
+        # Processing fills in the info dict, so a copy is processed
+        selected = ydl.process_ie_result(copy.deepcopy(info), download=False)
+    except Exception as e:
+        logging.debug("Format selection for the content store failed: %s", e)
+        return None
+    format_id = selected.get("format_id") or "+".join(
+        str(f.get("format_id")) for f in selected.get("requested_formats") or ()
+    )
+    if not format_id:
+        return None
+    return store_key(info, format_id, options)
+
+
+def is_final(files):
+    """
+    Whether a download_video() result needs no post-processing: linked from the
+    content store, or clips that yt-dlp already cut and merged.
+    """
+    return any(f.get("stored") or f.get("clip") for f in files)
+
+
+def store_output(files, path):
+    """Adds the final file of a download made for the content store to the store."""
+    key = next((f["store_key"] for f in files if f.get("store_key")), None)
+    if key is None or not path or not content_store.enabled:
+        return
+    try:
+        content_store.add(key, path)
+    except OSError as e:
+        logging.warning("Could not add %s to the content store: %s", path, e)
+
+
+def submit_postprocess(pool, files, options, on_done):
+    """PostProcessPool.submit() that also adds the output to the content store."""
+
+    def done(output, error, seconds):
+        if output and not error:
+            store_output(files, output)
+        on_done(output, error, seconds)
+
+    return pool.submit(files, options, done)
+
+
+def build_download_opts(
+    quality_format,
+    output_path,
+    quiet=False,
+    archive=True,
+    profile_opts=None,
+    postprocess=None,
+    clip=None,
+):
+    """
+    Returns the yt-dlp options used for every download. With archive, finished
+    videos are recorded in the output folder's download archive; profile_opts
+    (see DOWNLOAD_PROFILES) tune fragments, chunking, buffering and rate limits.
+    With postprocess (see postprocess.DEFAULT_POSTPROCESS) exact format pairs are
+    downloaded as separate files, to be merged by a PostProcessPool afterwards.
+    With clip (see clips.make_clip) only the selected sections are downloaded,
+    one file each, cut and merged by yt-dlp's ffmpeg downloader.
+    """
+    container = (postprocess or DEFAULT_POSTPROCESS)["container"]
+    ydl_opts = {
+        "format": quality_format,
+        "merge_output_format": container,
+        "outtmpl": f"{output_path}/%(title)s_%(height)sp.%(ext)s",
+        "verbose": False,
+        "extractor_args": {"youtube": {"player_client": ["web"]}},
+        # Playlists are expanded before downloading, so errors are never skipped
+        # silently; download_video() classifies them and decides on retries
+        "ignoreerrors": False,
+        "nocheckcertificate": True,
+        "retries": HTTP_RETRIES,
+        "fragment_retries": FRAGMENT_RETRIES,
+        "extractor_retries": EXTRACTOR_RETRIES,
+        "retry_sleep_functions": {
+            "http": retry_sleep,
+            "fragment": retry_sleep,
+            "extractor": retry_sleep,
+        },
+        "continuedl": True,  # Resume from an existing .part file
+        "js_runtimes": {"node": {}},
+    }
+    if quiet:
+        ydl_opts["quiet"] = True
+        ydl_opts["noprogress"] = True
+    if archive:
+        ydl_opts["download_archive"] = archive_path_for(output_path)
+    if clip is not None:
+        ydl_opts["download_ranges"] = ClipRanges(clip)
+        ydl_opts["force_keyframes_at_cuts"] = clip.get("precise", False)
+        ydl_opts["outtmpl"] = (
+            f"{output_path}/%(title)s_%(height)sp - %(section_number)02d "
+            "%(section_title)s.%(ext)s"
+        )
+    elif postprocess is not None and is_format_pair(quality_format) and ffmpeg_available():
+        ydl_opts["format"] = quality_format.replace("+", ",")
+        ydl_opts["outtmpl"] = f"{output_path}/%(title)s_%(height)sp.f%(format_id)s.%(ext)s"
+    if profile_opts:
+        ydl_opts.update(profile_opts)
+    return ydl_opts
+
+
+def download_video(
+    url,
+    quality_format,
+    output_path,
+    progress_hook=None,
+    is_cancelled=None,
+    quiet=False,
+    archive=True,
+    profile_opts=None,
+    format_limits=None,
+    postprocess=None,
+    metrics=None,
+    pipeline=None,
+    live=None,
+    clip=None,
+):
+    """
+    Downloads a single URL. progress_hook receives yt-dlp status dicts for the
+    "downloading" and "finished" states; is_cancelled is polled on every hook call.
+    format_limits is passed to resolve_format(). Returns the downloaded files as
+    dicts for postprocess_files(); with postprocess, merging is left to the caller.
+    Failed attempts are classified and retried per RETRY_POLICIES. Raises
+    DownloadCancelled on cancellation and ClassifiedError once retries run out.
+    metrics (a telemetry.JobMetrics) collects timings, throughput and retries.
+    With pipeline (an ExtractionPipeline) the first attempt uses the info it
+    resolved ahead of time; retries always extract afresh. With live (options such
+    as {"window": seconds}), live streams and premieres are recorded by a
+    LiveRecorder, waiting for scheduled ones to start; without it they are left
+    to yt-dlp. With clip (see clips.make_clip) only those time ranges or chapters
+    are fetched; the clips are returned final, marked "clip", and not archived.
+    """
+    attempt = 0
+    while True:
+        try:
+            return _download_once(
+                url,
+                quality_format,
+                output_path,
+                progress_hook,
+                is_cancelled,
+                quiet,
+                archive,
+                profile_opts,
+                format_limits,
+                postprocess,
+                metrics,
+                pipeline if attempt == 0 else None,
+                live,
+                clip,
+            )
+        except DownloadCancelled:
+            raise
+        except Exception as e:
+            if is_cancelled is not None and is_cancelled():
+                raise DownloadCancelled("Download cancelled by user")
+            kind = classify_error(e)
+            policy = RETRY_POLICIES[kind]
+            if attempt >= policy.job_retries:
+                if kind == ERROR_FORBIDDEN and cookie_problem() is not None:
+                    kind = ERROR_AUTH  # Refused even when extracted afresh: the cookies
+                raise ClassifiedError(str(e), kind) from e
+            delay = backoff_delay(attempt, policy.base_delay, policy.max_delay)
+            logging.warning(
+                "Download of %s failed (%s), retrying in %.0fs: %s", url, kind, delay, e
+            )
+            attempt += 1
+            if metrics is not None:
+                metrics.retried()
+            if not _wait(delay, is_cancelled):
+                raise DownloadCancelled("Download cancelled by user")
+
+
+def _wait(seconds, is_cancelled=None):
+    """Sleeps for seconds; returns False as soon as is_cancelled becomes true."""
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        if is_cancelled is not None and is_cancelled():
+            return False
+        time.sleep(min(0.25, deadline - time.monotonic()))
+    return True
+
+
+def _download_once(
+    url,
+    quality_format,
+    output_path,
+    progress_hook,
+    is_cancelled,
+    quiet,
+    archive,
+    profile_opts,
+    format_limits,
+    postprocess,
+    metrics=None,
+    pipeline=None,
+    live=None,
+    clip=None,
+):
+    """One download attempt of download_video()."""
+    files = []
+    received = {}  # File -> downloaded_bytes already reported to the governor
+    if metrics is not None:
+        metrics.start_attempt()
+    # Waiting for a look-ahead extraction still under way counts as extraction time
+    info = pipeline.resolved_info(url, is_cancelled) if pipeline is not None else None
+    if info is None and (content_store.enabled or live is not None) and "list=" not in url:
+        # The store is keyed by the selected formats and live streams are recorded
+        # differently, so the video is resolved first
+        info = extract_video_info(url, use_cache=False)
+        info = strip_selection(info) if info.get("formats") or is_live_info(info) else None
+    recording = live is not None and info is not None and is_live_info(info)
+    if recording:
+        info = wait_for_live(url, info, is_cancelled)
+        # A stream that already ended is a normal video, and yt-dlp handles streams
+        # without an HLS format
+        recording = is_live_info(info) and (
+            live_format(info.get("formats") or [], quality_format) is not None
+        )
+    if recording:
+        clip = None  # A recording is never cut
+    elif clip is not None:
+        if not ffmpeg_available():
+            raise Exception("Downloading clips requires FFmpeg, which was not found.")
+        # A clip does not stand for the whole video in the download archive
+        archive = False
+    key = None
+
+    def hook(d):
+        # Check cancellation flag in the progress hook
+        if is_cancelled is not None and is_cancelled():
+            raise DownloadCancelled("Download cancelled by user")
+        delta = 0
+        if d.get("status") == "downloading":
+            part = d.get("tmpfilename") or d.get("filename")
+            done = d.get("downloaded_bytes") or 0
+            # The first update of a resumed file includes the bytes already on disk
+            delta = done - received.get(part, done)
+            received[part] = done
+        if metrics is not None:
+            metrics.on_progress(d, delta)
+        if delta:
+            # Sleeping here throttles this transfer while the shared bucket is in debt
+            bandwidth_governor.consume(delta, is_cancelled)
+        if d.get("status") == "finished" and d.get("filename"):
+            info = d.get("info_dict") or {}
+            files.append(
+                {
+                    "filename": d["filename"],
+                    # Unknown codecs (None) count as present; only "none" means absent
+                    "has_video": info.get("vcodec") != "none",
+                    "has_audio": info.get("acodec") != "none",
+                    "vcodec": info.get("vcodec"),
+                    "acodec": info.get("acodec"),
+                    "thumbnail": info.get("thumbnail"),
+                }
+            )
+        if progress_hook is not None and d.get("status") in ("downloading", "finished"):
+            progress_hook(d)
+
+    quality_format = resolve_format(url, quality_format, format_limits)
+    ydl_opts = build_download_opts(
+        quality_format, output_path, quiet, archive, profile_opts, postprocess, clip
+    )
+    waited = time.monotonic()
+    host = bandwidth_governor.acquire_host(url, is_cancelled)
+    if host is None:
+        raise DownloadCancelled("Download cancelled by user")
+    log_listener = None
+    if metrics is not None:
+        metrics.add_host_wait(time.monotonic() - waited)
+        log_listener = metrics.on_log
+    try:
+        if recording:
+            record_live(info, quality_format, output_path, hook, is_cancelled, live)
+            retcode = 0
+        else:
+            with ydl_pool.lease(
+                ydl_opts, progress_hook=hook, log_listener=log_listener
+            ) as ydl:
+                if info is not None and content_store.enabled:
+                    options = postprocess or DEFAULT_POSTPROCESS
+                    if clip is not None:
+                        options = dict(options, clip=clip)
+                    key = selected_store_key(ydl, info, options)
+                    stored = content_store.link(key, output_path) if key else None
+                    if stored is not None:
+                        if archive:
+                            ydl.record_download_archive(info)
+                        return [{"filename": stored, "stored": True}]
+                if info is not None:
+                    # Formats are selected and downloaded from the already resolved
+                    # streams; with ignoreerrors off every failure raises
+                    ydl.process_ie_result(info, download=True)
+                    retcode = 0
+                else:
+                    retcode = ydl.download([url])
+    finally:
+        bandwidth_governor.release_host(host)
+        if metrics is not None:
+            metrics.end_transfer()
+    if is_cancelled is not None and is_cancelled():
+        raise DownloadCancelled("Download cancelled by user")
+    if retcode:
+        raise Exception(f"yt-dlp could not download {url}")
+    if recording and postprocess is None and files:
+        # Finalise the recording: remux the captured MPEG-TS into the container
+        output = postprocess_files(files, DEFAULT_POSTPROCESS)
+        return [dict(files[0], filename=output)]
+    if clip is not None:
+        for f in files:
+            f["clip"] = True
+    if key is not None and files:
+        for f in files:
+            f["store_key"] = key
+        if postprocess is None or clip is not None:
+            paths = downloaded_paths(files, DEFAULT_POSTPROCESS["container"])
+            if len(paths) == 1:
+                store_output(files, paths[0])
+    return files
+
+
+def _with_resumed(videos, resumed):
+    """Yields videos, then the resumed entries whose URL was not among them."""
+    remaining = {video["url"]: video for video in resumed}
+    for video in videos:
+        remaining.pop(video["url"], None)
+        yield video
+    yield from remaining.values()
+
+
+class BatchDownloader:
+    """
+    GUI-free counterpart of the Qt DownloadScheduler: downloads a list of URLs with
+    a fixed number of worker threads and reports every change to on_event as a
+    JSON-serialisable dict. on_event is called from worker threads. With pipeline,
+    the next queued entries are extracted while the running ones transfer. With
+    worker_pool (a worker_pool.ProcessWorkerPool) extractions and downloads run in
+    its worker processes, each worker thread waiting for one of them.
+    """
+
+    def __init__(
+        self,
+        quality_format,
+        output_path,
+        concurrency=DEFAULT_MAX_WORKERS,
+        on_event=None,
+        journal=None,
+        progress_rate=DEFAULT_PROGRESS_RATE,
+        archive=True,
+        scan_output=False,
+        profile_opts=None,
+        format_limits=None,
+        postprocess=None,
+        postprocess_workers=DEFAULT_POSTPROCESS_WORKERS,
+        metrics=None,
+        pipeline=True,
+        live=None,
+        clip=None,
+        worker_pool=None,
+    ):
+        self.quality_format = quality_format
+        self.output_path = output_path
+        self.concurrency = max(1, int(concurrency))
+        self.on_event = on_event
+        self.progress_rate = progress_rate
+        self.archive = archive  # Skip and record videos via the download archive
+        self.scan_output = scan_output  # Also skip titles already in the output folder
+        self.profile_opts = profile_opts  # Download performance profile options
+        self.format_limits = format_limits  # Size/bitrate budget per video
+        self.postprocess = postprocess  # Options for the post-processing stage, or None
+        self.postprocess_workers = postprocess_workers
+        self.postprocess_pool = None
+        self.metrics = metrics  # Optional telemetry.MetricsRecorder, one record per job
+        self.journal = journal  # Optional DownloadJournal
+        self.run_journal = None  # journal, unless it holds another run's entries
+        self.use_pipeline = pipeline  # Extract queued entries ahead of their download
+        self.live = live  # Live recording options (see download_video), or None
+        self.clip = clip  # Time ranges or chapters to download (see clips.make_clip)
+        self.worker_pool = worker_pool  # Runs the work in other processes, or None
+        self.pipeline = None
+        self.upcoming = deque()  # (index, URL) of queued entries, in download order
+        self.states = {}
+        self.cancelled = False
+        self.lock = threading.Lock()
+
+    def cancel(self):
+        """Set the cancellation flag to True to cooperatively stop all downloads."""
+        self.cancelled = True
+        if self.pipeline is not None:
+            self.pipeline.cancel()
+        if self.worker_pool is not None:
+            self.worker_pool.cancel()
+
+    def _emit(self, event):
+        if self.on_event is not None:
+            self.on_event(event)
+
+    def _set_state(self, index, url, state, **extra):
+        with self.lock:
+            self.states[index] = state
+        if self.run_journal is not None:
+            self.run_journal.record(index, url, status=state)
+        self._emit(dict(event="state", index=index, url=url, state=state, **extra))
+
+    def _record_metrics(self, job, status, paths=(), merge_seconds=None, error_kind=None):
+        if self.metrics is None:
+            return
+        record = job.record(status, paths, merge_seconds, error_kind)
+        self.metrics.write(record)
+        self._emit(dict(record, event="metrics"))
+
+    def _prefetch_upcoming(self):
+        """Resolves the entries next in line, one per worker."""
+        if self.pipeline is None or self.cancelled:
+            return
+        with self.lock:
+            urls = [url for _, url in itertools.islice(self.upcoming, self.concurrency)]
+        for url in urls:
+            self.pipeline.prefetch(url)
+
+    def _download(self, index, url):
+        with self.lock:
+            self.upcoming.remove((index, url))
+        self._prefetch_upcoming()
+        if self.cancelled:
+            self._set_state(index, url, STATE_SKIPPED)
+            return
+        self._set_state(index, url, STATE_RUNNING)
+
+        def progress(record):
+            self._emit(dict(event="progress", **record._asdict()))
+
+        job = JobMetrics(url, index, self.concurrency)
+        options = {
+            "archive": self.archive,
+            "profile_opts": self.profile_opts,
+            "format_limits": self.format_limits,
+            "postprocess": self.postprocess,
+            "metrics": job,
+            "pipeline": self.pipeline,
+            "live": self.live,
+            "clip": self.clip,
+        }
+        try:
+            if self.worker_pool is not None:
+                files = self.worker_pool.download(
+                    url,
+                    self.quality_format,
+                    self.output_path,
+                    progress_hook=progress,
+                    is_cancelled=lambda: self.cancelled,
+                    index=index,
+                    workers=self.concurrency,
+                    progress_rate=self.progress_rate,
+                    **options,
+                )
+            else:
+                files = download_video(
+                    url,
+                    self.quality_format,
+                    self.output_path,
+                    progress_hook=ProgressCoalescer(index, progress, self.progress_rate),
+                    is_cancelled=lambda: self.cancelled,
+                    quiet=True,
+                    **options,
+                )
+            if self.postprocess is None or not files or is_final(files):
+                container = (self.postprocess or DEFAULT_POSTPROCESS)["container"]
+                self._record_metrics(job, STATE_DONE, downloaded_paths(files, container))
+                self._set_state(index, url, STATE_DONE)
+                return
+            # Hand the files off and free this download slot for the next video
+            self._set_state(index, url, STATE_PROCESSING)
+
+            def processed(output, error, seconds):
+                if error:
+                    kind = classify_error(error)
+                    self._record_metrics(job, STATE_FAILED, (), seconds, kind)
+                    self._set_state(index, url, STATE_FAILED, error=error, kind=kind)
+                else:
+                    self._record_metrics(job, STATE_DONE, [output], seconds)
+                    self._set_state(index, url, STATE_DONE, filename=output)
+
+            submit_postprocess(self.postprocess_pool, files, self.postprocess, processed)
+        except DownloadCancelled:
+            self._set_state(index, url, STATE_SKIPPED)
+        except Exception as e:
+            logging.debug("Download of %s failed: %s", url, e)
+            kind = classify_error(e)
+            self._record_metrics(job, STATE_FAILED, error_kind=kind)
+            self._set_state(index, url, STATE_FAILED, error=str(e), kind=kind)
+
+    def _open_journal_run(self):
+        """
+        Resumes the journal's open run if it was for the same output folder and
+        quality, returning its unfinished {"title", "url"} entries, or else starts
+        a new run. An open run for other settings is left as it is for a later
+        resume, and this run is not journaled; later runs check again.
+        """
+        run, pending = self.journal.incomplete()
+        if run is None:
+            self.journal.start_run([], self.quality_format, self.output_path)
+            self.run_journal = self.journal
+            return []
+        if run.get("output") != self.output_path or run.get("quality") != self.quality_format:
+            logging.warning(
+                "The journal %s holds an unfinished run for %s; not journaling this one",
+                self.journal.path,
+                run.get("output"),
+            )
+            self._emit({"event": "journal", "state": "busy", "output": run.get("output")})
+            return []
+        self.journal.resume_run(run["run"])
+        self.run_journal = self.journal
+        self._emit({"event": "journal", "state": "resumed", "pending": len(pending)})
+        return [{"title": entry["title"], "url": entry["url"]} for entry in pending]
+
+    def run(self, videos):
+        """
+        Downloads videos, an iterable of {"title", "url"} that may still be producing
+        entries (e.g. expand_urls) while the first ones download. Returns a summary dict.
+        With a journal, the unfinished entries of an interrupted run for the same
+        folder and quality are downloaded too, after videos.
+        """
+        started = time.monotonic()
+        bytes_before = bandwidth_governor.total_bytes
+        problem = cookie_problem()
+        if problem is not None:
+            # Reported before the first download rather than as a sign-in error midway
+            self._emit(
+                {"event": "cookies", "state": problem.state, "message": problem.message}
+            )
+        self.run_journal = None
+        if self.journal is not None:
+            videos = _with_resumed(videos, self._open_journal_run())
+        total = 0
+        archive_filter = None
+        # Clips of a video are not recorded in the archive, nor skipped because of it
+        if self.clip is None and (self.archive or self.scan_output):
+            archive_filter = ArchiveFilter(self.output_path, self.archive, self.scan_output)
+        if self.postprocess is not None:
+            self.postprocess_pool = PostProcessPool(self.postprocess_workers)
+        if self.worker_pool is not None:
+            self.worker_pool.reset()
+        if self.use_pipeline and self.worker_pool is not None:
+            self.pipeline = self.worker_pool.pipeline()
+        elif self.use_pipeline:
+            self.pipeline = ExtractionPipeline(min(self.concurrency, PIPELINE_WORKERS))
+        pool = ThreadPoolExecutor(max_workers=self.concurrency)
+        try:
+            for index, video in enumerate(videos):
+                if self.cancelled:
+                    break
+                total += 1
+                # Checked before any extraction, so known videos cost no network access
+                if archive_filter is not None and archive_filter.is_downloaded(
+                    video["url"], video.get("title")
+                ):
+                    self._set_state(index, video["url"], STATE_SKIPPED, reason="archived")
+                    continue
+                if self.run_journal is not None:
+                    self.run_journal.add_entries([dict(video, index=index)])
+                self._set_state(
+                    index, video["url"], STATE_QUEUED, title=video.get("title", "")
+                )
+                with self.lock:
+                    self.upcoming.append((index, video["url"]))
+                pool.submit(self._download, index, video["url"])
+                self._prefetch_upcoming()
+        except BaseException:
+            # E.g. Ctrl-C while a playlist is still being listed: stop the batch
+            # instead of waiting for every queued download to finish
+            self.cancel()
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        pool.shutdown(wait=True)
+        if self.pipeline is not None:
+            self.pipeline.shutdown()
+        if self.postprocess_pool is not None:
+            self.postprocess_pool.shutdown(wait=True)
+        counts = {}
+        for state in self.states.values():
+            counts[state] = counts.get(state, 0) + 1
+        finished = not counts.get(STATE_FAILED) and not self.cancelled
+        if self.run_journal is not None and finished:
+            self.run_journal.close_run()
+        elapsed = time.monotonic() - started
+        received = bandwidth_governor.total_bytes - bytes_before
+        summary = {
+            "event": "summary",
+            "total": total,
+            "counts": counts,
+            "elapsed": round(elapsed, 3),
+            "bytes": received,
+            "throughput": round(received / elapsed) if elapsed else 0,
+        }
+        if self.metrics is not None:
+            summary["metrics"] = summarize(self.metrics.records())
+        self._emit(summary)
+        return summary
@@ -0,0 +1,171 @@
+import re
+from collections import namedtuple
+
+# Relative bytes needed for the same picture quality; lower is more efficient
+CODEC_EFFICIENCY = {
+    "av01": 0.6,
+    "vp09": 0.75,
+    "vp9": 0.75,
+    "hev1": 0.75,
+    "hvc1": 0.75,
+    "avc1": 1.0,
+}
+
+# Chosen format(s) as a yt-dlp format spec ("137+140", "22" or "140"), the video
+# and audio format dicts (None when not used) and the predicted download size
+FormatChoice = namedtuple("FormatChoice", "format_spec video audio predicted_bytes fits")
+
+_MAX_HEIGHT_RE = re.compile(r"height\s*<=\s*(\d+)")
+
+
+def codec_name(codec):
+    """Returns the codec family of a yt-dlp codec string ("avc1.64001F" -> "avc1")."""
+    return (codec or "none").split(".")[0].lower()
+
+
+def has_video(f):
+    if f.get("vcodec") is None:  # Unknown codec: trust the resolution
+        return bool(f.get("height"))
+    return codec_name(f.get("vcodec")) != "none"
+
+
+def has_audio(f):
+    if f.get("acodec") is None:  # Unknown codec: assume a complete file if the video is too
+        return f.get("vcodec") is None
+    return codec_name(f.get("acodec")) != "none"
+
+
+def estimate_bytes(f, duration=None):
+    """
+    Returns the download size of a format: filesize, filesize_approx, or the total
+    bitrate (kbit/s) times the duration. 0 if unknown.
+    """
+    size = f.get("filesize") or f.get("filesize_approx")
+    if size:
+        return int(size)
+    if f.get("tbr") and duration:
+        return int(f["tbr"] * 1000 / 8 * duration)
+    return 0
+
+
+def bitrate(f, duration=None):
+    """Returns the total bitrate of a format in kbit/s, derived from its size if needed."""
+    if f.get("tbr"):
+        return f["tbr"]
+    size = estimate_bytes(f)
+    return size * 8 / 1000 / duration if size and duration else 0
+
+
+def limits_for_quality(quality_format):
+    """Returns (max_height, audio_only) implied by a quality preset format string."""
+    if quality_format.startswith("bestaudio"):
+        return None, True
+    match = _MAX_HEIGHT_RE.search(quality_format)
+    return (int(match.group(1)) if match else None), False
+
+
+def _quality_key(video, audio, size):
+    """
+    Sort key: higher resolution and frame rate first, then fewer bytes for them,
+    then the more efficient codec (which decides when sizes are unknown).
+    """
+    video = video or {}
+    height = video.get("height") or 0
+    fps = min(video.get("fps") or 30, 60)
+    abr = (audio or {}).get("abr") or 0
+    efficiency = CODEC_EFFICIENCY.get(codec_name(video.get("vcodec")), 1.0)
+    return (height, fps, abr, -(size or float("inf")), -efficiency)
+
+
+def _candidates(formats, duration, audio_only):
+    """Yields (video, audio, bytes, kbit/s) for every progressive format and video+audio pair."""
+    audios = [f for f in formats if has_audio(f) and not has_video(f)]
+    if audio_only:
+        for audio in audios:
+            yield None, audio, estimate_bytes(audio, duration), bitrate(audio, duration)
+        return
+    for f in formats:
+        if has_video(f) and has_audio(f):
+            yield f, None, estimate_bytes(f, duration), bitrate(f, duration)
+        elif has_video(f):
+            for audio in audios:
+                size_v, size_a = estimate_bytes(f, duration), estimate_bytes(audio, duration)
+                yield (
+                    f,
+                    audio,
+                    size_v + size_a if size_v and size_a else 0,
+                    bitrate(f, duration) + bitrate(audio, duration),
+                )
+
+
+def _choice(video, audio, size, fits):
+    ids = [str(f["format_id"]) for f in (video, audio) if f is not None]
+    return FormatChoice("+".join(ids), video, audio, size, fits)
+
+
+def select_formats(
+    formats,
+    duration=None,
+    max_height=None,
+    max_bytes=None,
+    max_bitrate=None,
+    audio_only=False,
+    format_id=None,
+):
+    """
+    Picks the best progressive format or video+audio pair from a yt-dlp format
+    list that stays within max_height, max_bytes and max_bitrate (kbit/s). Among
+    equal resolutions the smaller download wins, which favours efficient codecs.
+    With format_id that exact format is used, paired with the best fitting audio
+    if it has no audio track. Returns a FormatChoice, or None if nothing matches;
+    when nothing fits the budget the smallest candidate is returned with fits=False.
+    """
+    formats = [f for f in formats or [] if f.get("format_id") is not None]
+    if format_id is not None:
+        chosen = [f for f in formats if str(f["format_id"]) == str(format_id)]
+        if not chosen:
+            return None
+        f = chosen[0]
+        if not has_video(f):
+            return _choice(None, f, estimate_bytes(f, duration), True)
+        if has_audio(f):
+            return _choice(f, None, estimate_bytes(f, duration), True)
+        formats = [f] + [a for a in formats if has_audio(a) and not has_video(a)]
+        max_height = None
+    candidates = []
+    for video, audio, size, kbps in _candidates(formats, duration, audio_only):
+        if max_height and video is not None and (video.get("height") or 0) > max_height:
+            continue
+        candidates.append((video, audio, size, kbps))
+    if not candidates:
+        return None
+    fitting = [
+        c
+        for c in candidates
+        if (not max_bytes or (c[2] and c[2] <= max_bytes))
+        and (not max_bitrate or (c[3] and c[3] <= max_bitrate))
+    ]
+    if fitting:
+        video, audio, size, _ = max(fitting, key=lambda c: _quality_key(c[0], c[1], c[2]))
+        return _choice(video, audio, size, True)
+    known = [c for c in candidates if c[2]] or candidates
+    video, audio, size, _ = min(known, key=lambda c: c[2] or float("inf"))
+    return _choice(video, audio, size, False)
+
+
+def describe_choice(choice):
+    """Returns a one-line summary such as "1280x720 vp9 + opus, 84.2 MB"."""
+    if choice is None:
+        return "No matching format"
+    parts = []
+    if choice.video is not None:
+        video = choice.video
+        resolution = video.get("resolution") or f"{video.get('height') or '?'}p"
+        parts.append(f"{resolution} {codec_name(video.get('vcodec'))}")
+    if choice.audio is not None:
+        parts.append(codec_name(choice.audio.get("acodec")))
+    size = "size unknown"
+    if choice.predicted_bytes:
+        size = f"{choice.predicted_bytes / 1024 / 1024:.1f} MB"
+    text = f"{' + '.join(parts)}, {size}"
+    return text if choice.fits else text + " (over budget)"
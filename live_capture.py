@@ -0,0 +1,352 @@
+import os
+import time
+import shutil
+import logging
+import urllib.error
+import urllib.request
+from collections import deque, namedtuple
+from urllib.parse import urljoin
+from format_selector import has_audio, has_video, limits_for_quality
+
+HTTP_TIMEOUT = 30
+CHUNK_SIZE = 256 * 1024  # Bytes read per call; a segment is never held in memory whole
+LIVE_EDGE_SEGMENTS = 3  # A recording starts this many segments before the live edge
+STALL_RELOADS = 8  # Playlist reloads without new segments before the stream counts as over
+SEGMENT_RETRIES = 3
+RELOAD_BACKOFF_MAX = 30  # Longest wait in seconds between failed playlist reloads
+UPCOMING_POLL = 60  # Seconds between checks of a scheduled stream or premiere
+
+# live_status values of streams that can be recorded, now or once they start
+LIVE_STATES = ("is_live", "is_upcoming")
+
+# One media segment: its media sequence number, duration in seconds and URL
+Segment = namedtuple("Segment", "sequence duration url")
+# A parsed HLS media playlist; init_url is the EXT-X-MAP initialisation segment
+MediaPlaylist = namedtuple("MediaPlaylist", "target_duration segments ended init_url")
+
+
+class LiveCaptureError(Exception):
+    pass
+
+
+def is_live_info(info):
+    """Whether an info dict describes a live stream or premiere, running or scheduled."""
+    return bool(info.get("is_live")) or info.get("live_status") in LIVE_STATES
+
+
+def describe_live(info):
+    """Returns a status line for a live or scheduled stream, or None for other videos."""
+    status = info.get("live_status")
+    if status == "is_live" or (status is None and info.get("is_live")):
+        return "Live now"
+    if status == "is_upcoming":
+        start = info.get("release_timestamp")
+        if start:
+            return "Starts " + time.strftime("%Y-%m-%d %H:%M", time.localtime(start))
+        return "Scheduled"
+    return None
+
+
+def live_format(formats, quality_format):
+    """
+    Picks the HLS format to record: the best one with both video and audio (audio
+    only for audio presets) within the preset's height limit, or else the lowest
+    one above it. None if the stream has no such format.
+    """
+    max_height, audio_only = limits_for_quality(quality_format)
+    candidates = [
+        f
+        for f in formats
+        if str(f.get("protocol") or "").startswith("m3u8")
+        and has_audio(f)
+        and has_video(f) != audio_only
+    ]
+    if not candidates:
+        return None
+    fitting = [f for f in candidates if not max_height or (f.get("height") or 0) <= max_height]
+    if not fitting:
+        return min(candidates, key=lambda f: (f.get("height") or 0, f.get("tbr") or 0))
+    return max(fitting, key=lambda f: (f.get("height") or 0, f.get("tbr") or 0))
+
+
+def _attributes(line):
+    """Parses the ATTR=value,ATTR="value" list of an HLS tag."""
+    attributes = {}
+    for part in line.split(":", 1)[1].split(","):
+        key, _, value = part.partition("=")
+        attributes[key.strip()] = value.strip().strip('"')
+    return attributes
+
+
+def parse_master_playlist(text, base_url):
+    """Returns the variant URLs of an HLS master playlist, highest bandwidth first."""
+    variants = []
+    lines = [line.strip() for line in text.splitlines()]
+    for i, line in enumerate(lines):
+        if line.startswith("#EXT-X-STREAM-INF") and i + 1 < len(lines):
+            bandwidth = int(_attributes(line).get("BANDWIDTH", 0) or 0)
+            variants.append((bandwidth, urljoin(base_url, lines[i + 1])))
+    variants.sort(reverse=True)
+    return [url for _, url in variants]
+
+
+def parse_media_playlist(text, base_url):
+    """Parses an HLS media playlist. Raises LiveCaptureError for encrypted streams."""
+    if not text.lstrip().startswith("#EXTM3U"):
+        raise LiveCaptureError("not an HLS playlist")
+    target_duration = 6.0
+    sequence = 0
+    duration = None
+    segments = []
+    ended = False
+    init_url = None
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("#EXT-X-TARGETDURATION:"):
+            target_duration = float(line.split(":", 1)[1])
+        elif line.startswith("#EXT-X-MEDIA-SEQUENCE:"):
+            sequence = int(line.split(":", 1)[1])
+        elif line.startswith("#EXTINF:"):
+            duration = float(line.split(":", 1)[1].split(",")[0])
+        elif line.startswith("#EXT-X-KEY:"):
+            if _attributes(line).get("METHOD", "NONE") != "NONE":
+                raise LiveCaptureError("encrypted live streams cannot be recorded")
+        elif line.startswith("#EXT-X-MAP:"):
+            init_url = urljoin(base_url, _attributes(line)["URI"])
+        elif line.startswith("#EXT-X-ENDLIST"):
+            ended = True
+        elif line and not line.startswith("#"):
+            url = urljoin(base_url, line)
+            segments.append(Segment(sequence, duration or target_duration, url))
+            sequence += 1
+            duration = None
+    return MediaPlaylist(target_duration, segments, ended, init_url)
+
+
+class LiveRecorder:
+    """
+    Records an HLS live stream or premiere by following its media playlist. New
+    segments are streamed to disk as they appear, in CHUNK_SIZE pieces, so memory
+    use does not grow with the recording. Without a window everything is appended
+    to one file; with window (seconds) segments are kept as separate files and the
+    oldest are deleted once they fall out of the window, like a DVR ring buffer.
+    The recording ends with the playlist's EXT-X-ENDLIST, when the playlist stops
+    updating (a failed reload counts as one without new segments and is retried
+    with backoff), or on cancellation; record() then joins what was kept into
+    output (an MPEG-TS or fragmented MP4 file, as served).
+
+    progress_hook receives yt-dlp style "downloading" and "finished" dicts, so the
+    download engine's hooks (bandwidth, metrics, cancellation) apply unchanged.
+    """
+
+    def __init__(
+        self,
+        manifest_url,
+        output,
+        window=None,
+        progress_hook=None,
+        is_cancelled=None,
+        http_headers=None,
+        info_dict=None,
+    ):
+        self.manifest_url = manifest_url
+        self.output = output
+        self.window = window or None
+        self.progress_hook = progress_hook
+        self.is_cancelled = is_cancelled
+        self.http_headers = dict(http_headers or {})
+        self.info_dict = info_dict or {}
+        self.part_path = output + ".part"
+        self.segment_dir = output + ".segments"
+        self.ring = deque()  # (Segment, path) of kept segments, oldest first
+        self.init_data = None
+        self.started = None
+        self.downloaded_bytes = 0
+        self.segments = 0
+        self.missed = 0  # Segments that left the playlist before they were fetched
+
+    def _open(self, url):
+        request = urllib.request.Request(url, headers=self.http_headers)
+        return urllib.request.urlopen(request, timeout=HTTP_TIMEOUT)
+
+    def _fetch_text(self, url):
+        with self._open(url) as response:
+            return response.read().decode("utf-8", errors="replace")
+
+    def _cancelled(self):
+        return self.is_cancelled is not None and self.is_cancelled()
+
+    def _sleep(self, seconds):
+        deadline = time.monotonic() + seconds
+        while not self._cancelled() and time.monotonic() < deadline:
+            time.sleep(min(0.25, max(deadline - time.monotonic(), 0)))
+
+    def _report(self, status, filename):
+        if self.progress_hook is None:
+            return
+        elapsed = time.monotonic() - self.started
+        self.progress_hook(
+            {
+                "status": status,
+                "filename": filename,
+                "tmpfilename": self.part_path,
+                "downloaded_bytes": self.downloaded_bytes,
+                "total_bytes": None,
+                "elapsed": elapsed,
+                "speed": self.downloaded_bytes / elapsed if elapsed else None,
+                "fragment_index": self.segments,
+                "info_dict": self.info_dict,
+            }
+        )
+
+    def _media_playlist_url(self):
+        """Resolves a master playlist to its best variant."""
+        text = self._fetch_text(self.manifest_url)
+        if "#EXT-X-STREAM-INF" not in text:
+            return self.manifest_url
+        variants = parse_master_playlist(text, self.manifest_url)
+        if not variants:
+            raise LiveCaptureError("the master playlist has no variants")
+        return variants[0]
+
+    def _write_segment(self, segment, out):
+        """Streams one segment into the open file out. Returns False if it is gone."""
+        for attempt in range(SEGMENT_RETRIES):
+            written = 0
+            try:
+                with self._open(segment.url) as response:
+                    while True:
+                        chunk = response.read(CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        out.write(chunk)
+                        written += len(chunk)
+                        self.downloaded_bytes += len(chunk)
+                        self._report("downloading", self.output)
+                return True
+            except (urllib.error.URLError, OSError) as e:
+                out.seek(out.tell() - written)
+                out.truncate()
+                self.downloaded_bytes -= written
+                if isinstance(e, urllib.error.HTTPError) and e.code in (404, 410):
+                    break
+                logging.debug("Segment %s failed (%s), retrying", segment.sequence, e)
+                self._sleep(attempt + 1)
+        logging.warning("Live segment %s could not be downloaded", segment.sequence)
+        return False
+
+    def _store_segment(self, segment):
+        if self.window is None:
+            with open(self.part_path, "ab") as out:
+                stored = self._write_segment(segment, out)
+        else:
+            path = os.path.join(self.segment_dir, f"{segment.sequence}.seg")
+            with open(path, "wb") as out:
+                stored = self._write_segment(segment, out)
+            if stored:
+                self.ring.append((segment, path))
+                self._trim_window()
+            else:
+                os.remove(path)
+        if stored:
+            self.segments += 1
+        else:
+            self.missed += 1
+
+    def _trim_window(self):
+        """Deletes the oldest segments while the rest still cover the window."""
+        kept = sum(segment.duration for segment, _ in self.ring)
+        while len(self.ring) > 1 and kept - self.ring[0][0].duration >= self.window:
+            segment, path = self.ring.popleft()
+            kept -= segment.duration
+            os.remove(path)
+
+    def _finish(self):
+        """Joins the kept segments into output. Returns its path, or None if empty."""
+        if self.window is not None:
+            with open(self.part_path, "wb") as out:
+                if self.init_data:
+                    out.write(self.init_data)
+                for _, path in self.ring:
+                    with open(path, "rb") as f:
+                        shutil.copyfileobj(f, out, CHUNK_SIZE)
+            shutil.rmtree(self.segment_dir, ignore_errors=True)
+            self.ring.clear()
+        if not os.path.exists(self.part_path) or not os.path.getsize(self.part_path):
+            if os.path.exists(self.part_path):
+                os.remove(self.part_path)
+            return None
+        os.replace(self.part_path, self.output)
+        return self.output
+
+    def record(self):
+        """Records until the stream ends or is cancelled. Returns the output path or None."""
+        self.started = time.monotonic()
+        os.makedirs(os.path.dirname(self.output) or ".", exist_ok=True)
+        if self.window is not None:
+            os.makedirs(self.segment_dir, exist_ok=True)
+        completed = False
+        try:
+            playlist_url = self._media_playlist_url()
+            next_sequence = None
+            stalled = 0
+            failures = 0  # Failed reloads in a row
+            target_duration = 6.0
+            while not self._cancelled():
+                try:
+                    text = self._fetch_text(playlist_url)
+                except (urllib.error.URLError, OSError) as e:
+                    gone = isinstance(e, urllib.error.HTTPError) and e.code in (404, 410)
+                    if gone and next_sequence is not None:
+                        logging.info("The live playlist is gone, the stream has ended")
+                        break
+                    stalled += 1
+                    failures += 1
+                    if stalled >= STALL_RELOADS:
+                        if next_sequence is None:
+                            raise  # Nothing was ever recorded
+                        logging.info("The live playlist could not be reloaded, stopping")
+                        break
+                    logging.debug("Live playlist reload failed (%s), retrying", e)
+                    backoff = target_duration / 2 * 2 ** (failures - 1)
+                    self._sleep(min(backoff, RELOAD_BACKOFF_MAX))
+                    continue
+                failures = 0
+                playlist = parse_media_playlist(text, playlist_url)
+                if playlist.init_url and self.init_data is None:
+                    with self._open(playlist.init_url) as response:
+                        self.init_data = response.read()
+                    if self.window is None:
+                        with open(self.part_path, "wb") as out:
+                            out.write(self.init_data)
+                target_duration = playlist.target_duration
+                new = playlist.segments
+                if next_sequence is None:
+                    if not playlist.ended:
+                        new = new[-LIVE_EDGE_SEGMENTS:]
+                else:
+                    if new and new[0].sequence > next_sequence:
+                        skipped = new[0].sequence - next_sequence
+                        logging.warning("Live capture missed %d segments", skipped)
+                        self.missed += skipped
+                    new = [s for s in new if s.sequence >= next_sequence]
+                for segment in new:
+                    if self._cancelled():
+                        break
+                    self._store_segment(segment)
+                    next_sequence = segment.sequence + 1
+                if playlist.ended:
+                    break
+                stalled = 0 if new else stalled + 1
+                if stalled >= STALL_RELOADS:
+                    logging.info("The live playlist stopped updating, the stream has ended")
+                    break
+                # Reload after a target duration, sooner if nothing new came (RFC 8216)
+                self._sleep(playlist.target_duration if new else playlist.target_duration / 2)
+            completed = True
+        finally:
+            # Whatever was recorded is kept, even if the recording failed or was cancelled
+            path = self._finish()
+        if completed and path is not None:
+            self._report("finished", path)
+        return path
@@ -1,8 +1,14 @@
 import sys
 import os
 import json
+import time
+import re
 import logging
+import heapq
+import threading
 import subprocess  # For opening folders
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from PyQt5.QtWidgets import (
     QApplication,
     QWidget,
@@ -12,45 +18,109 @@ from PyQt5.QtWidgets import (
     QPushButton,
     QListWidget,
     QListWidgetItem,
+    QListView,
     QLabel,
     QFileDialog,
     QProgressBar,
     QMessageBox,
     QTextEdit,
     QComboBox,
+    QSpinBox,
+    QDoubleSpinBox,
+    QCheckBox,
+    QDialog,
+    QTableWidget,
+    QTableWidgetItem,
 )
-from PyQt5.QtCore import QThread, pyqtSignal, Qt
+from PyQt5.QtCore import QObject, QThread, QTimer, pyqtSignal, Qt
 from PyQt5.QtGui import QIcon
-import yt_dlp
+from download_journal import DownloadJournal
+from download_archive import ArchiveFilter
+from playlist_model import PlaylistModel, PlaylistFilterModel
+from format_selector import describe_choice, limits_for_quality, select_formats
+from download_errors import ERROR_AUTH, ERROR_HINTS, classify_error
+from cookie_manager import COOKIE_PROBLEMS, COOKIES_EXPIRING, COOKIES_MISSING
+from content_store import DEFAULT_STORE_DIR
+from clips import format_timestamp, make_clip, parse_range
+from live_capture import describe_live
+from postprocess import AUDIO_FORMATS, VIDEO_CONTAINERS, DEFAULT_POSTPROCESS, PostProcessPool
+from telemetry import DEFAULT_METRICS_PATH, JobMetrics, MetricsRecorder, summarize
+from worker_pool import ProcessWorkerPool
+from subscriptions import DEFAULT_SUBSCRIPTIONS_PATH, SubscriptionList, is_settled
+from engine import (
+    QUALITY_PRESETS,
+    DEFAULT_QUALITY,
+    DEFAULT_PROFILE,
+    load_download_profiles,
+    STATE_QUEUED,
+    STATE_RUNNING,
+    STATE_PROCESSING,
+    STATE_DONE,
+    STATE_FAILED,
+    STATE_SKIPPED,
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_PROGRESS_RATE,
+    ProgressCoalescer,
+    ExtractionPipeline,
+    bandwidth_governor,
+    cookie_manager,
+    cookie_problem,
+    get_cookie_file_path,
+    extract_video_info,
+    playlist_entries,
+    iter_playlist_batches,
+    download_video,
+    downloaded_paths,
+    is_final,
+    submit_postprocess,
+    content_store,
+    load_yt_dlp,
+)
 
 logging.basicConfig(level=logging.DEBUG)
 
+JOURNAL_BYTES_INTERVAL = 5  # Seconds between byte-count records per running entry
 
-def get_cookie_file_path():
-    """Returns the absolute path of the cookies.txt file located in the Downloads folder."""
-    return os.path.join(os.path.expanduser("~"), "Downloads", "cookies.txt")
-
-
-def check_cookies_exist():
-    """Check if cookies.txt file exists and warn the user if it doesn't."""
-    cookie_path = get_cookie_file_path()
-    if not os.path.exists(cookie_path):
-        logging.warning(f"Cookies file not found at: {cookie_path}")
-        return False
-    logging.debug(f"Cookies file found at: {cookie_path}")
-    return True
+# Background prefetch of full metadata for playlist entries
+PREFETCH_WORKERS = 4
+PREFETCH_LOOKAHEAD = 10  # Entries after the selected one to resolve; 0 resolves all
 
 
 class DownloadThread(QThread):
-    progress_signal = pyqtSignal(dict)
-    finished_signal = pyqtSignal()
-    error_signal = pyqtSignal(str)
+    progress_signal = pyqtSignal(object)  # ProgressRecord, at most progress_rate per second
+    finished_signal = pyqtSignal(object)  # Downloaded files, for post-processing
+    error_signal = pyqtSignal(object)  # The exception (usually a ClassifiedError)
 
-    def __init__(self, url, quality_format, output_path):
+    def __init__(
+        self,
+        url,
+        quality_format,
+        output_path,
+        index=0,
+        progress_rate=DEFAULT_PROGRESS_RATE,
+        profile_opts=None,
+        format_limits=None,
+        postprocess=None,
+        metrics=None,
+        pipeline=None,
+        live=None,
+        clip=None,
+        worker_pool=None,
+    ):
         super().__init__()
         self.url = url
         self.quality_format = quality_format  # Selected quality format from the user
         self.output_path = output_path
+        self.index = index  # Playlist index reported in progress records
+        self.progress_rate = progress_rate
+        self.profile_opts = profile_opts  # Download performance profile options
+        self.format_limits = format_limits  # Size/bitrate budget for format selection
+        self.postprocess = postprocess  # Leave merging to the post-processing pool
+        self.metrics = metrics  # JobMetrics filled in during the download
+        self.pipeline = pipeline  # ExtractionPipeline that may have resolved the URL already
+        self.live = live  # Live recording options, or None to leave live streams to yt-dlp
+        self.clip = clip  # Time ranges or chapters to download (see clips.make_clip)
+        self.worker_pool = worker_pool  # ProcessWorkerPool running the download, or None
         self.cancelled = False  # Cancellation flag
 
     def cancel(self):
@@ -58,35 +128,323 @@ class DownloadThread(QThread):
         self.cancelled = True
 
     def run(self):
-        ydl_opts = {
-            "format": self.quality_format,
-            "merge_output_format": True,
-            "outtmpl": f"{self.output_path}/%(title)s_%(height)sp.%(ext)s",
-            "progress_hooks": [self.my_hook],
-            "cookiefile": get_cookie_file_path(),
-            "verbose": False,
-            "extractor_args": {"youtube": {"player_client": ["web"]}},
-            "ignoreerrors": True,
-            "nocheckcertificate": True,
-            "retries": 10,
-            "js_runtimes": {"node": {}},
+        options = {
+            "profile_opts": self.profile_opts,
+            "format_limits": self.format_limits,
+            "postprocess": self.postprocess,
+            "metrics": self.metrics,
+            "pipeline": self.pipeline,
+            "live": self.live,
+            "clip": self.clip,
         }
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([self.url])
-            self.finished_signal.emit()
+            if self.worker_pool is not None:
+                # Progress records arrive from the pool's event thread; the signal
+                # delivers them on the GUI thread
+                files = self.worker_pool.download(
+                    self.url,
+                    self.quality_format,
+                    self.output_path,
+                    progress_hook=self.progress_signal.emit,
+                    is_cancelled=lambda: self.cancelled,
+                    index=self.index,
+                    workers=self.metrics.workers if self.metrics is not None else 1,
+                    progress_rate=self.progress_rate,
+                    **options,
+                )
+            else:
+                files = download_video(
+                    self.url,
+                    self.quality_format,
+                    self.output_path,
+                    progress_hook=ProgressCoalescer(
+                        self.index, self.progress_signal.emit, self.progress_rate
+                    ),
+                    is_cancelled=lambda: self.cancelled,
+                    **options,
+                )
+            self.finished_signal.emit(files)
         except Exception as e:
             logging.exception("Error during download:")
-            self.error_signal.emit(str(e))
+            self.error_signal.emit(e)
+
+
+class DownloadScheduler(QObject):
+    """
+    Runs queued downloads through a bounded pool of DownloadThread workers,
+    tracking the state and progress of every entry by its playlist index. With
+    postprocess set, finished downloads are merged/converted on a PostProcessPool
+    while the freed worker slot already downloads the next entry. While workers
+    transfer, an ExtractionPipeline resolves the entries next in line, so a
+    freed worker starts the next download without extracting it first.
+    """
+
+    state_signal = pyqtSignal(int, str)  # Entry index, new state
+    progress_signal = pyqtSignal(object)  # ProgressRecord
+    aggregate_signal = pyqtSignal(float)  # Overall completion between 0 and 1
+    error_signal = pyqtSignal(int, str)  # Entry index, error message
+    finished_signal = pyqtSignal()  # Queue drained and all workers idle
+    postprocessed_signal = pyqtSignal(int, object, object, float)  # Index, output, error, s
+    metrics_signal = pyqtSignal(object)  # Metrics record (dict) of a finished job
+
+    def __init__(
+        self,
+        max_workers=DEFAULT_MAX_WORKERS,
+        max_queue=10000,
+        journal=None,
+        progress_rate=DEFAULT_PROGRESS_RATE,
+        metrics=None,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.max_workers = max(1, int(max_workers))
+        self.max_queue = max_queue  # Upper bound on entries waiting for a worker
+        self.journal = journal  # Optional DownloadJournal receiving every state change
+        self.progress_rate = progress_rate  # Progress updates per second per worker
+        self.pending = deque()
+        self.workers = {}  # Entry index -> running DownloadThread
+        self.urls = {}  # Entry index -> URL
+        self.states = {}  # Entry index -> STATE_*
+        self.fractions = {}  # Entry index -> completion between 0 and 1
+        self.errors = {}  # Entry index -> last error message
+        self.error_kinds = {}  # Entry index -> kind of the last error (download_errors)
+        self.journal_marks = {}  # Entry index -> time of the last byte-count record
+        self.postprocess = None  # Post-processing options for the run, or None
+        self.live = None  # Live recording options for the run (see download_video)
+        self.postprocess_pool = PostProcessPool()
+        self.processing = set()  # Entry indices handed to the post-processing pool
+        self.postprocessed_signal.connect(self._on_postprocessed)
+        self.metrics = metrics  # Optional MetricsRecorder receiving one record per job
+        self.job_metrics = {}  # Entry index -> JobMetrics of its current download
+        self.pipeline = ExtractionPipeline()  # Look-ahead extraction; None disables it
+        self.worker_pool = None  # ProcessWorkerPool running the work, or None for threads
+        self.cancelled = False
+
+    def reset(self):
+        """Forgets all entries from a previous run. Only valid while idle."""
+        self.pending.clear()
+        self.urls.clear()
+        self.states.clear()
+        self.fractions.clear()
+        self.errors.clear()
+        self.error_kinds.clear()
+        self.journal_marks.clear()
+        self.processing.clear()
+        self.job_metrics.clear()
+        self.cancelled = False
+
+    def is_active(self):
+        return bool(self.workers or self.pending or self.processing)
+
+    def set_max_workers(self, max_workers):
+        """Changes the worker count; extra slots are filled immediately."""
+        self.max_workers = max(1, int(max_workers))
+        self._fill_workers()
+
+    def enqueue(
+        self,
+        index,
+        url,
+        quality_format,
+        output_path,
+        profile_opts=None,
+        format_limits=None,
+        clip=None,
+    ):
+        """Adds an entry to the queue. Returns False if the queue is full."""
+        if len(self.pending) >= self.max_queue:
+            logging.warning("Download queue is full, entry %s was not queued", index)
+            return False
+        self.pending.append(
+            (index, url, quality_format, output_path, profile_opts, format_limits, clip)
+        )
+        self.urls[index] = url
+        self.errors.pop(index, None)
+        self.fractions[index] = 0.0
+        self._set_state(index, STATE_QUEUED)
+        return True
+
+    def set_worker_pool(self, worker_pool):
+        """Runs extractions and downloads in worker_pool's processes, or in threads if None."""
+        if worker_pool is self.worker_pool:
+            return
+        self.worker_pool = worker_pool
+        if self.pipeline is not None:
+            self.pipeline.shutdown()
+        self.pipeline = worker_pool.pipeline() if worker_pool else ExtractionPipeline()
+
+    def start(self):
+        self.cancelled = False
+        if self.worker_pool is not None:
+            self.worker_pool.reset()
+        self._fill_workers()
+        if not self.is_active():
+            self.finished_signal.emit()
+
+    def cancel(self):
+        """
+        Cooperatively stops all workers and marks waiting entries as skipped.
+        Returns at once; finished_signal is emitted when the last worker has ended.
+        """
+        self.cancelled = True
+        if self.pipeline is not None:
+            self.pipeline.cancel()
+        if self.worker_pool is not None:
+            self.worker_pool.cancel()
+        while self.pending:
+            index = self.pending.popleft()[0]
+            self._set_state(index, STATE_SKIPPED)
+        for thread in list(self.workers.values()):
+            thread.cancel()
+        if not self.workers:
+            self.finished_signal.emit()
+
+    def counts(self):
+        """Returns a dict mapping each state to the number of entries in it."""
+        result = {}
+        for state in self.states.values():
+            result[state] = result.get(state, 0) + 1
+        return result
+
+    def _fill_workers(self):
+        while (
+            not self.cancelled
+            and self.pending
+            and len(self.workers) < self.max_workers
+        ):
+            index, url, quality_format, output_path, profile_opts, format_limits, clip = (
+                self.pending.popleft()
+            )
+            self.job_metrics[index] = JobMetrics(url, index, self.max_workers)
+            thread = DownloadThread(
+                url,
+                quality_format,
+                output_path,
+                index,
+                self.progress_rate,
+                profile_opts,
+                format_limits,
+                self.postprocess,
+                self.job_metrics[index],
+                self.pipeline,
+                self.live,
+                clip,
+                self.worker_pool,
+            )
+            thread.progress_signal.connect(self._on_progress)
+            thread.finished_signal.connect(lambda files, i=index: self._on_done(i, files))
+            thread.error_signal.connect(lambda error, i=index: self._on_error(i, error))
+            thread.finished.connect(lambda i=index: self._on_thread_exit(i))
+            self.workers[index] = thread
+            self._set_state(index, STATE_RUNNING)
+            thread.start()
+        if self.pipeline is not None and not self.cancelled:
+            # One entry ahead per worker: each freed worker finds its next one resolved
+            for entry in list(self.pending)[: self.max_workers]:
+                self.pipeline.prefetch(entry[1])
+
+    def _set_state(self, index, state):
+        self.states[index] = state
+        if self.journal is not None:
+            self.journal.record(index, self.urls.get(index), status=state)
+        if state in (STATE_DONE, STATE_FAILED, STATE_SKIPPED):
+            self.fractions[index] = 1.0
+        self.state_signal.emit(index, state)
+        self._emit_aggregate()
+
+    def _emit_aggregate(self):
+        if self.fractions:
+            self.aggregate_signal.emit(
+                sum(self.fractions.values()) / len(self.fractions)
+            )
+
+    def _on_progress(self, record):
+        index = record.index
+        if record.status == "downloading" and record.total_bytes:
+            self.fractions[index] = min(record.downloaded_bytes / record.total_bytes, 1.0)
+            self._emit_aggregate()
+        if self.journal is not None:
+            now = time.monotonic()
+            if record.status == "finished":
+                self.journal.record(
+                    index,
+                    self.urls.get(index),
+                    filename=record.filename,
+                    bytes_done=record.downloaded_bytes,
+                )
+            elif now - self.journal_marks.get(index, 0) >= JOURNAL_BYTES_INTERVAL:
+                self.journal_marks[index] = now
+                self.journal.record(
+                    index, self.urls.get(index), bytes_done=record.downloaded_bytes
+                )
+        self.progress_signal.emit(record)
 
-    def my_hook(self, d):
-        # Check cancellation flag in the progress hook
+    def _record_metrics(self, index, status, paths=(), merge_seconds=None, error_kind=None):
+        job = self.job_metrics.pop(index, None)
+        if job is None or self.metrics is None:
+            return
+        record = job.record(status, paths, merge_seconds, error_kind)
+        self.metrics.write(record)
+        self.metrics_signal.emit(record)
+
+    def _on_done(self, index, files):
+        if self.postprocess is None or not files or is_final(files):
+            container = (self.postprocess or DEFAULT_POSTPROCESS)["container"]
+            self._record_metrics(index, STATE_DONE, downloaded_paths(files, container))
+            self._set_state(index, STATE_DONE)
+            return
+        self.processing.add(index)
+        self._set_state(index, STATE_PROCESSING)
+        # Called from a pool thread; the signal delivers it on the GUI thread
+        submit_postprocess(
+            self.postprocess_pool,
+            files,
+            self.postprocess,
+            lambda output, error, seconds, i=index: self.postprocessed_signal.emit(
+                i, output, error, seconds
+            ),
+        )
+
+    def _on_postprocessed(self, index, output, error, seconds):
+        if index not in self.processing:
+            return  # Finished after reset() started another run
+        self.processing.discard(index)
+        if error:
+            logging.error("Post-processing of entry %s failed: %s", index, error)
+            self.errors[index] = error
+            self.error_kinds[index] = classify_error(error)
+            self._record_metrics(index, STATE_FAILED, (), seconds, self.error_kinds[index])
+            self._set_state(index, STATE_FAILED)
+            self.error_signal.emit(index, error)
+        else:
+            self._record_metrics(index, STATE_DONE, [output], seconds)
+            self._set_state(index, STATE_DONE)
+        if not self.cancelled and not self.is_active():
+            self.finished_signal.emit()
+
+    def _on_error(self, index, error):
+        if self.cancelled:
+            self.job_metrics.pop(index, None)
+            self._set_state(index, STATE_SKIPPED)
+            return
+        error_msg = str(error)
+        kind = classify_error(error)
+        logging.error("Download of entry %s failed (%s): %s", index, kind, error_msg)
+        self.errors[index] = error_msg
+        self.error_kinds[index] = kind
+        self._record_metrics(index, STATE_FAILED, error_kind=kind)
+        self._set_state(index, STATE_FAILED)
+        self.error_signal.emit(index, error_msg)
+
+    def _on_thread_exit(self, index):
+        self.workers.pop(index, None)
         if self.cancelled:
-            raise Exception("Download cancelled by user")
-        if d.get("status") == "downloading":
-            self.progress_signal.emit(d)
-        elif d.get("status") == "finished":
-            self.progress_signal.emit(d)
+            if not self.workers:
+                self.finished_signal.emit()
+            return
+        self._fill_workers()
+        if not self.is_active():
+            self.finished_signal.emit()
 
 
 class InfoFetchThread(QThread):
@@ -96,12 +454,13 @@ class InfoFetchThread(QThread):
     """
 
     info_signal = pyqtSignal(dict)
-    error_signal = pyqtSignal(str)
+    error_signal = pyqtSignal(object)  # The exception
 
-    def __init__(self, url, flat=True):
+    def __init__(self, url, flat=True, use_cache=True):
         super().__init__()
         self.url = url
         self.flat = flat  # If True, perform flat extraction (for playlists); if False, full extraction
+        self.use_cache = use_cache  # If True, serve repeated requests from metadata_cache
         self.cancelled = False  # Cancellation flag
 
     def cancel(self):
@@ -111,53 +470,360 @@ class InfoFetchThread(QThread):
     def run(self):
         if self.cancelled:
             return  # Exit if cancellation was requested before starting
-        ydl_opts = {
-            "skip_download": True,
-            "quiet": True,
-            "cookiefile": get_cookie_file_path(),
-            "extractor_args": {"youtube": {"player_client": ["web"]}},
-            "ignoreerrors": True,
-            "nocheckcertificate": True,
-            "js_runtimes": {"node": {}},
-        }
-        if self.flat and "list=" in self.url:
-            ydl_opts["extract_flat"] = True
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(self.url, download=False)
-            if info is None:
-                raise Exception(
-                    "No information could be extracted. The video may be unavailable, private, or requires authentication."
-                )
-            if info.get("_type") == "playlist" or "entries" in info:
-                pass
-            elif not info.get("formats"):
-                raise Exception(
-                    "No formats available for this video. It may be unavailable or requires authentication."
-                )
+            info = extract_video_info(self.url, self.flat, self.use_cache)
+            if self.cancelled:
+                return
             self.info_signal.emit(info)
         except Exception as e:
             logging.exception("Error fetching information:")
-            self.error_signal.emit(str(e))
+            self.error_signal.emit(e)
+
+
+class PlaylistStreamThread(QThread):
+    """
+    Pages through a playlist with flat extraction and emits its entries in batches
+    as they arrive, so the list fills in (and downloads can start) before the last
+    page is fetched.
+    """
+
+    entries_signal = pyqtSignal(list)  # Batch of {"title", "url"}
+    error_signal = pyqtSignal(object)  # The exception
+
+    def __init__(self, url, use_cache=True):
+        super().__init__()
+        self.url = url
+        self.use_cache = use_cache  # If False, list the playlist afresh
+        self.failed = False
+        self.cancelled = False  # Cancellation flag
+
+    def cancel(self):
+        """Set the cancellation flag to True to cooperatively stop paging."""
+        self.cancelled = True
+
+    def run(self):
+        try:
+            for batch in iter_playlist_batches(
+                self.url, is_cancelled=lambda: self.cancelled, use_cache=self.use_cache
+            ):
+                if self.cancelled:
+                    return
+                self.entries_signal.emit(batch)
+        except Exception as e:
+            logging.exception("Error fetching playlist:")
+            self.failed = True
+            self.error_signal.emit(e)
+
+
+class PlaylistPrefetchThread(QThread):
+    """
+    Resolves full metadata for playlist entries in the background using a bounded
+    thread pool, so selecting an entry is served from metadata_cache. Entries from
+    the selected row onwards are resolved first.
+    """
+
+    entry_ready = pyqtSignal(int)  # Entry index whose full info is now cached
+    entry_failed = pyqtSignal(int, str)
+
+    def __init__(
+        self, urls, max_workers=PREFETCH_WORKERS, lookahead=PREFETCH_LOOKAHEAD, parent=None
+    ):
+        super().__init__(parent)
+        self.urls = list(urls)
+        self.max_workers = max(1, max_workers)
+        self.lookahead = lookahead  # 0 resolves every entry
+        self.queue = []  # Heap of (-generation, offset, index)
+        self.generation = 0  # Bumped every time the selection moves
+        self.anchor = 0  # Row the current window starts at
+        self.resolved = set()
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()  # Set when new work is queued or on cancel
+        self.cancelled = False  # Cancellation flag
+        self.prioritize(0)
+
+    def cancel(self):
+        """Set the cancellation flag to True to cooperatively stop prefetching."""
+        self.cancelled = True
+        self.wakeup.set()
+
+    def prioritize(self, index):
+        """Moves index and the entries after it to the front of the queue."""
+        if not 0 <= index < len(self.urls):
+            return
+        end = len(self.urls)
+        if self.lookahead:
+            end = min(end, index + 1 + self.lookahead)
+        with self.lock:
+            self.generation += 1
+            self.anchor = index
+            for offset, entry in enumerate(range(index, end)):
+                if entry not in self.resolved:
+                    heapq.heappush(self.queue, (-self.generation, offset, entry))
+        self.wakeup.set()
+
+    def add_urls(self, urls):
+        """Appends entries streamed in after the thread started."""
+        with self.lock:
+            start = len(self.urls)
+            self.urls.extend(urls)
+            end = len(self.urls)
+            if self.lookahead:
+                end = min(end, self.anchor + 1 + self.lookahead)
+            for entry in range(start, end):
+                heapq.heappush(self.queue, (-self.generation, entry - self.anchor, entry))
+        self.wakeup.set()
+
+    def _next_index(self, busy):
+        with self.lock:
+            while self.queue:
+                generation, _, index = heapq.heappop(self.queue)
+                if index in self.resolved or index in busy:
+                    continue
+                # With a bounded lookahead, drop windows the selection has moved away from
+                if self.lookahead and -generation != self.generation:
+                    continue
+                return index
+        return None
+
+    def run(self):
+        in_flight = {}  # Future -> entry index
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while not self.cancelled:
+                while len(in_flight) < self.max_workers:
+                    index = self._next_index(set(in_flight.values()))
+                    if index is None:
+                        break
+                    future = pool.submit(extract_video_info, self.urls[index], False)
+                    in_flight[future] = index
+                if not in_flight:
+                    # Idle until the selection moves or more entries stream in
+                    self.wakeup.wait(0.5)
+                    self.wakeup.clear()
+                    continue
+                done, _ = wait(list(in_flight), timeout=0.2, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = in_flight.pop(future)
+                    with self.lock:
+                        self.resolved.add(index)
+                    try:
+                        future.result()
+                        self.entry_ready.emit(index)
+                    except Exception as e:
+                        logging.debug("Prefetch of entry %s failed: %s", index, e)
+                        self.entry_failed.emit(index, str(e))
+            for future in in_flight:
+                future.cancel()
+
+
+class SubscriptionSyncThread(QThread):
+    """
+    Syncs the subscription list and emits the SyncResult of each subscription as
+    it finishes. With mark_seen, the new entries are recorded as seen instead of
+    being emitted, to subscribe without downloading what is already there.
+    """
+
+    result_signal = pyqtSignal(object)  # SyncResult
+
+    def __init__(self, subscriptions, urls=None, mark_seen=False):
+        super().__init__()
+        self.subscriptions = subscriptions
+        self.urls = urls
+        self.mark_seen = mark_seen
+        self.results = []
+        self.elapsed = 0.0
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def on_result(self, result):
+        if self.mark_seen:
+            self.subscriptions.mark_seen(result.url, [video["id"] for video in result.new])
+        else:
+            self.result_signal.emit(result)
+
+    def run(self):
+        started = time.monotonic()
+        try:
+            self.results = self.subscriptions.sync(
+                self.urls, on_result=self.on_result, is_cancelled=lambda: self.cancelled
+            )
+        except Exception:
+            logging.exception("Error syncing subscriptions:")
+        self.elapsed = time.monotonic() - started
+
+
+class SubscriptionsDialog(QDialog):
+    """Table of the subscribed channels and playlists with the timing of their last sync."""
+
+    # (header, subscription field, formatter)
+    COLUMNS = [
+        ("Channel or playlist", "url", str),
+        ("Folder", "output", str),
+        ("Order", "newest_first", lambda v: "newest first" if v else "oldest first"),
+        ("Known", "seen", lambda v: str(len(v))),
+        ("Last sync", "last_sync", lambda v: time.strftime("%d %b %H:%M", time.localtime(v))),
+        ("Sync (s)", "last_seconds", lambda v: f"{v:.2f}"),
+        ("New", "last_new", str),
+        ("Error", "last_error", str),
+    ]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Subscriptions")
+        self.resize(900, 400)
+        layout = QVBoxLayout()
+        self.summary_label = QLabel("")
+        layout.addWidget(self.summary_label)
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels([header for header, _, _ in self.COLUMNS])
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        layout.addWidget(self.table)
+        buttons_layout = QHBoxLayout()
+        self.add_button = QPushButton("Subscribe to URL")
+        self.add_button.setToolTip(
+            "Subscribe to the channel or playlist in the URL field, downloading into "
+            "the selected output folder."
+        )
+        buttons_layout.addWidget(self.add_button)
+        self.remove_button = QPushButton("Remove")
+        buttons_layout.addWidget(self.remove_button)
+        self.sync_button = QPushButton("Sync now")
+        buttons_layout.addWidget(self.sync_button)
+        buttons_layout.addWidget(QLabel("Sync every (min):"))
+        self.interval_spin = QSpinBox()
+        self.interval_spin.setRange(0, 24 * 60)
+        self.interval_spin.setSpecialValueText("Never")
+        buttons_layout.addWidget(self.interval_spin)
+        layout.addLayout(buttons_layout)
+        self.path_label = QLabel(f"Kept in {os.path.abspath(DEFAULT_SUBSCRIPTIONS_PATH)}")
+        layout.addWidget(self.path_label)
+        self.setLayout(layout)
+
+    def selected_urls(self):
+        rows = {index.row() for index in self.table.selectionModel().selectedRows()}
+        return [self.table.item(row, 0).text() for row in sorted(rows)]
+
+    def set_subscriptions(self, subscriptions, status=""):
+        self.table.setRowCount(len(subscriptions))
+        for row, subscription in enumerate(subscriptions):
+            for column, (_, field, formatter) in enumerate(self.COLUMNS):
+                value = subscription.get(field)
+                text = formatter(value) if value is not None else ""
+                self.table.setItem(row, column, QTableWidgetItem(text))
+        if status:
+            self.summary_label.setText(status)
+
+
+class MetricsDialog(QDialog):
+    """Table of per-download metrics records with a summary line, newest first."""
+
+    # (header, record field, formatter)
+    COLUMNS = [
+        ("#", "index", lambda v: str(v + 1)),
+        ("Status", "status", str),
+        ("Error", "error_kind", str),
+        ("Extraction (s)", "extraction_s", lambda v: f"{v:.2f}"),
+        ("First byte (s)", "ttfb_s", lambda v: f"{v:.2f}"),
+        ("Avg MB/s", "avg_throughput", lambda v: f"{v / 1024 / 1024:.2f}"),
+        ("Peak MB/s", "peak_throughput", lambda v: f"{v / 1024 / 1024:.2f}"),
+        ("Fragment retries", "fragment_retries", str),
+        ("Job retries", "job_retries", str),
+        ("Merge (s)", "merge_s", lambda v: f"{v:.2f}"),
+        ("On disk (MB)", "bytes_on_disk", lambda v: f"{v / 1024 / 1024:.1f}"),
+        ("Workers", "workers", str),
+    ]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Download metrics")
+        self.resize(900, 400)
+        layout = QVBoxLayout()
+        self.summary_label = QLabel("")
+        layout.addWidget(self.summary_label)
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels([header for header, _, _ in self.COLUMNS])
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table)
+        self.path_label = QLabel(f"Also written to {os.path.abspath(DEFAULT_METRICS_PATH)}")
+        layout.addWidget(self.path_label)
+        self.setLayout(layout)
+
+    def set_records(self, records):
+        records = list(reversed(records))
+        self.table.setRowCount(len(records))
+        for row, record in enumerate(records):
+            for column, (_, field, formatter) in enumerate(self.COLUMNS):
+                value = record.get(field)
+                text = formatter(value) if value is not None else ""
+                self.table.setItem(row, column, QTableWidgetItem(text))
+        summary = summarize(records)
+        parts = [f"{summary['done']} of {summary['jobs']} done"]
+        if summary["mean_ttfb_s"] is not None:
+            parts.append(f"mean first byte {summary['mean_ttfb_s']:.2f}s")
+        if summary["mean_throughput"] is not None:
+            parts.append(f"mean {summary['mean_throughput'] / 1024 / 1024:.2f} MB/s")
+        parts.append(f"{summary['fragment_retries']} fragment retries")
+        parts.append(f"{summary['bytes_on_disk'] / 1024 / 1024:.1f} MB on disk")
+        self.summary_label.setText(", ".join(parts))
 
 
 class MainWindow(QWidget):
+    cookie_status_signal = pyqtSignal(object)  # CookieStatus, from the cookie watcher
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("YouTube Downloader with yt-dlp")
         self.setWindowIcon(QIcon("icon.png"))
         self.last_formats = None  # Will store the array of formats obtained
+        self.formats_url = None  # Video the format list belongs to
+        self.formats_duration = None  # Its duration, for size estimates
+        self.selected_format_id = None  # Exact format double-clicked in the format list
         self.last_metadata = {}  # Will store metadata (title, description, uploader, etc.)
         self.output_folder = None
-        self.download_thread = None
+        self.journal = DownloadJournal()  # Crash-safe record of the current download run
+        self.metrics = MetricsRecorder(DEFAULT_METRICS_PATH)  # Per-download performance records
+        self.metrics_dialog = None  # Summary table, created on first use
+        self.scheduler = DownloadScheduler(
+            journal=self.journal, metrics=self.metrics, parent=self
+        )
+        self.scheduler.metrics_signal.connect(self.update_metrics_dialog)
+        self.scheduler.state_signal.connect(self.update_entry_state)
+        self.scheduler.progress_signal.connect(self.update_progress)
+        self.scheduler.aggregate_signal.connect(self.update_aggregate_progress)
+        self.scheduler.finished_signal.connect(self.download_finished)
         self.info_thread = None  # Thread to fetch complete info in a single request
         self.download_in_progress = False  # Flag to track active download
         self.last_downloaded_file = None  # Stores the last downloaded file path
-        self.playlist_videos = []  # List to store playlist video objects (each with title and url)
+        self.playlist_model = PlaylistModel(self)  # Playlist entries (title and url)
+        self.playlist_filter = PlaylistFilterModel(self)  # Search over playlist_model
+        self.playlist_filter.setSourceModel(self.playlist_model)
         self.current_playlist_index = 0  # Current index in the playlist
         self.full_info_thread = None  # Stores the thread for full metadata fetch
+        self.worker_pool = None  # ProcessWorkerPool, created when first used
+        self.prefetch_thread = None  # Resolves playlist entries in the background
+        self.stream_active = False  # A PlaylistStreamThread is still delivering entries
+        self.download_follows_stream = False  # Queue streamed entries as they arrive
+        # (quality_format, output_folder, profile_opts, format_limits) of the queue
+        self.active_download = None
+        self.archive_filter = None  # Already-downloaded check for the running queue
+        self.subscriptions = SubscriptionList(DEFAULT_SUBSCRIPTIONS_PATH)
+        self.subscriptions_dialog = None  # Created on first use
+        self.sync_thread = None  # SubscriptionSyncThread of the running sync
+        self.subscription_jobs = {}  # Entry index -> (subscription URL, entry id)
+        self.background_run = False  # The running queue was started by a sync
+        self.sync_interval = 0  # Minutes between scheduled syncs; 0 disables them
+        self.sync_timer = QTimer(self)
+        self.sync_timer.timeout.connect(self.sync_subscriptions)
         self.setup_ui()
         self.load_config()
+        # The cookies file is parsed and checked off the GUI thread, and again on changes
+        self.cookie_status_signal.connect(self.update_cookie_status)
+        cookie_manager.add_listener(self.cookie_status_signal.emit)
+        cookie_manager.start_watching()
+        # Offer to resume an interrupted run once the window is shown
+        QTimer.singleShot(0, self.resume_from_journal)
 
     def setup_ui(self):
         layout = QVBoxLayout()
@@ -168,37 +834,88 @@ class MainWindow(QWidget):
         layout.addWidget(self.url_input)
 
         # Button to fetch complete information (formats and metadata)
+        fetch_layout = QHBoxLayout()
         self.fetch_button = QPushButton("Get Information")
-        self.fetch_button.clicked.connect(self.fetch_info)
-        layout.addWidget(self.fetch_button)
+        self.fetch_button.clicked.connect(lambda: self.fetch_info())
+        fetch_layout.addWidget(self.fetch_button)
+        # Bypasses the metadata cache, e.g. to see a playlist's newest uploads
+        self.refresh_button = QPushButton("Refresh")
+        self.refresh_button.setToolTip("Fetch the information again, bypassing the cache.")
+        self.refresh_button.clicked.connect(lambda: self.fetch_info(use_cache=False))
+        fetch_layout.addWidget(self.refresh_button)
+        layout.addLayout(fetch_layout)
+        self.cookie_label = QLabel("Cookies: checking...")
+        layout.addWidget(self.cookie_label)
 
         self.videolist_label = QLabel("Video list:")
         layout.addWidget(self.videolist_label)
 
-        # Playlist listbox added below Get Information
-        self.playlist_list = QListWidget()
-        # self.playlist_list.setPlaceholderText("Playlist videos will appear here...")
-        self.playlist_list.itemDoubleClicked.connect(
-            self.on_playlist_item_double_clicked
+        # Search box filtering the playlist without rebuilding it
+        self.playlist_search = QLineEdit()
+        self.playlist_search.setPlaceholderText("Search the video list...")
+        self.playlist_search.textChanged.connect(
+            self.playlist_filter.setFilterFixedString
+        )
+        layout.addWidget(self.playlist_search)
+
+        # Playlist view added below Get Information; only visible rows are rendered
+        self.playlist_list = QListView()
+        self.playlist_list.setModel(self.playlist_filter)
+        self.playlist_list.setUniformItemSizes(True)
+        self.playlist_list.setEditTriggers(QListView.NoEditTriggers)
+        self.playlist_list.doubleClicked.connect(self.on_playlist_item_double_clicked)
+        self.playlist_list.selectionModel().currentChanged.connect(
+            self.on_playlist_current_changed
         )
         layout.addWidget(self.playlist_list)
 
         # Text area to display description and metadata
         self.metadata_label = QLabel("Metadata and description:")
         layout.addWidget(self.metadata_label)
+        metadata_layout = QHBoxLayout()
         self.metadata_text = QTextEdit()
         self.metadata_text.setReadOnly(True)
         self.metadata_text.setPlaceholderText(
             "Video description and metadata will appear here..."
         )
-        layout.addWidget(self.metadata_text)
+        metadata_layout.addWidget(self.metadata_text, 2)
+
+        # Clip of the loaded video: checked chapters and/or a time range; only those
+        # parts are downloaded
+        clip_layout = QVBoxLayout()
+        clip_layout.addWidget(QLabel("Chapters (check to download only those):"))
+        self.chapter_list = QListWidget()
+        clip_layout.addWidget(self.chapter_list)
+        range_layout = QHBoxLayout()
+        range_layout.addWidget(QLabel("From:"))
+        self.clip_start_input = QLineEdit()
+        self.clip_start_input.setPlaceholderText("h:mm:ss")
+        range_layout.addWidget(self.clip_start_input)
+        range_layout.addWidget(QLabel("To:"))
+        self.clip_end_input = QLineEdit()
+        self.clip_end_input.setPlaceholderText("end")
+        range_layout.addWidget(self.clip_end_input)
+        clip_layout.addLayout(range_layout)
+        self.split_chapters_check = QCheckBox("One file per chapter")
+        clip_layout.addWidget(self.split_chapters_check)
+        self.precise_cuts_check = QCheckBox("Precise cuts (slower)")
+        self.precise_cuts_check.setToolTip(
+            "Re-encode around the cuts instead of cutting at the nearest keyframes."
+        )
+        clip_layout.addWidget(self.precise_cuts_check)
+        metadata_layout.addLayout(clip_layout, 1)
+        layout.addLayout(metadata_layout)
 
         self.videolist_label = QLabel("Formats:")
         layout.addWidget(self.videolist_label)
 
-        # List to display available formats (retained for legacy purposes)
+        # Available formats; double-click one to download exactly that format
         self.format_list = QListWidget()
+        self.format_list.itemDoubleClicked.connect(self.on_format_double_clicked)
         layout.addWidget(self.format_list)
+        # Formats the selection engine would download, with the predicted size
+        self.format_choice_label = QLabel("")
+        layout.addWidget(self.format_choice_label)
 
         # Output folder selection with additional Open Folder button
         folder_layout = QHBoxLayout()
@@ -210,24 +927,121 @@ class MainWindow(QWidget):
         self.open_folder_button = QPushButton("Open Folder")
         self.open_folder_button.clicked.connect(self.open_folder)
         folder_layout.addWidget(self.open_folder_button)
+        # Besides the download archive, also skip titles already present in the folder
+        self.scan_folder_check = QCheckBox("Skip files already in folder")
+        folder_layout.addWidget(self.scan_folder_check)
+        # Keep each video once in the content store and hardlink it into output folders
+        self.store_check = QCheckBox("Share videos between folders")
+        self.store_check.setToolTip(
+            "Videos already downloaded to another folder are linked instead of "
+            f"downloaded again. Files are kept in {DEFAULT_STORE_DIR}."
+        )
+        self.store_dir = DEFAULT_STORE_DIR
+        self.store_check.toggled.connect(
+            lambda checked: content_store.set_root(self.store_dir if checked else None)
+        )
+        folder_layout.addWidget(self.store_check)
         layout.addLayout(folder_layout)
 
         # Quality selection dropdown
         quality_layout = QHBoxLayout()
         self.quality_label = QLabel("Select Quality:")
         self.quality_combo = QComboBox()
-        self.quality_combo.addItem("Low 144p", "best[height<=144]")
-        self.quality_combo.addItem("Low 240p", "best[height<=240]")
-        self.quality_combo.addItem("Medium 360p", "best[height<=360]")
-        self.quality_combo.addItem("Medium 480p", "best[height<=480]")
-        self.quality_combo.addItem("High 720p", "best[height<=720]")
-        self.quality_combo.addItem("High 1080p", "best[height<=1080]")
-        self.quality_combo.addItem("Audio Only", "bestaudio")
-        self.quality_combo.addItem("Best Quality", "best")
+        for label, quality_format in QUALITY_PRESETS:
+            self.quality_combo.addItem(label, quality_format)
+        self.quality_combo.currentIndexChanged.connect(self.update_format_choice)
         quality_layout.addWidget(self.quality_label)
         quality_layout.addWidget(self.quality_combo)
+        # Size budget per video; formats are then chosen to fit it
+        self.max_size_label = QLabel("Max size (MB):")
+        self.max_size_spin = QSpinBox()
+        self.max_size_spin.setRange(0, 100000)
+        self.max_size_spin.setSpecialValueText("No limit")
+        self.max_size_spin.valueChanged.connect(self.update_format_choice)
+        quality_layout.addWidget(self.max_size_label)
+        quality_layout.addWidget(self.max_size_spin)
+        # Download performance profile: fragment concurrency, chunking, rate limit...
+        self.profile_label = QLabel("Profile:")
+        self.profile_combo = QComboBox()
+        self.populate_profiles()
+        quality_layout.addWidget(self.profile_label)
+        quality_layout.addWidget(self.profile_combo)
+        # Number of playlist entries downloaded at the same time
+        self.workers_label = QLabel("Parallel downloads:")
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, 16)
+        self.workers_spin.setValue(DEFAULT_MAX_WORKERS)
+        self.workers_spin.valueChanged.connect(self.scheduler.set_max_workers)
+        quality_layout.addWidget(self.workers_label)
+        quality_layout.addWidget(self.workers_spin)
+        # Extract and download in worker processes, so yt-dlp uses every CPU core
+        self.processes_check = QCheckBox("Use all CPU cores")
+        self.processes_check.setToolTip(
+            "Run extractions and downloads in separate processes. Helps large "
+            "playlists when extraction keeps one core busy."
+        )
+        quality_layout.addWidget(self.processes_check)
         layout.addLayout(quality_layout)
 
+        # Post-processing applied to finished downloads, off the download workers
+        postprocess_layout = QHBoxLayout()
+        self.container_label = QLabel("Container:")
+        self.container_combo = QComboBox()
+        self.container_combo.addItems(VIDEO_CONTAINERS)
+        postprocess_layout.addWidget(self.container_label)
+        postprocess_layout.addWidget(self.container_combo)
+        self.audio_format_label = QLabel("Audio only as:")
+        self.audio_format_combo = QComboBox()
+        self.audio_format_combo.addItems(AUDIO_FORMATS)
+        postprocess_layout.addWidget(self.audio_format_label)
+        postprocess_layout.addWidget(self.audio_format_combo)
+        self.thumbnail_check = QCheckBox("Embed thumbnail")
+        postprocess_layout.addWidget(self.thumbnail_check)
+        self.normalize_check = QCheckBox("Normalize loudness")
+        postprocess_layout.addWidget(self.normalize_check)
+        layout.addLayout(postprocess_layout)
+
+        # Live streams and premieres: record them segment by segment, optionally
+        # keeping only the last minutes
+        live_layout = QHBoxLayout()
+        self.live_check = QCheckBox("Record live streams")
+        live_layout.addWidget(self.live_check)
+        self.live_window_label = QLabel("Keep last (min):")
+        self.live_window_spin = QSpinBox()
+        self.live_window_spin.setRange(0, 24 * 60)
+        self.live_window_spin.setSpecialValueText("Everything")
+        live_layout.addWidget(self.live_window_label)
+        live_layout.addWidget(self.live_window_spin)
+        live_layout.addStretch()
+        layout.addLayout(live_layout)
+
+        # Limits shared by every active download, applied immediately when changed
+        limits_layout = QHBoxLayout()
+        self.max_rate_label = QLabel("Max total speed (MB/s):")
+        self.max_rate_spin = QDoubleSpinBox()
+        self.max_rate_spin.setRange(0, 10000)
+        self.max_rate_spin.setSingleStep(0.5)
+        self.max_rate_spin.setSpecialValueText("No limit")
+        self.max_rate_spin.valueChanged.connect(
+            lambda value: bandwidth_governor.set_rate(value * 1024 * 1024)
+        )
+        limits_layout.addWidget(self.max_rate_label)
+        limits_layout.addWidget(self.max_rate_spin)
+        self.per_host_label = QLabel("Downloads per site:")
+        self.per_host_spin = QSpinBox()
+        self.per_host_spin.setRange(0, 16)
+        self.per_host_spin.setSpecialValueText("No limit")
+        self.per_host_spin.valueChanged.connect(bandwidth_governor.set_host_limit)
+        limits_layout.addWidget(self.per_host_label)
+        limits_layout.addWidget(self.per_host_spin)
+        self.throughput_label = QLabel("")
+        limits_layout.addWidget(self.throughput_label)
+        layout.addLayout(limits_layout)
+        self.throughput_timer = QTimer(self)
+        self.throughput_timer.setInterval(1000)
+        self.throughput_timer.timeout.connect(self.update_throughput)
+        self.throughput_timer.start()
+
         # Download and Stop buttons
         buttons_layout = QHBoxLayout()
         self.download_button = QPushButton("Download")
@@ -236,6 +1050,12 @@ class MainWindow(QWidget):
         self.stop_button = QPushButton("Stop")
         self.stop_button.clicked.connect(self.stop_operation)
         buttons_layout.addWidget(self.stop_button)
+        self.metrics_button = QPushButton("Metrics")
+        self.metrics_button.clicked.connect(self.show_metrics)
+        buttons_layout.addWidget(self.metrics_button)
+        self.subscriptions_button = QPushButton("Subscriptions")
+        self.subscriptions_button.clicked.connect(self.show_subscriptions)
+        buttons_layout.addWidget(self.subscriptions_button)
         layout.addLayout(buttons_layout)
 
         # Progress bar and status label
@@ -258,8 +1078,10 @@ class MainWindow(QWidget):
                 self.folder_label.setText(f"Output folder: {self.output_folder}")
             formats = config.get("formats", [])
             if formats:
-                self.populate_formats_from_config(formats)
                 self.last_formats = formats
+                self.populate_formats_from_config(
+                    formats, config.get("formats_url"), config.get("formats_duration")
+                )
             metadata = config.get("metadata", {})
             if metadata:
                 self.last_metadata = metadata
@@ -267,23 +1089,36 @@ class MainWindow(QWidget):
             # Load playlist from config if available
             playlist = config.get("playlist", [])
             if playlist:
-                self.playlist_videos = playlist
-                self.playlist_list.clear()
-                for video in playlist:
-                    title = video.get("title", "Unknown Title")
-                    item = QListWidgetItem(title)
-                    item.setData(Qt.UserRole, video.get("url", ""))
-                    self.playlist_list.addItem(item)
+                self.playlist_model.set_entries(playlist)
                 self.current_playlist_index = config.get("current_playlist_index", 0)
-                self.playlist_list.setCurrentRow(self.current_playlist_index)
+                self.select_playlist_row(self.current_playlist_index)
+                self.start_prefetch()
             # Load last selected quality from config, default to 720p if not found
-            quality = config.get("quality", "best[height<=720]")
+            quality = config.get("quality", DEFAULT_QUALITY)
             index = self.quality_combo.findData(quality)
             if index != -1:
                 self.quality_combo.setCurrentIndex(index)
             else:
-                index = self.quality_combo.findData("best[height<=720]")
+                index = self.quality_combo.findData(DEFAULT_QUALITY)
                 self.quality_combo.setCurrentIndex(index)
+            self.workers_spin.setValue(config.get("max_workers", DEFAULT_MAX_WORKERS))
+            self.populate_profiles(config.get("download_profiles", {}))
+            index = self.profile_combo.findText(config.get("download_profile", DEFAULT_PROFILE))
+            if index != -1:
+                self.profile_combo.setCurrentIndex(index)
+            self.scan_folder_check.setChecked(config.get("scan_output_folder", False))
+            self.store_dir = config.get("content_store_dir", DEFAULT_STORE_DIR)
+            self.store_check.setChecked(config.get("content_store", False))
+            self.max_size_spin.setValue(config.get("max_size_mb", 0))
+            self.set_postprocess_options(config.get("postprocess", DEFAULT_POSTPROCESS))
+            self.max_rate_spin.setValue(config.get("max_rate_mb", 0))
+            self.per_host_spin.setValue(config.get("per_host_limit", 0))
+            self.live_check.setChecked(config.get("record_live", False))
+            self.live_window_spin.setValue(config.get("live_window_min", 0))
+            self.processes_check.setChecked(config.get("worker_processes", False))
+            self.split_chapters_check.setChecked(config.get("split_chapters", False))
+            self.precise_cuts_check.setChecked(config.get("precise_cuts", False))
+            self.set_sync_interval(config.get("sync_interval_min", 0))
         except Exception as e:
             logging.info("Could not load config.json, using default configuration.")
 
@@ -293,49 +1128,198 @@ class MainWindow(QWidget):
             "last_video": self.url_input.text().strip(),
             "last_output_folder": self.output_folder,
             "formats": self.last_formats if self.last_formats else [],
+            "formats_url": self.formats_url,
+            "formats_duration": self.formats_duration,
             "metadata": self.last_metadata if self.last_metadata else {},
             "quality": self.quality_combo.currentData(),
-            "playlist": self.playlist_videos if self.playlist_videos else [],
+            "download_profile": self.profile_combo.currentText(),
+            "download_profiles": self.custom_profiles,
+            "playlist": self.playlist_model.entries(),
             "current_playlist_index": self.current_playlist_index,
+            "max_workers": self.workers_spin.value(),
+            "scan_output_folder": self.scan_folder_check.isChecked(),
+            "content_store": self.store_check.isChecked(),
+            "content_store_dir": self.store_dir,
+            "max_size_mb": self.max_size_spin.value(),
+            "postprocess": self.current_postprocess(),
+            "max_rate_mb": self.max_rate_spin.value(),
+            "per_host_limit": self.per_host_spin.value(),
+            "record_live": self.live_check.isChecked(),
+            "live_window_min": self.live_window_spin.value(),
+            "worker_processes": self.processes_check.isChecked(),
+            "split_chapters": self.split_chapters_check.isChecked(),
+            "precise_cuts": self.precise_cuts_check.isChecked(),
+            "sync_interval_min": self.sync_interval,
         }
         try:
-            with open("config.json", "w") as f:
+            # Write to a temporary file first so a crash never leaves a truncated config
+            with open("config.json.tmp", "w") as f:
                 json.dump(config, f, indent=4)
+            os.replace("config.json.tmp", "config.json")
         except Exception as e:
             logging.error("Error saving configuration: %s", e)
 
-    def populate_formats(self, formats):
+    def populate_profiles(self, custom_profiles=None):
+        """Fills the profile dropdown with the built-in and config.json profiles."""
+        self.custom_profiles = custom_profiles or {}
+        self.profile_combo.clear()
+        for label, options in load_download_profiles(self.custom_profiles):
+            self.profile_combo.addItem(label, options)
+
+    def format_item_text(self, f):
+        """Returns the format list text of one format."""
+        ext = f.get("ext")
+        resolution = f.get("resolution") or (
+            str(f.get("height")) if f.get("height") else "N/A"
+        )
+        filesize = f.get("filesize") or f.get("filesize_approx") or 0
+        filesize_str = f"{filesize / 1024 / 1024:.2f} MB" if filesize else "Unknown"
+        return (
+            f"ID: {f.get('format_id')} | Ext: {ext} | Resolution: {resolution} | "
+            f"Codecs: {f.get('vcodec') or '?'}/{f.get('acodec') or '?'} | "
+            f"Size: {filesize_str}"
+        )
+
+    def populate_formats(self, formats, url=None, duration=None):
         """Populates the format list in the QListWidget."""
-        self.format_list.clear()
         self.last_formats = formats
-        for f in formats:
-            format_id = f.get("format_id")
-            ext = f.get("ext")
-            resolution = f.get("resolution") or (
-                str(f.get("height")) if f.get("height") else "N/A"
-            )
-            filesize = f.get("filesize") or 0
-            filesize_str = f"{filesize / 1024 / 1024:.2f} MB" if filesize else "Unknown"
-            item_text = f"Ext: {ext} | Resolution: {resolution} | Size: {filesize_str}"
-            item = QListWidgetItem(item_text)
-            item.setData(Qt.UserRole, format_id)
-            self.format_list.addItem(item)
+        self.populate_formats_from_config(formats, url, duration)
 
-    def populate_formats_from_config(self, formats):
+    def populate_formats_from_config(self, formats, url=None, duration=None):
         """Populates the QListWidget with formats saved in config."""
         self.format_list.clear()
+        self.formats_url = url
+        self.formats_duration = duration
+        self.selected_format_id = None
         for f in formats:
-            format_id = f.get("format_id")
-            ext = f.get("ext")
-            resolution = f.get("resolution") or (
-                str(f.get("height")) if f.get("height") else "N/A"
-            )
-            filesize = f.get("filesize") or 0
-            filesize_str = f"{filesize / 1024 / 1024:.2f} MB" if filesize else "Unknown"
-            item_text = f"Ext: {ext} | Resolution: {resolution} | Size: {filesize_str}"
-            item = QListWidgetItem(item_text)
-            item.setData(Qt.UserRole, format_id)
+            item = QListWidgetItem(self.format_item_text(f))
+            item.setData(Qt.UserRole, f.get("format_id"))
             self.format_list.addItem(item)
+        self.update_format_choice()
+
+    def current_postprocess(self):
+        """Returns the post-processing options chosen in the interface."""
+        return {
+            "container": self.container_combo.currentText(),
+            "audio_format": self.audio_format_combo.currentText(),
+            "embed_thumbnail": self.thumbnail_check.isChecked(),
+            "normalize_audio": self.normalize_check.isChecked(),
+        }
+
+    def current_live(self):
+        """Returns the live recording options chosen in the interface, or None."""
+        if not self.live_check.isChecked():
+            return None
+        return {"window": self.live_window_spin.value() * 60 or None}
+
+    def populate_chapters(self, chapters):
+        """Lists the chapters of the loaded video, unchecked, and clears the time range."""
+        self.chapter_list.clear()
+        self.clip_start_input.clear()
+        self.clip_end_input.clear()
+        for chapter in chapters or []:
+            title = chapter.get("title") or ""
+            item = QListWidgetItem(f"{format_timestamp(chapter['start_time'])}  {title}")
+            item.setData(Qt.UserRole, title)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Unchecked)
+            self.chapter_list.addItem(item)
+
+    def current_clip(self):
+        """
+        Returns the clip options (see clips.make_clip) chosen for the loaded video,
+        or None to download it whole. Raises ValueError for an invalid time range.
+        """
+        chapters = []
+        for row in range(self.chapter_list.count()):
+            item = self.chapter_list.item(row)
+            if item.checkState() == Qt.Checked:
+                chapters.append(f"^{re.escape(item.data(Qt.UserRole))}$")
+        ranges = []
+        start = self.clip_start_input.text().strip()
+        end = self.clip_end_input.text().strip()
+        if start or end:
+            ranges.append(parse_range(f"{start}-{end}"))
+        return make_clip(
+            ranges,
+            chapters,
+            self.split_chapters_check.isChecked(),
+            self.precise_cuts_check.isChecked(),
+        )
+
+    def current_worker_pool(self):
+        """Returns the ProcessWorkerPool if worker processes are chosen, else None."""
+        if not self.processes_check.isChecked():
+            return None
+        if self.worker_pool is None:
+            # Processes are only spawned as downloads need them
+            self.worker_pool = ProcessWorkerPool(self.workers_spin.maximum())
+        return self.worker_pool
+
+    def shutdown_workers(self):
+        if self.worker_pool is not None:
+            self.scheduler.set_worker_pool(None)
+            self.worker_pool.shutdown()
+            self.worker_pool = None
+
+    def set_postprocess_options(self, options):
+        options = dict(DEFAULT_POSTPROCESS, **options)
+        index = self.container_combo.findText(options["container"])
+        if index != -1:
+            self.container_combo.setCurrentIndex(index)
+        index = self.audio_format_combo.findText(options["audio_format"])
+        if index != -1:
+            self.audio_format_combo.setCurrentIndex(index)
+        self.thumbnail_check.setChecked(options["embed_thumbnail"])
+        self.normalize_check.setChecked(options["normalize_audio"])
+
+    def current_format_limits(self):
+        """Returns the Max size budget as format_limits for the engine, or None."""
+        if not self.max_size_spin.value():
+            return None
+        return {"max_bytes": self.max_size_spin.value() * 1024 * 1024}
+
+    def current_format_choice(self):
+        """Runs the selection engine over the loaded format list, or returns None."""
+        if not self.last_formats:
+            return None
+        max_height, audio_only = limits_for_quality(
+            self.quality_combo.currentData() or DEFAULT_QUALITY
+        )
+        return select_formats(
+            self.last_formats,
+            self.formats_duration,
+            max_height=max_height,
+            audio_only=audio_only,
+            format_id=self.selected_format_id,
+            **(self.current_format_limits() or {}),
+        )
+
+    def update_format_choice(self, *args):
+        """Shows which formats will be downloaded for the loaded video and their size."""
+        choice = self.current_format_choice()
+        if choice is None:
+            self.format_choice_label.setText("")
+            return
+        source = "Chosen format" if self.selected_format_id is not None else "Will download"
+        self.format_choice_label.setText(
+            f"{source}: {choice.format_spec} ({describe_choice(choice)})"
+        )
+
+    def on_format_double_clicked(self, item):
+        """Downloads exactly the double-clicked format; double-click it again to undo."""
+        format_id = item.data(Qt.UserRole)
+        if format_id == self.selected_format_id:
+            self.selected_format_id = None
+        else:
+            self.selected_format_id = format_id
+        for row in range(self.format_list.count()):
+            font = self.format_list.item(row).font()
+            font.setBold(
+                self.format_list.item(row).data(Qt.UserRole) == self.selected_format_id
+            )
+            self.format_list.item(row).setFont(font)
+        self.update_format_choice()
 
     def update_metadata_text(self, metadata):
         """Updates the QTextEdit with formatted metadata and description."""
@@ -347,68 +1331,116 @@ class MainWindow(QWidget):
         )
         self.metadata_text.setPlainText(text)
 
-    def fetch_info(self):
-        """Fetches all video information (formats/metadata or playlist entries) in a single request."""
+    def fetch_info(self, use_cache=True):
+        """
+        Fetches all video information (formats/metadata or playlist entries) in a
+        single request. Without use_cache, cached information is not used.
+        """
         url = self.url_input.text().strip()
         if not url:
             QMessageBox.warning(self, "Error", "Please enter a valid URL.")
             return
 
-        # Check if cookies file exists
-        if not check_cookies_exist():
-            cookie_path = get_cookie_file_path()
-            reply = QMessageBox.question(
-                self,
-                "Cookies Not Found",
-                f"The cookies file was not found at:\n{cookie_path}\n\n"
-                "Without cookies, you may encounter errors or be unable to download some videos.\n\n"
-                "Do you want to continue anyway?",
-                QMessageBox.Yes | QMessageBox.No,
-                QMessageBox.No,
-            )
-            if reply == QMessageBox.No:
-                return
+        # Cookie problems are reported before any request rather than as sign-in errors
+        if not self.confirm_cookies(
+            "Without valid cookies, you may encounter errors or be unable to download "
+            "some videos."
+        ):
+            return
 
         # Clear the playlist, format list, and metadata area
-        self.playlist_list.clear()
+        self.stop_prefetch()
+        self.playlist_model.clear()
         self.format_list.clear()
         self.metadata_text.clear()
+        self.populate_chapters([])
         self.status_label.setText("Fetching video information...")
         self.toggle_buttons(False)
 
-        self.info_thread = InfoFetchThread(url, flat=True)
-        self.info_thread.info_signal.connect(self.process_info)
-        self.info_thread.error_signal.connect(self.info_error)
-        self.info_thread.finished.connect(lambda: self.toggle_buttons(True))
+        if "list=" in url:
+            # Playlists are streamed so the list fills in while pages are fetched
+            self.stream_active = True
+            self.info_thread = PlaylistStreamThread(url, use_cache)
+            self.info_thread.entries_signal.connect(self.process_playlist_batch)
+            self.info_thread.error_signal.connect(self.info_error)
+            self.info_thread.finished.connect(self.playlist_stream_finished)
+        else:
+            self.info_thread = InfoFetchThread(url, flat=True, use_cache=use_cache)
+            self.info_thread.info_signal.connect(self.process_info)
+            self.info_thread.error_signal.connect(self.info_error)
+            self.info_thread.finished.connect(lambda: self.toggle_buttons(True))
         self.info_thread.start()
 
+    def process_playlist_batch(self, videos):
+        """Appends a batch of streamed playlist entries to the list."""
+        first_row = len(self.playlist_model)
+        self.playlist_model.append_entries(videos)
+        if first_row == 0:
+            self.current_playlist_index = 0
+            self.select_playlist_row(0)
+            # Automatically fetch full metadata for the first video in the playlist
+            self.load_video_info(videos[0]["url"])
+            self.start_prefetch()
+            # Early entries can be downloaded while the rest of the playlist loads
+            self.download_button.setEnabled(True)
+        elif self.prefetch_thread is not None:
+            self.prefetch_thread.add_urls([video["url"] for video in videos])
+        if self.download_follows_stream and not self.scheduler.cancelled:
+            quality_format, output_folder, profile_opts, format_limits = self.active_download
+            jobs = self.skip_archived(
+                [(first_row + offset, video["url"]) for offset, video in enumerate(videos)]
+            )
+            entries = [
+                {"index": index, "url": url, "title": self.playlist_model.title(index)}
+                for index, url in jobs
+            ]
+            self.journal.add_entries(entries)
+            for entry in entries:
+                self.scheduler.enqueue(
+                    entry["index"],
+                    entry["url"],
+                    quality_format,
+                    output_folder,
+                    profile_opts,
+                    format_limits,
+                )
+            self.scheduler.start()
+        if not self.scheduler.is_active():
+            self.status_label.setText(
+                f"Loading playlist... {len(self.playlist_model)} videos so far."
+            )
+
+    def playlist_stream_finished(self):
+        """Called once the playlist stream has delivered its last batch."""
+        self.stream_active = False
+        thread = self.info_thread
+        if thread is not None and not thread.failed and not thread.cancelled:
+            if not self.scheduler.is_active():
+                self.status_label.setText(
+                    f"Playlist loaded ({len(self.playlist_model)} videos). "
+                    "Select a quality and press 'Download'."
+                )
+            self.save_config()
+        if self.download_follows_stream:
+            self.download_follows_stream = False
+            if not self.scheduler.is_active():
+                self.download_finished()  # The queue drained before the stream ended
+        elif not self.scheduler.is_active():
+            self.toggle_buttons(True)
+
     def process_info(self, info):
         # Check if the info represents a playlist
         if "entries" in info:
-            self.playlist_videos = []
-            self.playlist_list.clear()
-            for entry in info.get("entries", []):
-                if entry is None:
-                    continue
-                title = entry.get("title", "Unknown Title")
-                video_url = entry.get("webpage_url")
-                # If extract_flat was used, webpage_url may be missing; build it from video id
-                if not video_url:
-                    video_id = entry.get("id")
-                    if video_id:
-                        video_url = f"https://www.youtube.com/watch?v={video_id}"
-                    else:
-                        video_url = self.url_input.text()
-                self.playlist_videos.append({"title": title, "url": video_url})
-                item = QListWidgetItem(title)
-                item.setData(Qt.UserRole, video_url)
-                self.playlist_list.addItem(item)
+            self.playlist_model.set_entries(
+                playlist_entries(info, self.url_input.text())
+            )
             self.current_playlist_index = 0
-            self.playlist_list.setCurrentRow(self.current_playlist_index)
+            self.select_playlist_row(self.current_playlist_index)
             # Automatically fetch full metadata for the first video in the playlist
-            if self.playlist_videos:
-                first_video_url = self.playlist_videos[0].get("url")
+            if len(self.playlist_model):
+                first_video_url = self.playlist_model.url(0)
                 self.load_video_info(first_video_url)
+                self.start_prefetch()
             self.status_label.setText(
                 "Playlist loaded. Select a quality and press 'Download'."
             )
@@ -416,13 +1448,10 @@ class MainWindow(QWidget):
             # Single video case
             video_title = info.get("title", "Unknown Title")
             video_url = info.get("webpage_url", self.url_input.text())
-            self.playlist_videos = [{"title": video_title, "url": video_url}]
-            self.playlist_list.clear()
-            item = QListWidgetItem(video_title)
-            item.setData(Qt.UserRole, video_url)
-            self.playlist_list.addItem(item)
+            self.playlist_model.set_entries([{"title": video_title, "url": video_url}])
             self.current_playlist_index = 0
-            self.populate_formats(info.get("formats", []))
+            self.populate_formats(info.get("formats", []), video_url, info.get("duration"))
+            self.populate_chapters(info.get("chapters"))
             metadata = {
                 "title": info.get("title", ""),
                 "description": info.get("description", ""),
@@ -432,7 +1461,8 @@ class MainWindow(QWidget):
             self.last_metadata = metadata
             self.update_metadata_text(metadata)
             self.status_label.setText(
-                "Information loaded. Select a quality and press 'Download'."
+                self.live_status_text(info)
+                or "Information loaded. Select a quality and press 'Download'."
             )
         self.save_config()
 
@@ -450,7 +1480,12 @@ class MainWindow(QWidget):
 
     def update_video_info(self, info):
         """Update metadata, formats, and description based on full video info."""
-        self.populate_formats(info.get("formats", []))
+        self.populate_formats(
+            info.get("formats", []),
+            info.get("webpage_url") or info.get("original_url"),
+            info.get("duration"),
+        )
+        self.populate_chapters(info.get("chapters"))
         metadata = {
             "title": info.get("title", ""),
             "description": info.get("description", ""),
@@ -459,34 +1494,100 @@ class MainWindow(QWidget):
         }
         self.last_metadata = metadata
         self.update_metadata_text(metadata)
-        self.status_label.setText("Full video information loaded.")
+        self.status_label.setText(
+            self.live_status_text(info) or "Full video information loaded."
+        )
+
+    def live_status_text(self, info):
+        """Status line for a live stream or premiere; None for other videos."""
+        state = describe_live(info)
+        if state is None:
+            return None
+        if self.live_check.isChecked():
+            return f"{state}. Press 'Download' to record it."
+        return f"{state}. Check 'Record live streams' and press 'Download' to record it."
+
+    def start_prefetch(self):
+        """Starts resolving full metadata for the loaded playlist in the background."""
+        self.stop_prefetch()
+        urls = list(self.playlist_model.store.urls)
+        # Parented to the window so a cancelled thread outlives this reference
+        self.prefetch_thread = PlaylistPrefetchThread(urls, parent=self)
+        self.prefetch_thread.finished.connect(self.prefetch_thread.deleteLater)
+        self.prefetch_thread.prioritize(max(self.current_playlist_index, 0))
+        self.prefetch_thread.start()
+
+    def stop_prefetch(self):
+        if self.prefetch_thread is not None:
+            self.prefetch_thread.cancel()
+            self.prefetch_thread = None
 
-    def on_playlist_item_double_clicked(self, item):
+    def on_playlist_current_changed(self, current, previous):
+        """Moves the selected playlist row to the front of the prefetch queue."""
+        row = self.playlist_filter.source_row(current)
+        if self.prefetch_thread is not None and row >= 0:
+            self.prefetch_thread.prioritize(row)
+
+    def select_playlist_row(self, row):
+        """Makes a playlist row current, if it is not hidden by the search filter."""
+        index = self.playlist_filter.proxy_index(row)
+        if index.isValid():
+            self.playlist_list.setCurrentIndex(index)
+            self.playlist_list.scrollTo(index)
+
+    def on_playlist_item_double_clicked(self, index):
         """When a playlist video is double-clicked, fetch its full metadata and update UI."""
-        video_url = item.data(Qt.UserRole)
-        self.current_playlist_index = self.playlist_list.currentRow()
+        row = self.playlist_filter.source_row(index)
+        if row < 0:
+            return
+        video_url = self.playlist_model.url(row)
+        self.current_playlist_index = row
         self.url_input.setText(video_url)
         self.load_video_info(video_url)
 
-    def info_error(self, error_msg):
-        error_lower = error_msg.lower()
-        if (
-            "unavailable" in error_lower
-            or "authentication" in error_lower
-            or "not available" in error_lower
-        ):
-            cookie_path = get_cookie_file_path()
-            full_msg = f"Error fetching information: {error_msg}\n\n"
-            full_msg += "This error may be caused by:\n"
-            full_msg += "- Video is private, deleted, or geo-restricted\n"
-            full_msg += "- Cookies are expired or invalid\n\n"
-            full_msg += f"Try updating your cookies at:\n{cookie_path}\n\n"
-            full_msg += "Use a browser extension to export fresh YouTube cookies."
-            QMessageBox.critical(self, "Error", full_msg)
+    def show_error(self, title, message, kind):
+        """Shows an error dialog with advice for the error kind (see download_errors)."""
+        hint = ERROR_HINTS.get(kind)
+        if hint:
+            message += f"\n\n{hint}"
+        if kind == ERROR_AUTH:
+            message += f"\n\nUpdate your cookies at:\n{get_cookie_file_path()}\n\n"
+            message += "Use a browser extension to export fresh YouTube cookies."
+        QMessageBox.critical(self, title, message)
+
+    def update_cookie_status(self, status):
+        """Shows the state of the cookies file; problems are shown in red."""
+        text = f"Cookies: {status.message}"
+        if status.expires and status.state not in COOKIE_PROBLEMS:
+            text += f" Expires {time.strftime('%Y-%m-%d', time.localtime(status.expires))}."
+        self.cookie_label.setText(text)
+        if status.state in COOKIE_PROBLEMS:
+            self.cookie_label.setStyleSheet("color: red")
+        elif status.state == COOKIES_EXPIRING:
+            self.cookie_label.setStyleSheet("color: darkorange")
         else:
-            QMessageBox.critical(
-                self, "Error", f"Error fetching information: {error_msg}"
-            )
+            self.cookie_label.setStyleSheet("")
+
+    def confirm_cookies(self, consequence):
+        """Asks whether to go on if the cookies file has a problem. Returns True to go on."""
+        problem = cookie_problem()
+        if problem is None:
+            return True
+        reply = QMessageBox.question(
+            self,
+            "Cookies Not Found" if problem.state == COOKIES_MISSING else "Cookies Not Valid",
+            f"{problem.message}\n\n{consequence}\n\n"
+            f"Export fresh YouTube cookies to:\n{get_cookie_file_path()}\n\n"
+            "Do you want to continue anyway?",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No,
+        )
+        return reply == QMessageBox.Yes
+
+    def info_error(self, error):
+        self.show_error(
+            "Error", f"Error fetching information: {error}", classify_error(error)
+        )
         self.status_label.setText("Error fetching information.")
         self.toggle_buttons(True)
 
@@ -522,30 +1623,25 @@ class MainWindow(QWidget):
             )
 
     def start_download(self):
-        # Determine the URL to download: if playlist exists, use current playlist video
-        if self.playlist_videos:
-            video = self.playlist_videos[self.current_playlist_index]
-            url = video.get("url")
+        # Determine the URLs to download: if a playlist exists, queue every video from
+        # the current one to the end; otherwise download the URL in the input field
+        if len(self.playlist_model):
+            jobs = [
+                (index, url)
+                for index, url in enumerate(self.playlist_model.store.urls)
+                if index >= self.current_playlist_index and url
+            ]
         else:
             url = self.url_input.text().strip()
-        if not url:
+            jobs = [(0, url)] if url else []
+        if not jobs:
             QMessageBox.warning(self, "Error", "Enter a valid URL.")
             return
 
-        # Check if cookies file exists
-        if not check_cookies_exist():
-            cookie_path = get_cookie_file_path()
-            reply = QMessageBox.question(
-                self,
-                "Cookies Not Found",
-                f"The cookies file was not found at:\n{cookie_path}\n\n"
-                "Without cookies, the download may fail with a 403 error.\n\n"
-                "Do you want to continue anyway?",
-                QMessageBox.Yes | QMessageBox.No,
-                QMessageBox.No,
-            )
-            if reply == QMessageBox.No:
-                return
+        if not self.confirm_cookies(
+            "Without valid cookies, the download may fail with a 403 error."
+        ):
+            return
 
         if not self.output_folder:
             QMessageBox.warning(self, "Error", "Select an output folder.")
@@ -556,15 +1652,146 @@ class MainWindow(QWidget):
             QMessageBox.warning(self, "Error", "Select a download quality.")
             return
 
+        try:
+            clip = self.current_clip()
+        except ValueError as e:
+            QMessageBox.warning(self, "Error", f"Invalid clip time range: {e}")
+            return
+
+        # Drop videos that were already downloaded before any extraction happens; a
+        # clip of the loaded video is downloaded even if the whole video was
+        self.archive_filter = ArchiveFilter(
+            self.output_folder, scan_folder=self.scan_folder_check.isChecked()
+        )
+        jobs = self.skip_archived(jobs, self.formats_url if clip is not None else None)
+        if not jobs and not self.stream_active:
+            QMessageBox.information(
+                self, "Nothing to download", "All the videos were already downloaded."
+            )
+            return
+
         self.toggle_buttons(False)
         self.status_label.setText("Downloading...")
+        self.progress_bar.setValue(0)
 
-        self.download_thread = DownloadThread(url, quality_format, self.output_folder)
-        self.download_thread.progress_signal.connect(self.update_progress)
-        self.download_thread.finished_signal.connect(self.download_finished)
-        self.download_thread.error_signal.connect(self.download_error)
-        self.download_thread.start()
+        self.scheduler.reset()
+        self.subscription_jobs.clear()
+        self.background_run = False
+        self.scheduler.set_max_workers(self.workers_spin.value())
+        self.scheduler.postprocess = self.current_postprocess()
+        self.scheduler.live = self.current_live()
+        self.scheduler.set_worker_pool(self.current_worker_pool())
+        profile_opts = self.profile_combo.currentData()
+        format_limits = self.current_format_limits()
+        choice = self.current_format_choice()
+        self.active_download = (
+            quality_format, self.output_folder, profile_opts, format_limits
+        )
+        self.download_follows_stream = self.stream_active
+        self.journal.start_run(
+            [
+                {"index": index, "url": url, "title": self.playlist_model.title(index)}
+                for index, url in jobs
+            ],
+            quality_format,
+            self.output_folder,
+        )
+        for index, url in jobs:
+            if url == self.formats_url and (choice is not None or clip is not None):
+                # Formats of the loaded video are known: use the engine's choice
+                # directly. Its chapters and time range apply to it alone
+                self.scheduler.enqueue(
+                    index,
+                    url,
+                    choice.format_spec if choice is not None else quality_format,
+                    self.output_folder,
+                    profile_opts,
+                    None if choice is not None else format_limits,
+                    clip,
+                )
+            else:
+                self.scheduler.enqueue(
+                    index,
+                    url,
+                    quality_format,
+                    self.output_folder,
+                    profile_opts,
+                    format_limits,
+                )
         self.download_in_progress = True  # Set flag on download start
+        self.scheduler.start()
+
+    def skip_archived(self, jobs, keep=None):
+        """
+        Returns the (index, url) jobs not yet downloaded, tagging the others in the
+        list. The job of URL keep is never skipped.
+        """
+        remaining = []
+        for index, url in jobs:
+            if url != keep and self.archive_filter.is_downloaded(
+                url, self.playlist_model.title(index)
+            ):
+                self.set_playlist_row_text(index, "archived")
+            else:
+                remaining.append((index, url))
+        return remaining
+
+    def resume_from_journal(self):
+        """Offers to resume the entries of a run that did not finish, e.g. after a crash."""
+        run, pending = self.journal.incomplete()
+        if not pending or self.scheduler.is_active():
+            return
+        self.journal.resume_run(run["run"])
+        reply = QMessageBox.question(
+            self,
+            "Resume downloads",
+            f"{len(pending)} video(s) from the previous session did not finish downloading.\n\n"
+            "Do you want to resume them?",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.Yes,
+        )
+        if reply == QMessageBox.No:
+            self.journal.close_run()
+            return
+
+        # Map journal entries to playlist rows, rebuilding the list if it changed since
+        rows = {url: row for row, url in enumerate(self.playlist_model.store.urls)}
+        if not all(entry["url"] in rows for entry in run["entries"]):
+            self.playlist_model.set_entries(
+                [
+                    {"title": entry["title"] or entry["url"], "url": entry["url"]}
+                    for entry in run["entries"]
+                ]
+            )
+            rows = {url: row for row, url in enumerate(self.playlist_model.store.urls)}
+
+        self.output_folder = run.get("output") or self.output_folder
+        if self.output_folder:
+            self.folder_label.setText(f"Output folder: {self.output_folder}")
+        self.toggle_buttons(False)
+        self.status_label.setText("Resuming downloads...")
+        self.scheduler.reset()
+        self.subscription_jobs.clear()
+        self.background_run = False
+        self.scheduler.set_max_workers(self.workers_spin.value())
+        self.scheduler.postprocess = self.current_postprocess()
+        self.scheduler.live = self.current_live()
+        self.scheduler.set_worker_pool(self.current_worker_pool())
+        for entry in run["entries"]:
+            if entry not in pending:
+                self.set_playlist_row_text(rows[entry["url"]], STATE_DONE)
+        for entry in pending:
+            # yt-dlp continues from the entry's .part file if it is still on disk
+            self.scheduler.enqueue(
+                rows[entry["url"]],
+                entry["url"],
+                run.get("quality"),
+                self.output_folder,
+                self.profile_combo.currentData(),
+                self.current_format_limits(),
+            )
+        self.download_in_progress = True
+        self.scheduler.start()
 
     def format_eta(self, seconds):
         """Formats the ETA in a user-friendly format (hours, minutes, seconds)."""
@@ -584,73 +1811,256 @@ class MainWindow(QWidget):
         parts.append(f"{secs}s")
         return " ".join(parts)
 
-    def update_progress(self, data):
-        if data.get("status") == "downloading":
-            total_bytes = data.get("total_bytes") or data.get("total_bytes_estimate")
-            downloaded = data.get("downloaded_bytes", 0)
-            speed = data.get("speed", 0)  # bytes per second
-            eta = data.get("eta", 0)  # seconds
+    def update_progress(self, record):
+        """Shows per-entry progress in the playlist and the latest transfer in the status label."""
+        index = record.index
+        if record.status == "downloading":
+            total_bytes = record.total_bytes
+            downloaded = record.downloaded_bytes
+            speed = record.speed  # bytes per second
+            eta = record.eta  # seconds
             if total_bytes:
                 progress = int(downloaded * 100 / total_bytes)
-                self.progress_bar.setValue(progress)
+                self.set_playlist_row_text(index, f"{progress}%")
                 # Convert speed to MB/s if available
                 speed_mb = speed / (1024 * 1024) if speed else 0
                 eta_formatted = self.format_eta(eta)
+                counts = self.scheduler.counts()
                 self.status_label.setText(
-                    f"Downloading: {progress}% "
+                    f"Downloading: {counts.get(STATE_DONE, 0)}/{len(self.scheduler.states)} done, "
+                    f"{counts.get(STATE_RUNNING, 0)} running | "
+                    f"Item {index + 1}: {progress}% "
                     f"({downloaded / 1024 / 1024:.2f} MB of {total_bytes / 1024 / 1024:.2f} MB) | "
                     f"Speed: {speed_mb:.2f} MB/s | ETA: {eta_formatted}"
                 )
-        elif data.get("status") == "finished":
-            self.progress_bar.setValue(100)
-            self.status_label.setText("Download finished.")
-            if data.get("filename"):
-                self.last_downloaded_file = data.get("filename")
+        elif record.status == "finished":
+            if record.filename:
+                self.last_downloaded_file = record.filename
+
+    def update_throughput(self):
+        """Shows the combined transfer rate achieved by all downloads."""
+        throughput = bandwidth_governor.throughput()
+        if throughput or self.download_in_progress:
+            self.throughput_label.setText(f"Total: {throughput / 1024 / 1024:.2f} MB/s")
+        else:
+            self.throughput_label.setText("")
+
+    def show_metrics(self):
+        """Opens the per-download metrics table of this session."""
+        if self.metrics_dialog is None:
+            self.metrics_dialog = MetricsDialog(self)
+        self.metrics_dialog.set_records(self.metrics.records())
+        self.metrics_dialog.show()
+        self.metrics_dialog.raise_()
+
+    def update_metrics_dialog(self, record):
+        if self.metrics_dialog is not None and self.metrics_dialog.isVisible():
+            self.metrics_dialog.set_records(self.metrics.records())
+
+    def show_subscriptions(self):
+        """Opens the subscription list."""
+        if self.subscriptions_dialog is None:
+            self.subscriptions_dialog = SubscriptionsDialog(self)
+            self.subscriptions_dialog.add_button.clicked.connect(self.subscribe_current_url)
+            self.subscriptions_dialog.remove_button.clicked.connect(self.remove_subscriptions)
+            self.subscriptions_dialog.sync_button.clicked.connect(self.sync_subscriptions)
+            self.subscriptions_dialog.interval_spin.setValue(self.sync_interval)
+            self.subscriptions_dialog.interval_spin.valueChanged.connect(
+                self.set_sync_interval
+            )
+        self.update_subscriptions_dialog()
+        self.subscriptions_dialog.show()
+        self.subscriptions_dialog.raise_()
+
+    def update_subscriptions_dialog(self, status=""):
+        if self.subscriptions_dialog is not None and self.subscriptions_dialog.isVisible():
+            self.subscriptions_dialog.set_subscriptions(self.subscriptions.all(), status)
+
+    def subscribe_current_url(self):
+        """Subscribes the output folder to the channel or playlist in the URL field."""
+        url = self.url_input.text().strip()
+        if not url:
+            QMessageBox.warning(self, "Error", "Enter a channel or playlist URL.")
+            return
+        if not self.output_folder:
+            QMessageBox.warning(self, "Error", "Select an output folder.")
+            return
+        self.subscriptions.add(url, os.path.abspath(self.output_folder))
+        self.update_subscriptions_dialog()
+        reply = QMessageBox.question(
+            self,
+            "Subscribe",
+            "Download the videos already in this channel or playlist too?\n\n"
+            "Otherwise only videos added from now on are downloaded.",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No,
+        )
+        self.sync_subscriptions(urls=[url], mark_seen=reply == QMessageBox.No)
+
+    def remove_subscriptions(self):
+        if self.subscriptions_dialog is None:
+            return
+        for url in self.subscriptions_dialog.selected_urls():
+            self.subscriptions.remove(url)
+        self.update_subscriptions_dialog()
+
+    def set_sync_interval(self, minutes):
+        """Syncs the subscriptions every minutes minutes; 0 stops scheduled syncs."""
+        self.sync_interval = int(minutes)
+        if self.sync_interval:
+            self.sync_timer.start(self.sync_interval * 60 * 1000)
+        else:
+            self.sync_timer.stop()
+
+    def sync_subscriptions(self, urls=None, mark_seen=False):
+        """Syncs the subscriptions (default: all) in the background and queues new entries."""
+        if self.sync_thread is not None and self.sync_thread.isRunning():
+            return  # The next scheduled sync picks up whatever this one misses
+        if not isinstance(urls, list):
+            urls = None  # Called by a button or the timer
+        if not self.subscriptions.all():
+            return
+        self.sync_thread = SubscriptionSyncThread(self.subscriptions, urls, mark_seen)
+        self.sync_thread.result_signal.connect(self.queue_subscription_entries)
+        self.sync_thread.finished.connect(self.subscription_sync_finished)
+        self.sync_thread.start()
+        self.update_subscriptions_dialog("Syncing...")
+
+    def stop_subscription_sync(self):
+        if self.sync_thread is not None and self.sync_thread.isRunning():
+            self.sync_thread.cancel()
+            self.sync_thread.wait()
+
+    def subscription_sync_finished(self):
+        results = self.sync_thread.results
+        new = sum(len(result.new) for result in results)
+        errors = sum(1 for result in results if result.error)
+        status = (
+            f"Synced {len(results)} subscription(s) in {self.sync_thread.elapsed:.2f}s: "
+            f"{new} new, {errors} failed."
+        )
+        self.update_subscriptions_dialog(status)
+        if not self.scheduler.is_active():
+            self.status_label.setText(status)
+
+    def queue_subscription_entries(self, result):
+        """Appends the new entries of a synced subscription to the list and queues them."""
+        subscription = self.subscriptions.get(result.url)
+        if subscription is None or not result.new:
+            return
+        queued = set(self.subscription_jobs.values())
+        archive_filter = ArchiveFilter(
+            subscription["output"], scan_folder=self.scan_folder_check.isChecked()
+        )
+        videos = []
+        archived = []
+        for video in result.new:
+            if (result.url, video["id"]) in queued:
+                continue  # Still downloading from an earlier sync
+            if archive_filter.is_downloaded(video["url"], video["title"]):
+                archived.append(video["id"])
+            else:
+                videos.append(video)
+        self.subscriptions.mark_seen(result.url, archived)
+        if not videos:
+            return
+        if not self.scheduler.is_active():
+            # Nothing is downloading: start a run of this sync's entries only
+            self.scheduler.reset()
+            self.subscription_jobs.clear()
+            self.scheduler.set_max_workers(self.workers_spin.value())
+            self.scheduler.postprocess = self.current_postprocess()
+            self.scheduler.live = self.current_live()
+            self.scheduler.set_worker_pool(self.current_worker_pool())
+            self.background_run = True
+            self.download_in_progress = True
+            self.toggle_buttons(False)
+            self.progress_bar.setValue(0)
+            self.status_label.setText("Downloading new videos of subscriptions...")
+        first_row = len(self.playlist_model)
+        self.playlist_model.append_entries(
+            [{"title": video["title"], "url": video["url"]} for video in videos]
+        )
+        # Not journaled: unfinished entries stay pending in the subscription list
+        for offset, video in enumerate(videos):
+            self.subscription_jobs[first_row + offset] = (result.url, video["id"])
+            self.scheduler.enqueue(
+                first_row + offset,
+                video["url"],
+                self.quality_combo.currentData(),
+                subscription["output"],
+                self.profile_combo.currentData(),
+                self.current_format_limits(),
+            )
+        self.scheduler.start()
+
+    def update_aggregate_progress(self, fraction):
+        """Feeds the overall completion of all queued entries to the progress bar."""
+        self.progress_bar.setValue(int(fraction * 100))
+
+    def update_entry_state(self, index, state):
+        """Reflects a scheduler state change in the matching playlist row."""
+        self.set_playlist_row_text(index, state)
+        job = self.subscription_jobs.get(index)
+        if job is not None and state in (STATE_DONE, STATE_FAILED, STATE_SKIPPED):
+            # Entries left unsettled stay pending and are queued again by the next sync
+            del self.subscription_jobs[index]
+            if is_settled(state, self.scheduler.error_kinds.get(index)):
+                self.subscriptions.mark_seen(job[0], [job[1]])
+
+    def set_playlist_row_text(self, index, tag):
+        """Prefixes a playlist row title with a state or progress tag."""
+        self.playlist_model.set_tag(index, tag)
 
     def download_finished(self):
-        # If a playlist is loaded and there are more videos, auto-advance to the next video.
-        if (
-            self.playlist_videos
-            and self.current_playlist_index < len(self.playlist_videos) - 1
-        ):
-            self.current_playlist_index += 1
-            self.playlist_list.setCurrentRow(self.current_playlist_index)
-            next_video = self.playlist_videos[self.current_playlist_index]
-            self.url_input.setText(next_video.get("url"))
+        if self.scheduler.cancelled:
+            # Stopped: the last running download has ended
             self.download_in_progress = False
-            # Automatically start download for the next video
-            self.start_download()
+            self.background_run = False
+            self.toggle_buttons(True)
+            self.progress_bar.setValue(0)
+            self.status_label.setText("Operation stopped.")
             return
+        if self.download_follows_stream and self.stream_active:
+            return  # More playlist entries are on their way
         self.download_in_progress = False  # Reset flag on download finish
-        QMessageBox.information(
-            self, "Download complete", "The video(s) were downloaded successfully."
-        )
+        if self.background_run:
+            # A scheduled sync's downloads finish without interrupting the user
+            self.background_run = False
+            self.toggle_buttons(True)
+            self.progress_bar.setValue(0)
+            counts = self.scheduler.counts()
+            self.status_label.setText(
+                f"Subscriptions: {counts.get(STATE_DONE, 0)} new video(s) downloaded, "
+                f"{counts.get(STATE_FAILED, 0)} failed."
+            )
+            return
         self.toggle_buttons(True)
         self.progress_bar.setValue(0)
         self.save_config()
+        if self.scheduler.errors:
+            # The run stays open in the journal so failed entries can be resumed
+            counts = self.scheduler.counts()
+            first_index, first_error = next(iter(self.scheduler.errors.items()))
+            self.download_error(
+                f"{counts.get(STATE_FAILED, 0)} of {len(self.scheduler.states)} "
+                f"video(s) failed. First error:\n{first_error}",
+                self.scheduler.error_kinds.get(first_index),
+            )
+            return
+        self.journal.close_run()
+        QMessageBox.information(
+            self, "Download complete", "The video(s) were downloaded successfully."
+        )
+        self.status_label.setText("Download finished.")
 
-    def download_error(self, error_msg):
+    def download_error(self, error_msg, kind=None):
         self.download_in_progress = False  # Reset flag on download error
-        error_lower = error_msg.lower()
-        if (
-            "403" in error_lower
-            or "forbidden" in error_lower
-            or "authentication" in error_lower
-        ):
-            cookie_path = get_cookie_file_path()
-            full_msg = f"An error occurred during download:\n{error_msg}\n\n"
-            full_msg += "This error is likely caused by:\n"
-            full_msg += "- Cookies are expired or invalid\n"
-            full_msg += "- Video requires authentication\n\n"
-            full_msg += f"Update your cookies at:\n{cookie_path}\n\n"
-            full_msg += "Use a browser extension to export fresh YouTube cookies."
-            QMessageBox.critical(self, "Download error", full_msg)
-        else:
-            QMessageBox.critical(
-                self,
-                "Download error",
-                f"An error occurred during download:\n{error_msg}",
-            )
+        self.show_error(
+            "Download error",
+            f"An error occurred during download:\n{error_msg}",
+            kind or classify_error(error_msg),
+        )
         self.toggle_buttons(True)
         self.progress_bar.setValue(0)
         self.status_label.setText("Download error.")
@@ -658,10 +2068,12 @@ class MainWindow(QWidget):
     def stop_operation(self):
         """Stops any ongoing operation (download or information fetch) cooperatively."""
         threads_stopped = False
-        if self.download_thread is not None and self.download_thread.isRunning():
-            self.download_thread.cancel()  # Use cooperative cancellation instead of terminate()
-            self.download_thread.wait()
-            self.download_thread = None
+        stopping = False
+        if self.scheduler.is_active():
+            # Use cooperative cancellation instead of terminate(); download_finished
+            # restores the interface once the running downloads have ended
+            stopping = bool(self.scheduler.workers)
+            self.scheduler.cancel()
             self.download_in_progress = False
             threads_stopped = True
         if self.info_thread is not None and self.info_thread.isRunning():
@@ -669,7 +2081,16 @@ class MainWindow(QWidget):
             self.info_thread.wait()
             self.info_thread = None
             threads_stopped = True
-        if threads_stopped:
+        if self.prefetch_thread is not None and self.prefetch_thread.isRunning():
+            self.stop_prefetch()
+            threads_stopped = True
+        if self.sync_thread is not None and self.sync_thread.isRunning():
+            self.stop_subscription_sync()
+            threads_stopped = True
+        if stopping:
+            self.status_label.setText("Stopping...")
+            self.progress_bar.setValue(0)
+        elif threads_stopped:
             self.status_label.setText("Operation stopped.")
             self.progress_bar.setValue(0)
             self.toggle_buttons(True)
@@ -678,9 +2099,15 @@ class MainWindow(QWidget):
         """Enables or disables the main interface buttons."""
         self.download_button.setEnabled(enable)
         self.fetch_button.setEnabled(enable)
+        self.refresh_button.setEnabled(enable)
         self.folder_button.setEnabled(enable)
         self.stop_button.setEnabled(not enable)
 
+    def start_warmup(self):
+        """Imports yt-dlp in the background once the window is up, ahead of the first fetch."""
+        # A daemon thread, so a slow import never delays quitting the application
+        threading.Thread(target=load_yt_dlp, name="yt-dlp-warmup", daemon=True).start()
+
     def closeEvent(self, event):
         # If a download is in progress, show a confirmation dialog.
         if self.download_in_progress:
@@ -695,11 +2122,17 @@ class MainWindow(QWidget):
             msg_box.exec_()
             if msg_box.clickedButton() == accept_button:
                 self.save_config()
+                self.stop_prefetch()
+                self.stop_subscription_sync()
+                self.shutdown_workers()
                 event.accept()
             else:
                 event.ignore()
         else:
             self.save_config()
+            self.stop_prefetch()
+            self.stop_subscription_sync()
+            self.shutdown_workers()
             event.accept()
 
 
@@ -708,4 +2141,6 @@ if __name__ == "__main__":
     window = MainWindow()
     window.resize(600, 600)
     window.show()
+    # yt-dlp is only imported once the event loop runs, so the window paints first
+    QTimer.singleShot(0, window.start_warmup)
     sys.exit(app.exec_())
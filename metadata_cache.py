@@ -0,0 +1,254 @@
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from urllib.parse import urlparse, parse_qs
+
+# Keys that hold short-lived stream locations; they are stored apart from the
+# durable metadata so the title, description and format list outlive them.
+VOLATILE_KEYS = ("url", "manifest_url", "fragment_base_url", "fragments")
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "youtube-downloader",
+    "metadata",
+)
+DEFAULT_METADATA_TTL = 7 * 24 * 3600  # Durable metadata: one week
+DEFAULT_STREAM_TTL = 5 * 3600  # YouTube stream URLs expire after about six hours
+DEFAULT_LISTING_TTL = 10 * 60  # Flat playlist/channel listings: new uploads show up soon
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+# Eviction frees space down to this fraction of max_bytes, so a full cache is not
+# scanned again on every write
+EVICT_TO = 0.9
+
+_YOUTUBE_ID_RE = re.compile(r"(?:youtu\.be/|/shorts/|/live/|/embed/)([\w-]{11})")
+
+
+def video_key(url, playlist=False):
+    """
+    Returns a stable identifier for a URL: the YouTube video id if present, or the
+    playlist id when playlist is True and the URL carries one.
+    """
+    query = parse_qs(urlparse(url).query)
+    if playlist and "list" in query:
+        return f"youtube:list:{query['list'][0]}"
+    if "v" in query:
+        return f"youtube:{query['v'][0]}"
+    match = _YOUTUBE_ID_RE.search(url)
+    if match:
+        return f"youtube:{match.group(1)}"
+    if "list" in query:
+        return f"youtube:list:{query['list'][0]}"
+    return "url:" + url.strip()
+
+
+def _expiry_from_url(url):
+    """Reads the 'expire' timestamp embedded in googlevideo stream URLs, if any."""
+    try:
+        value = parse_qs(urlparse(url).query).get("expire")
+        return float(value[0]) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def split_info(info):
+    """
+    Splits an info dict into durable metadata and short-lived stream locations.
+    Returns (durable, streams) where streams maps format_id to its volatile keys.
+    """
+    durable = dict(info)
+    streams = {"formats": {}, "top": {}}
+    for key in VOLATILE_KEYS:
+        if key in durable:
+            streams["top"][key] = durable.pop(key)
+    for list_key in ("formats", "requested_formats"):
+        formats = durable.get(list_key)
+        if not formats:
+            continue
+        stripped = []
+        for f in formats:
+            f = dict(f)
+            volatile = {key: f.pop(key) for key in VOLATILE_KEYS if key in f}
+            if volatile and f.get("format_id") is not None:
+                streams["formats"][str(f["format_id"])] = volatile
+            stripped.append(f)
+        durable[list_key] = stripped
+    return durable, streams
+
+
+def merge_info(durable, streams):
+    """Reverses split_info, putting stream locations back into the format dicts."""
+    info = dict(durable)
+    info.update(streams.get("top", {}))
+    by_id = streams.get("formats", {})
+    for list_key in ("formats", "requested_formats"):
+        if info.get(list_key):
+            info[list_key] = [
+                dict(f, **by_id.get(str(f.get("format_id")), {}))
+                for f in info[list_key]
+            ]
+    return info
+
+
+class MetadataCache:
+    """
+    On-disk cache of extract_info results keyed by video id and extraction mode
+    (flat or full). Durable metadata and stream URLs are stored in separate files
+    with their own TTLs, flat playlist listings with the short listing_ttl, and the
+    least recently used entries are evicted once the cache grows beyond max_bytes.
+    The size is tracked as a running total, so the directory is only scanned when
+    the total goes over max_bytes.
+    """
+
+    def __init__(
+        self,
+        cache_dir=DEFAULT_CACHE_DIR,
+        metadata_ttl=DEFAULT_METADATA_TTL,
+        stream_ttl=DEFAULT_STREAM_TTL,
+        max_bytes=DEFAULT_MAX_BYTES,
+        listing_ttl=DEFAULT_LISTING_TTL,
+    ):
+        self.cache_dir = cache_dir
+        self.metadata_ttl = metadata_ttl
+        self.stream_ttl = stream_ttl
+        self.max_bytes = max_bytes
+        self.listing_ttl = listing_ttl
+        self.lock = threading.Lock()
+        # Bytes in the cache as of the last scan plus this process's writes since;
+        # None until the first write scans the directory
+        self.total_bytes = None
+
+    def _paths(self, url, flat):
+        key = f"{video_key(url, playlist=flat)}:{'flat' if flat else 'full'}"
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        base = os.path.join(self.cache_dir, digest)
+        return base + ".json", base + ".streams.json"
+
+    def get(self, url, flat, need_streams=False):
+        """
+        Returns the cached info for url, or None on a miss. If need_streams is True,
+        only returns an entry whose stream URLs have not expired yet.
+        """
+        meta_path, streams_path = self._paths(url, flat)
+        now = time.time()
+        try:
+            with self.lock:
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    record = json.load(f)
+                ttl = self.listing_ttl if flat else self.metadata_ttl
+                if now - record.get("stored", 0) > ttl:
+                    self._remove(meta_path, streams_path)
+                    return None
+                os.utime(meta_path)  # The modification time doubles as the LRU clock
+                streams = {}
+                if os.path.exists(streams_path):
+                    with open(streams_path, "r", encoding="utf-8") as f:
+                        stream_record = json.load(f)
+                    if stream_record.get("expires", 0) > now:
+                        streams = stream_record
+                    else:
+                        self._remove(streams_path)
+        except (OSError, ValueError):
+            return None
+        if need_streams and not streams:
+            return None
+        logging.debug("Metadata cache hit for %s (flat=%s)", url, flat)
+        return merge_info(record["info"], streams)
+
+    def put(self, url, flat, info):
+        """Stores an info dict, splitting off its stream URLs."""
+        durable, streams = split_info(info)
+        meta_path, streams_path = self._paths(url, flat)
+        now = time.time()
+        expires = now + self.stream_ttl
+        for volatile in [streams["top"]] + list(streams["formats"].values()):
+            url_expiry = _expiry_from_url(volatile.get("url"))
+            if url_expiry:
+                expires = min(expires, url_expiry)
+        try:
+            with self.lock:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                replaced = self._size(meta_path, streams_path)
+                self._write_atomic(meta_path, {"stored": now, "info": durable})
+                if streams["top"] or streams["formats"]:
+                    streams["expires"] = expires
+                    self._write_atomic(streams_path, streams)
+                else:
+                    self._remove(streams_path)
+                if self.total_bytes is not None:
+                    self.total_bytes += self._size(meta_path, streams_path) - replaced
+                if self.total_bytes is None or self.total_bytes > self.max_bytes:
+                    self._evict()
+        except (OSError, TypeError, ValueError) as e:
+            logging.warning("Could not write metadata cache entry for %s: %s", url, e)
+
+    def clear(self):
+        with self.lock:
+            for name in self._entries():
+                self._remove(os.path.join(self.cache_dir, name))
+            self.total_bytes = 0
+
+    def _entries(self):
+        try:
+            return [n for n in os.listdir(self.cache_dir) if n.endswith(".json")]
+        except OSError:
+            return []
+
+    def _write_atomic(self, path, data):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, default=str)
+            os.replace(tmp_path, path)
+        except BaseException:
+            self._remove(tmp_path)
+            raise
+
+    def _evict(self):
+        """Deletes least recently used entries until the cache is down to EVICT_TO."""
+        entries = []
+        total = 0
+        for name in self._entries():
+            if name.endswith(".streams.json"):
+                continue
+            meta_path = os.path.join(self.cache_dir, name)
+            streams_path = meta_path[: -len(".json")] + ".streams.json"
+            try:
+                stat = os.stat(meta_path)
+            except OSError:
+                continue
+            size = stat.st_size
+            if os.path.exists(streams_path):
+                size += os.path.getsize(streams_path)
+            entries.append((stat.st_mtime, size, meta_path, streams_path))
+            total += size
+        entries.sort()
+        if total <= self.max_bytes:
+            entries = []  # Only another process's removals kept it under the limit
+        while entries and total > self.max_bytes * EVICT_TO:
+            _, size, meta_path, streams_path = entries.pop(0)
+            self._remove(meta_path, streams_path)
+            total -= size
+        self.total_bytes = total
+
+    @staticmethod
+    def _size(*paths):
+        size = 0
+        for path in paths:
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                pass
+        return size
+
+    @staticmethod
+    def _remove(*paths):
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
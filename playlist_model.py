@@ -0,0 +1,133 @@
+from PyQt5.QtCore import (
+    QAbstractListModel,
+    QModelIndex,
+    QSortFilterProxyModel,
+    Qt,
+)
+
+
+class PlaylistStore:
+    """
+    Compact column store for playlist entries: parallel lists of titles and URLs
+    instead of one dict per entry, plus a sparse map of row tags (state or progress).
+    """
+
+    __slots__ = ("titles", "urls", "tags")
+
+    def __init__(self):
+        self.titles = []
+        self.urls = []
+        self.tags = {}  # Row -> short tag such as "done" or "42%"
+
+    def __len__(self):
+        return len(self.urls)
+
+    def append(self, title, url):
+        self.titles.append(title)
+        self.urls.append(url)
+
+    def clear(self):
+        self.titles.clear()
+        self.urls.clear()
+        self.tags.clear()
+
+    def entry(self, row):
+        return {"title": self.titles[row], "url": self.urls[row]}
+
+
+class PlaylistModel(QAbstractListModel):
+    """
+    List model over a PlaylistStore. Entries can be appended in batches as they
+    arrive, and only visible rows are ever turned into display text.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.store = PlaylistStore()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.store)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == Qt.DisplayRole:
+            tag = self.store.tags.get(row)
+            title = self.store.titles[row]
+            return f"[{tag}] {title}" if tag else title
+        if role == Qt.ToolTipRole:
+            return self.store.titles[row]
+        if role == Qt.UserRole:
+            return self.store.urls[row]
+        return None
+
+    def __len__(self):
+        return len(self.store)
+
+    def title(self, row):
+        if 0 <= row < len(self.store):
+            return self.store.titles[row]
+        return ""
+
+    def url(self, row):
+        if 0 <= row < len(self.store):
+            return self.store.urls[row]
+        return ""
+
+    def entries(self):
+        """Returns all entries as a list of {"title", "url"} dicts."""
+        return [self.store.entry(row) for row in range(len(self.store))]
+
+    def set_entries(self, videos):
+        """Replaces the playlist with videos ([{"title", "url"}])."""
+        self.beginResetModel()
+        self.store.clear()
+        for video in videos:
+            self.store.append(video.get("title", "Unknown Title"), video.get("url", ""))
+        self.endResetModel()
+
+    def append_entries(self, videos):
+        """Appends a batch of videos with a single row insertion."""
+        if not videos:
+            return
+        first = len(self.store)
+        self.beginInsertRows(QModelIndex(), first, first + len(videos) - 1)
+        for video in videos:
+            self.store.append(video.get("title", "Unknown Title"), video.get("url", ""))
+        self.endInsertRows()
+
+    def clear(self):
+        self.set_entries([])
+
+    def set_tag(self, row, tag):
+        """Prefixes a row's title with a state or progress tag; None removes it."""
+        if not 0 <= row < len(self.store):
+            return
+        if tag is None:
+            self.store.tags.pop(row, None)
+        else:
+            self.store.tags[row] = tag
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole])
+
+
+class PlaylistFilterModel(QSortFilterProxyModel):
+    """Case-insensitive title search over a PlaylistModel without rebuilding any rows."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.setFilterRole(Qt.ToolTipRole)  # The bare title, without the state tag
+
+    def source_row(self, proxy_index):
+        """Maps a view index to the playlist row, or -1."""
+        if not proxy_index.isValid():
+            return -1
+        return self.mapToSource(proxy_index).row()
+
+    def proxy_index(self, row):
+        """Maps a playlist row to a view index (invalid if the row is filtered out)."""
+        return self.mapFromSource(self.sourceModel().index(row))
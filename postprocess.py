@@ -0,0 +1,223 @@
+import os
+import re
+import time
+import shutil
+import logging
+import subprocess
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# Post-processing options; see PostProcessPool.submit()
+DEFAULT_POSTPROCESS = {
+    "container": "mp4",  # Container videos are merged or remuxed into
+    "audio_format": "mp3",  # Format audio-only downloads are extracted to
+    "embed_thumbnail": False,
+    "normalize_audio": False,
+}
+VIDEO_CONTAINERS = ("mp4", "mkv", "webm")
+AUDIO_FORMATS = ("mp3", "m4a", "opus")
+DEFAULT_POSTPROCESS_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+
+# Codec families each container accepts without re-encoding; mkv accepts anything
+_CONTAINER_VIDEO_CODECS = {
+    "mp4": ("avc1", "h264", "hev1", "hvc1", "vp09", "vp9", "av01"),
+    "webm": ("vp8", "vp9", "vp09", "av01"),
+}
+_CONTAINER_AUDIO_CODECS = {
+    "mp4": ("mp4a", "aac", "opus", "mp3", "ac-3", "ec-3"),
+    "webm": ("opus", "vorbis"),
+    "mp3": ("mp3",),
+    "m4a": ("mp4a", "aac"),
+    "opus": ("opus",),
+}
+_AUDIO_ENCODERS = {
+    "mp4": ["-c:a", "aac", "-b:a", "192k"],
+    "mkv": ["-c:a", "aac", "-b:a", "192k"],
+    "webm": ["-c:a", "libopus", "-b:a", "160k"],
+    "mp3": ["-c:a", "libmp3lame", "-q:a", "2"],
+    "m4a": ["-c:a", "aac", "-b:a", "192k"],
+    "opus": ["-c:a", "libopus", "-b:a", "160k"],
+}
+_THUMBNAIL_CONTAINERS = ("mp4", "m4a", "mp3")
+_LOUDNORM_FILTER = "loudnorm=I=-16:TP=-1.5:LRA=11"
+_FORMAT_SUFFIX_RE = re.compile(r"\.f[\w-]+$")
+
+
+def ffmpeg_available():
+    return shutil.which("ffmpeg") is not None
+
+
+def codec_family(codec):
+    return (codec or "none").split(".")[0].lower()
+
+
+def output_stem(files):
+    """
+    Returns the output path without extension: the video file's name with the
+    .f<format_id> suffix of separately downloaded formats removed.
+    """
+    source = next((f for f in files if f.get("has_video")), files[0])
+    return _FORMAT_SUFFIX_RE.sub("", os.path.splitext(source["filename"])[0])
+
+
+def target_extension(files, options):
+    """Returns the output extension; mkv if the container cannot hold the video codec."""
+    if not any(f.get("has_video") for f in files):
+        return options.get("audio_format") or DEFAULT_POSTPROCESS["audio_format"]
+    container = options.get("container") or DEFAULT_POSTPROCESS["container"]
+    allowed = _CONTAINER_VIDEO_CODECS.get(container)
+    if allowed is not None:
+        for f in files:
+            if f.get("has_video") and codec_family(f.get("vcodec")) not in allowed:
+                logging.info(
+                    "%s cannot hold %s video, using mkv instead", container, f.get("vcodec")
+                )
+                return "mkv"
+    return container
+
+
+def needs_processing(files, ext, options):
+    """Whether anything is left to do for a single downloaded file."""
+    if len(files) != 1 or options.get("embed_thumbnail") or options.get("normalize_audio"):
+        return True
+    return os.path.splitext(files[0]["filename"])[1].lstrip(".").lower() != ext
+
+
+def build_ffmpeg_command(files, output, ext, options, thumbnail=None):
+    """Returns the ffmpeg arguments that merge, convert and tag files in one pass."""
+    audio_only = not any(f.get("has_video") for f in files)
+    cmd = ["ffmpeg", "-y", "-nostdin", "-loglevel", "error"]
+    for f in files:
+        cmd += ["-i", f["filename"]]
+    if thumbnail:
+        cmd += ["-i", thumbnail]
+    for i, f in enumerate(files):
+        if f.get("has_video") and not audio_only:
+            cmd += ["-map", f"{i}:v:0"]
+        if f.get("has_audio"):
+            cmd += ["-map", f"{i}:a:0?"]
+    cmd += ["-c", "copy"]
+    audio_codecs = _CONTAINER_AUDIO_CODECS.get(ext)
+    reencode = options.get("normalize_audio") or (
+        audio_codecs is not None
+        and any(
+            f.get("has_audio") and codec_family(f.get("acodec")) not in audio_codecs
+            for f in files
+        )
+    )
+    if reencode:
+        cmd += _AUDIO_ENCODERS[ext]
+    if options.get("normalize_audio"):
+        cmd += ["-af", _LOUDNORM_FILTER]
+    if thumbnail:
+        # The cover is the stream after the main video, or the only video stream
+        cover = 0 if audio_only else 1
+        cmd += [
+            "-map",
+            f"{len(files)}:v:0",
+            f"-c:v:{cover}",
+            "mjpeg",
+            f"-disposition:v:{cover}",
+            "attached_pic",
+        ]
+        if ext == "mp3":
+            cmd += ["-id3v2_version", "3"]
+    cmd.append(output)
+    return cmd
+
+
+def fetch_thumbnail(url, stem):
+    """Downloads a thumbnail next to the output; returns its path or None."""
+    path = f"{stem}.thumb"
+    try:
+        with urllib.request.urlopen(url, timeout=30) as response, open(path, "wb") as out:
+            shutil.copyfileobj(response, out)
+        return path
+    except Exception as e:
+        logging.warning(f"Could not fetch thumbnail {url}: {e}")
+        return None
+
+
+def postprocess_files(files, options=None):
+    """
+    Turns the files yt-dlp downloaded for one video into the final file: merges
+    separate video and audio, remuxes to the chosen container, extracts audio for
+    audio-only downloads, embeds the thumbnail and normalises loudness, all in a
+    single ffmpeg run. files are dicts with filename, has_video, has_audio, vcodec,
+    acodec and thumbnail (URL). Returns the output path; raises on failure.
+    """
+    options = dict(DEFAULT_POSTPROCESS, **(options or {}))
+    files = [f for f in files if os.path.exists(f["filename"])]
+    if not files:
+        raise Exception("No downloaded files to post-process")
+    ext = target_extension(files, options)
+    stem = output_stem(files)
+    output = f"{stem}.{ext}"
+    if not needs_processing(files, ext, options):
+        return files[0]["filename"]
+    if not ffmpeg_available():
+        logging.warning("ffmpeg is not installed, %s is left as is", files[0]["filename"])
+        return files[0]["filename"]
+
+    thumbnail = None
+    thumbnail_url = next((f.get("thumbnail") for f in files if f.get("thumbnail")), None)
+    if options.get("embed_thumbnail") and thumbnail_url:
+        if ext in _THUMBNAIL_CONTAINERS:
+            thumbnail = fetch_thumbnail(thumbnail_url, stem)
+        else:
+            logging.info("Thumbnails cannot be embedded in %s files", ext)
+    temp_output = f"{stem}.pp.{ext}"
+    try:
+        cmd = build_ffmpeg_command(files, temp_output, ext, options, thumbnail)
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise Exception(f"ffmpeg failed: {result.stderr.strip()[-500:]}")
+        os.replace(temp_output, output)
+    finally:
+        for path in (temp_output, thumbnail):
+            if path and os.path.exists(path):
+                os.remove(path)
+    for f in files:
+        if os.path.abspath(f["filename"]) != os.path.abspath(output):
+            os.remove(f["filename"])
+    return output
+
+
+class PostProcessPool:
+    """
+    Bounded thread pool running postprocess_files() off the download workers, so
+    a download slot is released as soon as the transfer ends and ffmpeg work of
+    one video overlaps with the network transfer of the next. Each thread drives
+    one ffmpeg subprocess at a time; the CPU-bound work happens in those
+    subprocesses, so threads are enough to use several cores.
+    """
+
+    def __init__(self, max_workers=DEFAULT_POSTPROCESS_WORKERS):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max(1, int(max_workers)), thread_name_prefix="postprocess"
+        )
+
+    def submit(self, files, options=None, on_done=None):
+        """
+        Queues the files of one video. on_done(output, error, seconds) is called
+        from a pool thread with the output path or the error message and the time
+        the processing took. Returns a Future.
+        """
+
+        def job():
+            started = time.monotonic()
+            try:
+                output = postprocess_files(files, options)
+            except Exception as e:
+                logging.error(f"Post-processing failed: {e}")
+                if on_done is not None:
+                    on_done(None, str(e), time.monotonic() - started)
+                raise
+            if on_done is not None:
+                on_done(output, None, time.monotonic() - started)
+            return output
+
+        return self.executor.submit(job)
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
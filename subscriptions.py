@@ -0,0 +1,198 @@
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from download_errors import PERMANENT_ERRORS
+from engine import STATE_DONE, STATE_FAILED, STATE_SKIPPED, iter_playlist_entries
+
+DEFAULT_SUBSCRIPTIONS_PATH = "subscriptions.json"
+SYNC_WORKERS = 8  # Subscriptions listed at the same time
+# Known entries in a row after which the rest of a newest-first listing is assumed
+# known too; more than one, so a re-uploaded or pinned old video does not stop it
+KNOWN_STREAK = 3
+
+# Outcome of listing one subscription: new holds the {"id", "title", "url"} to download
+# (new uploads first, then earlier ones still not downloaded), checked the number of
+# entries listed, stopped_early whether paging stopped at known entries
+SyncResult = namedtuple("SyncResult", "url new checked stopped_early seconds error")
+
+
+def is_newest_first(url):
+    """Channels and their tabs list the newest uploads first; playlists usually append."""
+    return "list=" not in url
+
+
+def is_settled(state, kind=None, reason=None):
+    """
+    True once a queued subscription entry needs no further attempt: downloaded,
+    skipped because it already was, or failed for a reason retrying cannot fix.
+    """
+    if state == STATE_DONE:
+        return True
+    if state == STATE_SKIPPED:
+        return reason == "archived"
+    return state == STATE_FAILED and kind in PERMANENT_ERRORS
+
+
+def sync_subscription(subscription, is_cancelled=None):
+    """
+    Lists a subscription's entries until the new ones are found and returns a
+    SyncResult. Newest-first subscriptions stop paging after KNOWN_STREAK known
+    entries in a row, so a sync with nothing new costs one page request; others
+    are listed in full, since new entries are appended at the end.
+    """
+    started = time.monotonic()
+    seen = set(subscription.get("seen", ()))
+    pending = dict(subscription.get("pending", {}))
+    new = []
+    checked = 0
+    streak = 0
+    stopped_early = False
+    error = None
+    entries = iter_playlist_entries(subscription["url"], is_cancelled)
+    try:
+        for video in entries:
+            checked += 1
+            if video["id"] in seen:
+                streak += 1
+                if subscription.get("newest_first") and streak >= KNOWN_STREAK:
+                    stopped_early = True
+                    break
+                continue
+            streak = 0
+            pending.pop(video["id"], None)
+            new.append(video)
+    except Exception as e:
+        logging.warning("Could not sync %s: %s", subscription["url"], e)
+        error = str(e)
+    finally:
+        entries.close()  # Stops paging; the remaining pages are never requested
+    new.extend(dict(video, id=video_id) for video_id, video in pending.items())
+    return SyncResult(
+        subscription["url"], new, checked, stopped_early, time.monotonic() - started, error
+    )
+
+
+class SubscriptionList:
+    """
+    Channels and playlists mirrored into output folders, kept in a JSON file.
+    Each subscription remembers the ids of the entries already downloaded
+    ("seen") and those queued but not finished yet ("pending"), so a sync only
+    pages until it reaches known entries and queues what is new or still missing.
+    """
+
+    def __init__(self, path=DEFAULT_SUBSCRIPTIONS_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.subscriptions = self._load()  # URL -> subscription dict
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return {s["url"]: s for s in json.load(f).get("subscriptions", [])}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning("Could not read the subscription list: %s", e)
+            return {}
+
+    def _save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"subscriptions": list(self.subscriptions.values())}, f, indent=1)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def all(self):
+        """Returns copies of the subscriptions, in the order they were added."""
+        with self.lock:
+            return [
+                dict(s, seen=list(s.get("seen", [])), pending=dict(s.get("pending", {})))
+                for s in self.subscriptions.values()
+            ]
+
+    def get(self, url):
+        """Returns a copy of the subscription of url, or None."""
+        with self.lock:
+            subscription = self.subscriptions.get(url)
+            return dict(subscription) if subscription is not None else None
+
+    def add(self, url, output, newest_first=None):
+        """Subscribes output to url, or moves an existing subscription to output."""
+        if newest_first is None:
+            newest_first = is_newest_first(url)
+        with self.lock:
+            subscription = self.subscriptions.setdefault(
+                url, {"url": url, "seen": [], "pending": {}}
+            )
+            subscription["output"] = output
+            subscription["newest_first"] = bool(newest_first)
+            self._save()
+            return dict(subscription)
+
+    def remove(self, url):
+        """Returns False if url was not subscribed."""
+        with self.lock:
+            if self.subscriptions.pop(url, None) is None:
+                return False
+            self._save()
+            return True
+
+    def record_sync(self, result):
+        """Stores the timing of a sync and keeps its new entries pending until settled."""
+        with self.lock:
+            subscription = self.subscriptions.get(result.url)
+            if subscription is None:
+                return  # Unsubscribed while it was syncing
+            pending = subscription.setdefault("pending", {})
+            for video in result.new:
+                pending[video["id"]] = {"title": video["title"], "url": video["url"]}
+            subscription["last_sync"] = time.time()
+            subscription["last_seconds"] = round(result.seconds, 3)
+            subscription["last_new"] = len(result.new)
+            subscription["last_error"] = result.error
+            self._save()
+
+    def mark_seen(self, url, ids):
+        """Records entries of subscription url as downloaded (or not to be retried)."""
+        with self.lock:
+            subscription = self.subscriptions.get(url)
+            if subscription is None or not ids:
+                return
+            seen = subscription.setdefault("seen", [])
+            known = set(seen)
+            for video_id in ids:
+                subscription.get("pending", {}).pop(video_id, None)
+                if video_id not in known:
+                    known.add(video_id)
+                    seen.append(video_id)
+            self._save()
+
+    def sync(self, urls=None, workers=SYNC_WORKERS, on_result=None, is_cancelled=None):
+        """
+        Syncs the subscriptions in urls (default: all) on workers threads and
+        returns their SyncResults in list order. on_result(result) is called from
+        the worker threads as each one finishes.
+        """
+        subscriptions = [s for s in self.all() if urls is None or s["url"] in urls]
+        results = {}
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = {
+                pool.submit(sync_subscription, s, is_cancelled): s["url"]
+                for s in subscriptions
+            }
+            for future in as_completed(futures):
+                result = future.result()
+                self.record_sync(result)
+                results[result.url] = result
+                if on_result is not None:
+                    on_result(result)
+        return [results[s["url"]] for s in subscriptions]
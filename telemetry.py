@@ -0,0 +1,248 @@
+import os
+import re
+import csv
+import sys
+import json
+import time
+import logging
+import threading
+from collections import deque
+
+DEFAULT_METRICS_PATH = "download_metrics.jsonl"
+RECENT_RECORDS = 500  # Records kept in memory for the summary table
+
+# Columns of a metrics record, in CSV order. Times are in seconds, throughput in
+# bytes per second. extraction_s runs from the start of the (last) attempt to the
+# first progress update, ttfb_s to the first received byte; waiting for a
+# per-site download slot is reported separately as host_wait_s.
+METRIC_FIELDS = [
+    "finished_at",
+    "index",
+    "url",
+    "status",
+    "error_kind",
+    "workers",
+    "host_wait_s",
+    "extraction_s",
+    "ttfb_s",
+    "transfer_s",
+    "avg_throughput",
+    "peak_throughput",
+    "bytes_transferred",
+    "bytes_on_disk",
+    "fragment_retries",
+    "request_retries",
+    "job_retries",
+    "merge_s",
+    "total_s",
+    "yt_dlp_version",
+]
+
+# yt-dlp retry messages, e.g. "Retrying fragment 12 (1/10)..." and "Retrying (2/5)..."
+_FRAGMENT_RETRY_RE = re.compile(r"Retrying fragment \d+")
+_REQUEST_RETRY_RE = re.compile(r"Retrying \(\d+/\d+\)")
+
+
+def yt_dlp_version():
+    """Returns the version of the loaded yt-dlp, without importing it."""
+    module = sys.modules.get("yt_dlp.version")
+    return getattr(module, "__version__", None)
+
+
+def _seconds(start, end):
+    return round(end - start, 3) if start is not None and end is not None else None
+
+
+class JobMetrics:
+    """
+    Timings and counters of one download job. download_video() feeds it progress
+    updates, yt-dlp log messages and retries; the job's owner calls record() once
+    the job (including post-processing) is over. Hooks may run on several threads.
+    Instances can be pickled, to measure a job in a worker process.
+    """
+
+    def __init__(self, url, index=None, workers=None):
+        self.url = url
+        self.index = index
+        self.workers = workers
+        self.lock = threading.Lock()
+        self.created = time.monotonic()
+        self.attempt_started = None
+        self.host_wait = 0.0
+        self.first_update = None
+        self.first_byte = None
+        self.last_byte = None
+        self.last_finished = None
+        self.transfer_ended = None
+        self.peak_speed = 0
+        self.bytes_transferred = 0  # All attempts
+        self.attempt_bytes = 0  # Current attempt, for its throughput
+        self.fragment_retries = 0
+        self.request_retries = 0
+        self.job_retries = 0
+
+    def __getstate__(self):
+        # Sent back from worker processes; the lock stays behind
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def update_from(self, other):
+        """Takes over the timings and counters other measured, e.g. in a worker process."""
+        state = other.__getstate__()
+        for name in ("url", "index", "workers", "created"):
+            del state[name]
+        with self.lock:
+            self.__dict__.update(state)
+
+    def start_attempt(self):
+        """Starts the timings of a new download attempt; counters keep accumulating."""
+        with self.lock:
+            self.attempt_started = time.monotonic()
+            self.attempt_bytes = 0
+            self.host_wait = 0.0
+            self.first_update = self.first_byte = self.last_byte = None
+            self.last_finished = self.transfer_ended = None
+
+    def add_host_wait(self, seconds):
+        with self.lock:
+            self.host_wait += seconds
+
+    def retried(self):
+        with self.lock:
+            self.job_retries += 1
+
+    def on_progress(self, d, nbytes=0):
+        """Accounts for a yt-dlp progress dict; nbytes is the data received since the last one."""
+        now = time.monotonic()
+        with self.lock:
+            if self.first_update is None:
+                self.first_update = now
+            if d.get("status") == "downloading":
+                if nbytes > 0:
+                    if self.first_byte is None:
+                        self.first_byte = now
+                    self.last_byte = now
+                    self.bytes_transferred += nbytes
+                    self.attempt_bytes += nbytes
+                self.peak_speed = max(self.peak_speed, d.get("speed") or 0)
+            elif d.get("status") == "finished":
+                self.last_finished = now
+
+    def on_log(self, level, message):
+        """Log listener for YoutubeDLPool.lease(); counts the retries yt-dlp reports."""
+        if _FRAGMENT_RETRY_RE.search(message):
+            with self.lock:
+                self.fragment_retries += 1
+        elif _REQUEST_RETRY_RE.search(message):
+            with self.lock:
+                self.request_retries += 1
+
+    def end_transfer(self):
+        """Marks the end of yt-dlp's work; anything after the last file is its merging."""
+        with self.lock:
+            self.transfer_ended = time.monotonic()
+
+    def record(self, status, paths=(), merge_seconds=None, error_kind=None):
+        """
+        Returns the JSON-safe metrics record of the job. paths are the final files,
+        for bytes_on_disk; merge_seconds overrides the merge time measured inside
+        yt-dlp when the files were post-processed separately.
+        """
+        now = time.monotonic()
+        with self.lock:
+            start = self.attempt_started
+            if start is not None:
+                start += self.host_wait
+            transfer_s = _seconds(self.first_byte, self.last_byte)
+            if merge_seconds is None and self.last_finished is not None:
+                merge_seconds = _seconds(self.last_finished, self.transfer_ended)
+            return {
+                "finished_at": round(time.time(), 3),
+                "index": self.index,
+                "url": self.url,
+                "status": status,
+                "error_kind": error_kind,
+                "workers": self.workers,
+                "host_wait_s": round(self.host_wait, 3),
+                "extraction_s": _seconds(start, self.first_update),
+                "ttfb_s": _seconds(start, self.first_byte),
+                "transfer_s": transfer_s,
+                "avg_throughput": (
+                    round(self.attempt_bytes / transfer_s) if transfer_s else None
+                ),
+                "peak_throughput": round(self.peak_speed) or None,
+                "bytes_transferred": self.bytes_transferred,
+                "bytes_on_disk": sum(
+                    os.path.getsize(path) for path in paths if path and os.path.isfile(path)
+                ),
+                "fragment_retries": self.fragment_retries,
+                "request_retries": self.request_retries,
+                "job_retries": self.job_retries,
+                "merge_s": round(merge_seconds, 3) if merge_seconds is not None else None,
+                "total_s": _seconds(self.created, now),
+                "yt_dlp_version": yt_dlp_version(),
+            }
+
+
+class MetricsRecorder:
+    """
+    Appends metrics records to a JSONL file, or a CSV file if path ends in .csv,
+    and keeps the most recent ones in memory. Safe to call from any thread.
+    """
+
+    def __init__(self, path=DEFAULT_METRICS_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.recent = deque(maxlen=RECENT_RECORDS)
+
+    def write(self, record):
+        with self.lock:
+            self.recent.append(record)
+            if not self.path:
+                return
+            try:
+                if self.path.lower().endswith(".csv"):
+                    new_file = not os.path.exists(self.path) or not os.path.getsize(self.path)
+                    with open(self.path, "a", newline="", encoding="utf-8") as f:
+                        writer = csv.DictWriter(f, METRIC_FIELDS, extrasaction="ignore")
+                        if new_file:
+                            writer.writeheader()
+                        writer.writerow(record)
+                else:
+                    with open(self.path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(record) + "\n")
+            except OSError as e:
+                logging.error("Could not write download metrics: %s", e)
+
+    def records(self):
+        with self.lock:
+            return list(self.recent)
+
+
+def _mean(values):
+    values = [v for v in values if v is not None]
+    return round(sum(values) / len(values), 3) if values else None
+
+
+def summarize(records):
+    """Returns aggregate figures over metrics records, for summary rows and reports."""
+    done = [r for r in records if r["status"] == "done"]
+    return {
+        "jobs": len(records),
+        "done": len(done),
+        "failed": sum(1 for r in records if r["status"] == "failed"),
+        "mean_extraction_s": _mean(r["extraction_s"] for r in done),
+        "mean_ttfb_s": _mean(r["ttfb_s"] for r in done),
+        "mean_throughput": _mean(r["avg_throughput"] for r in done),
+        "peak_throughput": max((r["peak_throughput"] or 0 for r in done), default=0),
+        "mean_merge_s": _mean(r["merge_s"] for r in done),
+        "fragment_retries": sum(r["fragment_retries"] for r in records),
+        "job_retries": sum(r["job_retries"] for r in records),
+        "bytes_transferred": sum(r["bytes_transferred"] for r in records),
+        "bytes_on_disk": sum(r["bytes_on_disk"] for r in records),
+    }
@@ -0,0 +1,39 @@
+import time
+from bandwidth import BandwidthGovernor, host_key
+
+
+def test_host_key_registered_domains():
+    assert host_key("https://www.youtube.com/watch?v=x") == "youtube.com"
+    assert host_key("https://youtu.be/x") == "youtube.com"
+    assert host_key("https://rr3---sn-abc.googlevideo.com/videoplayback") == "googlevideo.com"
+    assert host_key("https://www.bbc.co.uk/iplayer") == "bbc.co.uk"
+    assert host_key("https://www.abc.net.au/news") == "abc.net.au"
+    assert host_key("https://news.bbc.co.uk/") != host_key("https://www.itv.co.uk/")
+    assert host_key("http://127.0.0.1:8000/video") == "127.0.0.1"
+
+
+def test_token_bucket_throttles_to_the_rate():
+    governor = BandwidthGovernor(rate=100_000)
+    started = time.monotonic()
+    for _ in range(5):
+        governor.consume(50_000)  # 250 kB with a 100 kB burst: about 1.5 s
+    elapsed = time.monotonic() - started
+    assert 1.2 <= elapsed <= 3
+    assert governor.total_bytes == 250_000
+
+
+def test_unlimited_rate_and_cancellation():
+    governor = BandwidthGovernor()
+    assert governor.consume(10**9)
+    governor.set_rate(1000)
+    assert governor.consume(10**6, is_cancelled=lambda: True) is False
+
+
+def test_per_host_slots():
+    governor = BandwidthGovernor(per_host=1)
+    host = governor.acquire_host("https://www.youtube.com/a")
+    assert governor.acquire_host("https://youtu.be/b", is_cancelled=lambda: True) is None
+    assert governor.acquire_host("https://vimeo.com/c") == "vimeo.com"
+    governor.release_host(host)
+    assert governor.acquire_host("https://youtu.be/b") == "youtube.com"
+
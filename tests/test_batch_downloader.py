@@ -0,0 +1,67 @@
+import time
+import threading
+import pytest
+from download_journal import DownloadJournal
+from engine import STATE_FAILED, BatchDownloader, _with_resumed
+
+
+def make_downloader(tmp_path, **kwargs):
+    return BatchDownloader(
+        "best", str(tmp_path), archive=False, pipeline=False, postprocess=None, **kwargs
+    )
+
+
+def test_interrupt_while_listing_does_not_wait_for_downloads(tmp_path):
+    downloader = make_downloader(tmp_path, concurrency=2)
+    release = threading.Event()
+    downloader._download = lambda index, url: release.wait(10)
+
+    def videos():
+        yield {"title": "a", "url": "https://example.com/a"}
+        yield {"title": "b", "url": "https://example.com/b"}
+        yield {"title": "c", "url": "https://example.com/c"}
+        raise KeyboardInterrupt
+
+    started = time.monotonic()
+    with pytest.raises(KeyboardInterrupt):
+        downloader.run(videos())
+    release.set()
+    assert time.monotonic() - started < 5
+    assert downloader.cancelled
+
+
+def test_journal_resumes_an_open_run_for_the_same_settings(tmp_path):
+    journal = DownloadJournal(str(tmp_path / "journal.jsonl"))
+    entries = [{"index": i, "url": url, "title": url} for i, url in enumerate("abc")]
+    journal.start_run(entries, "best", str(tmp_path))
+    journal.record(0, "a", status="done")
+    downloader = make_downloader(tmp_path, journal=journal)
+    downloaded = []
+    downloader._download = lambda index, url: downloaded.append(url)
+    downloader.run([{"title": "c", "url": "c"}, {"title": "d", "url": "d"}])
+    assert sorted(downloaded) == ["b", "c", "d"]
+
+
+def test_busy_journal_is_skipped_for_one_run_only(tmp_path):
+    journal = DownloadJournal(str(tmp_path / "journal.jsonl"))
+    journal.start_run([{"index": 0, "url": "a", "title": "a"}], "best", "/elsewhere")
+    events = []
+    downloader = make_downloader(tmp_path, journal=journal, on_event=events.append)
+    downloader._download = lambda index, url: None
+    downloader.run([{"title": "x", "url": "x"}])
+    assert {"event": "journal", "state": "busy", "output": "/elsewhere"} in events
+    assert downloader.journal is journal
+    assert journal.incomplete()[0]["output"] == "/elsewhere"
+    journal.close_run()  # The other run was finished elsewhere
+    # A failed entry keeps the run open, so it can be inspected
+    downloader._download = lambda index, url: downloader._set_state(index, url, STATE_FAILED)
+    downloader.run([{"title": "y", "url": "y"}])
+    run, pending = journal.incomplete()
+    assert run["output"] == str(tmp_path)
+    assert [entry["url"] for entry in pending] == ["y"]
+
+
+def test_with_resumed_appends_entries_not_given_again():
+    videos = [{"title": "B", "url": "b"}, {"title": "C", "url": "c"}]
+    resumed = [{"title": "A", "url": "a"}, {"title": "B", "url": "b"}]
+    assert [video["url"] for video in _with_resumed(iter(videos), resumed)] == ["b", "c", "a"]
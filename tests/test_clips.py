@@ -0,0 +1,71 @@
+import pytest
+from clips import ClipRanges, format_timestamp, make_clip, parse_range, parse_timestamp
+
+CHAPTERS = [
+    {"start_time": 0, "end_time": 60, "title": "Intro"},
+    {"start_time": 60, "end_time": 300, "title": "Part 1"},
+    {"start_time": 300, "end_time": 600, "title": "Part 2"},
+    {"start_time": 600, "end_time": 660, "title": "Outro"},
+]
+
+
+@pytest.mark.parametrize(
+    "text, seconds",
+    [("45", 45.0), ("1:30", 90.0), ("1:02:03", 3723.0), ("0:01.5", 1.5)],
+)
+def test_parse_timestamp(text, seconds):
+    assert parse_timestamp(text) == seconds
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [("1:00-5:30", [60.0, 330.0]), ("-5:30", [0.0, 330.0]), ("1:00-", [60.0, None])],
+)
+def test_parse_range(text, expected):
+    assert parse_range(text) == expected
+
+
+@pytest.mark.parametrize("text", ["1:00", "5:00-1:00", "a-b", "1:00-1:00"])
+def test_parse_range_rejects_invalid_ranges(text):
+    with pytest.raises(ValueError):
+        parse_range(text)
+
+
+def test_format_timestamp():
+    assert format_timestamp(3723.9) == "1:02:03"
+    assert format_timestamp(float("inf")) == "end"
+
+
+def test_make_clip():
+    assert make_clip() is None
+    assert make_clip(ranges=[(60, None)], precise=1) == {
+        "ranges": [[60, None]],
+        "chapters": [],
+        "split": False,
+        "precise": True,
+    }
+
+
+def test_ranges_are_clamped_to_the_duration():
+    sections = ClipRanges(make_clip(ranges=[[60, None], [0, 30]]))({"duration": 120})
+    assert sections == [
+        {"start_time": 60, "end_time": 120, "title": "0.01.00-0.02.00", "index": 1},
+        {"start_time": 0, "end_time": 30, "title": "0.00.00-0.00.30", "index": 2},
+    ]
+
+
+def test_adjacent_chapters_are_joined_unless_split():
+    info = {"duration": 660, "chapters": CHAPTERS}
+    joined = ClipRanges(make_clip(chapters=["^part"])).sections(info)
+    assert [(s["start_time"], s["end_time"], s["title"]) for s in joined] == [
+        (60, 600, "Part 1 + Part 2")
+    ]
+    split = ClipRanges(make_clip(chapters=["^part"], split=True)).sections(info)
+    assert [(s["title"], s["index"]) for s in split] == [("Part 1", 1), ("Part 2", 2)]
+    assert all("chapter" not in s for s in split)
+
+
+def test_missing_chapters_raise():
+    clip = ClipRanges(make_clip(chapters=["credits"]))
+    with pytest.raises(ValueError):
+        clip.sections({"duration": 660, "chapters": CHAPTERS})
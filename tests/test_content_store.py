@@ -0,0 +1,108 @@
+import os
+import copy
+import pytest
+from content_store import ContentStore
+from engine import selected_store_key, store_key
+
+
+def video_info():
+    def fmt(format_id, height, vcodec, acodec):
+        return {
+            "format_id": format_id,
+            "url": f"https://example.com/{format_id}",
+            "ext": "m4a" if vcodec == "none" else "mp4",
+            "height": height,
+            "vcodec": vcodec,
+            "acodec": acodec,
+            "protocol": "https",
+        }
+
+    return {
+        "id": "abcdefghijk",
+        "title": "Video",
+        "extractor": "test",
+        "extractor_key": "Test",
+        "webpage_url": "https://example.com/watch",
+        "formats": [
+            fmt("140", None, "none", "mp4a.40.2"),
+            fmt("18", 360, "avc1.42001E", "mp4a.40.2"),
+            fmt("137", 1080, "avc1.640028", "none"),
+        ],
+    }
+
+
+@pytest.mark.parametrize(
+    "spec, format_id", [("137+140", "137+140"), ("best[height<=360]", "18")]
+)
+def test_selected_store_key_uses_the_selected_formats(spec, format_id):
+    yt_dlp = pytest.importorskip("yt_dlp")
+    info = video_info()
+    original = copy.deepcopy(info)
+    with yt_dlp.YoutubeDL({"format": spec, "quiet": True}) as ydl:
+        key = selected_store_key(ydl, info, {})
+    assert key == store_key(info, format_id, {})
+    assert info == original
+
+
+def test_selected_store_key_without_a_matching_format():
+    yt_dlp = pytest.importorskip("yt_dlp")
+    with yt_dlp.YoutubeDL({"format": "best[height>=4000]", "quiet": True}) as ydl:
+        assert selected_store_key(ydl, video_info(), {}) is None
+
+
+def test_store_key_depends_on_formats_and_options():
+    info = {"id": "dQw4w9WgXcQ", "extractor_key": "Youtube"}
+    key = store_key(info, "137+140", {"audio_only": False})
+    assert key.startswith("youtube/dQw4w9WgXcQ/137+140/")
+    assert key == store_key(info, "137+140", {"audio_only": False})
+    assert key != store_key(info, "137+140", {"audio_only": True})
+
+
+def test_add_and_link_share_one_object(tmp_path):
+    store = ContentStore(str(tmp_path / "store"))
+    first = tmp_path / "playlist1" / "Video.mp4"
+    first.parent.mkdir()
+    first.write_bytes(b"video data")
+    store.add("youtube/a/18/x", str(first))
+
+    linked = store.link("youtube/a/18/x", str(tmp_path / "playlist2"))
+    assert linked == str(tmp_path / "playlist2" / "Video.mp4")
+    entry = store.lookup("youtube/a/18/x")
+    assert os.path.samefile(linked, entry["object"])
+    assert os.path.samefile(str(first), entry["object"])
+    assert entry["links"] == [str(first), linked]
+    assert store.link("youtube/b/18/x", str(tmp_path / "playlist2")) is None
+
+
+def test_same_content_under_another_key_is_stored_once(tmp_path):
+    store = ContentStore(str(tmp_path / "store"))
+    a, b = tmp_path / "a.mp4", tmp_path / "b.mp4"
+    a.write_bytes(b"same")
+    b.write_bytes(b"same")
+    store.add("key/a", str(a))
+    store.add("key/b", str(b))
+    assert os.path.samefile(str(a), str(b))
+
+
+def test_gc_removes_unreferenced_and_corrupt_objects(tmp_path):
+    store = ContentStore(str(tmp_path / "store"))
+    kept, dropped = tmp_path / "kept.mp4", tmp_path / "dropped.mp4"
+    kept.write_bytes(b"kept")
+    dropped.write_bytes(b"dropped!")
+    store.add("key/kept", str(kept))
+    store.add("key/dropped", str(dropped))
+    dropped.unlink()
+    assert store.gc() == {"objects": 1, "removed": 1, "freed": 8, "corrupt": 0}
+    assert store.lookup("key/dropped") is None
+
+    with open(store.lookup("key/kept")["object"], "r+b") as f:  # Also changes kept.mp4
+        f.write(b"KEPT")
+    assert store.gc(verify=True)["corrupt"] == 1
+    assert store.lookup("key/kept") is None
+
+
+def test_disabled_store_does_nothing(tmp_path):
+    store = ContentStore()
+    store.add("key", str(tmp_path / "missing.mp4"))
+    assert store.lookup("key") is None
+    assert store.gc()["objects"] == 0
@@ -0,0 +1,98 @@
+import os
+from http.cookiejar import CookieJar
+
+import pytest
+from cookie_manager import (
+    COOKIES_EXPIRED,
+    COOKIES_EXPIRING,
+    COOKIES_INVALID,
+    COOKIES_MISSING,
+    COOKIES_NO_AUTH,
+    COOKIES_OK,
+    CookieManager,
+    parse_cookie_file,
+    validate_cookies,
+)
+
+NOW = 1_800_000_000
+DAY = 24 * 3600
+
+
+def cookie_line(name, expires, domain=".youtube.com", http_only=False):
+    prefix = "#HttpOnly_" if http_only else ""
+    return f"{prefix}{domain}\tTRUE\t/\tTRUE\t{expires}\t{name}\tvalue-{name}\n"
+
+
+def write_cookies(path, *lines):
+    path.write_text("# Netscape HTTP Cookie File\n\n" + "".join(lines), encoding="utf-8")
+    return str(path)
+
+
+def test_parse_cookie_file_keeps_http_only_and_session_cookies(tmp_path):
+    path = write_cookies(
+        tmp_path / "cookies.txt",
+        cookie_line("SID", NOW + 30 * DAY),
+        cookie_line("__Secure-3PSID", NOW + 30 * DAY, http_only=True),
+        cookie_line("PREF", 0),
+        "not\ta cookie\n",
+    )
+    cookies = {c.name: c for c in parse_cookie_file(path)}
+    assert set(cookies) == {"SID", "__Secure-3PSID", "PREF"}
+    assert cookies["__Secure-3PSID"].has_nonstandard_attr("HttpOnly")
+    assert cookies["__Secure-3PSID"].domain == ".youtube.com"
+    assert cookies["PREF"].expires is None and cookies["PREF"].discard
+    assert cookies["SID"].secure and cookies["SID"].value == "value-SID"
+
+
+def test_parse_cookie_file_rejects_other_files(tmp_path):
+    path = tmp_path / "cookies.txt"
+    path.write_text("<html>not cookies</html>\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        parse_cookie_file(str(path))
+
+
+@pytest.mark.parametrize(
+    "lines, state",
+    [
+        ([cookie_line("SID", NOW + 30 * DAY), cookie_line("HSID", 0)], COOKIES_OK),
+        ([cookie_line("SID", NOW + DAY)], COOKIES_EXPIRING),
+        ([cookie_line("SID", NOW - 1), cookie_line("HSID", NOW + 30 * DAY)], COOKIES_EXPIRED),
+        ([cookie_line("PREF", NOW + 30 * DAY)], COOKIES_NO_AUTH),
+        ([cookie_line("SID", NOW + 30 * DAY, domain=".example.com")], COOKIES_NO_AUTH),
+    ],
+)
+def test_validate_cookies(tmp_path, lines, state):
+    cookies = parse_cookie_file(write_cookies(tmp_path / "cookies.txt", *lines))
+    assert validate_cookies(cookies, now=NOW).state == state
+
+
+def test_manager_reloads_only_changed_files(tmp_path):
+    path = tmp_path / "cookies.txt"
+    manager = CookieManager(str(path))
+    states = []
+    manager.add_listener(lambda status: states.append(status.state))
+    assert manager.refresh().state == COOKIES_MISSING
+
+    write_cookies(path, cookie_line("SID", 2**31 - 1))
+    assert manager.refresh().state == COOKIES_OK
+    generation = manager.generation
+    assert manager.refresh().state == COOKIES_OK
+    assert manager.generation == generation  # Unchanged file, not reloaded
+
+    path.write_text("garbage\n", encoding="utf-8")
+    os.utime(path, ns=(0, 0))  # Also a new signature on coarse-mtime filesystems
+    assert manager.refresh().state == COOKIES_INVALID
+    assert manager.generation == generation + 1
+    assert states == [COOKIES_MISSING, COOKIES_OK, COOKIES_INVALID]
+
+
+def test_install_copies_each_generation_once(tmp_path):
+    path = write_cookies(tmp_path / "cookies.txt", cookie_line("SID", 2**31 - 1))
+    manager = CookieManager(path)
+    jar = CookieJar()
+    generation = manager.install(jar)
+    assert [c.name for c in jar] == ["SID"]
+
+    jar.clear()
+    assert manager.install(jar, generation) == generation
+    assert len(jar) == 0  # Already filled from this generation: left alone
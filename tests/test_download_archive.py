@@ -0,0 +1,43 @@
+import pytest
+from download_archive import DownloadArchive, FolderIndex, archive_id_for_url, normalize_title
+
+
+@pytest.mark.parametrize(
+    "url, archive_id",
+    [
+        ("https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PL1", "youtube dQw4w9WgXcQ"),
+        ("https://m.youtube.com/watch?v=dQw4w9WgXcQ", "youtube dQw4w9WgXcQ"),
+        ("https://youtube.com/shorts/dQw4w9WgXcQ", "youtube dQw4w9WgXcQ"),
+        ("https://youtu.be/dQw4w9WgXcQ?t=10", "youtube dQw4w9WgXcQ"),
+        ("https://www.youtube.com:443/live/dQw4w9WgXcQ", "youtube dQw4w9WgXcQ"),
+        ("https://notyoutube.com/watch?v=dQw4w9WgXcQ", None),
+        ("https://youtube.com.example.org/watch?v=dQw4w9WgXcQ", None),
+        ("https://fakeyoutu.be/dQw4w9WgXcQ", None),
+        ("https://vimeo.com/123456", None),
+        ("https://www.youtube.com/playlist?list=PL1", None),
+    ],
+)
+def test_archive_id_for_url(url, archive_id):
+    assert archive_id_for_url(url) == archive_id
+
+
+def test_archive_reads_yt_dlp_lines(tmp_path):
+    path = tmp_path / "download_archive.txt"
+    path.write_text("youtube dQw4w9WgXcQ\n\nyoutube abcdefghijk\n", encoding="utf-8")
+    archive = DownloadArchive(str(path))
+    assert len(archive) == 2
+    assert "youtube dQw4w9WgXcQ" in archive
+    assert DownloadArchive(str(tmp_path / "missing.txt")).ids == set()
+
+
+def test_normalize_title():
+    assert normalize_title("Hello, World! (Live)") == "helloworldlive"
+
+
+def test_folder_index_matches_ids_and_titles(tmp_path):
+    for name in ("My Video_720p.mp4", "Other [abcdefghijk].mkv", "Partial_360p.mp4.part"):
+        (tmp_path / name).write_bytes(b"")
+    index = FolderIndex(str(tmp_path))
+    assert index.contains(title="my video")
+    assert index.contains(archive_id="youtube abcdefghijk")
+    assert not index.contains(title="Partial")
@@ -0,0 +1,70 @@
+import urllib.error
+import pytest
+from download_errors import (
+    ERROR_AUTH,
+    ERROR_FORBIDDEN,
+    ERROR_NETWORK,
+    ERROR_REMOVED,
+    ERROR_THROTTLED,
+    ERROR_UNKNOWN,
+    backoff_delay,
+    classify_error,
+    retry_sleep,
+)
+from engine import build_info_opts
+
+
+def http_error(code, message="error"):
+    return urllib.error.HTTPError("https://example.com/", code, message, {}, None)
+
+
+@pytest.mark.parametrize(
+    "code, kind",
+    [(401, ERROR_AUTH), (403, ERROR_FORBIDDEN), (404, ERROR_REMOVED), (410, ERROR_REMOVED),
+     (429, ERROR_THROTTLED), (503, ERROR_NETWORK)],
+)
+def test_classify_http_status(code, kind):
+    assert classify_error(http_error(code)) == kind
+
+
+def test_forbidden_about_signing_in_is_auth():
+    try:
+        try:
+            raise http_error(403)
+        except urllib.error.HTTPError as e:
+            raise RuntimeError("Sign in to confirm your age") from e
+    except RuntimeError as e:
+        assert classify_error(e) == ERROR_AUTH
+
+
+def test_classify_messages():
+    assert classify_error("ERROR: HTTP Error 403: Forbidden") == ERROR_FORBIDDEN
+    assert classify_error("Private video. Sign in if you've been granted access") == ERROR_AUTH
+    assert classify_error("something odd happened") == ERROR_UNKNOWN
+
+
+def test_backoff_delay_bounds():
+    for attempt in range(10):
+        delay = backoff_delay(attempt, 2, 60)
+        assert 1 <= delay <= min(60, 2 * 2**attempt)
+
+
+def test_retry_sleep_with_yt_dlp_retry_manager(monkeypatch):
+    """yt-dlp calls retry_sleep_functions entries as sleep_func(n=...)."""
+    utils = pytest.importorskip("yt_dlp.utils")
+    sleeps = []
+    monkeypatch.setattr(utils._utils.time, "sleep", sleeps.append)
+    sleep_func = build_info_opts()["retry_sleep_functions"]["extractor"]
+    assert sleep_func is retry_sleep
+    manager = utils.RetryManager(
+        3,
+        utils.RetryManager.report_retry,
+        sleep_func=sleep_func,
+        info=lambda message: None,
+        warn=lambda message: None,
+        error=lambda message: None,
+    )
+    for retry in manager:
+        retry.error = OSError("connection reset")
+    assert len(sleeps) == 3
+    assert all(0.5 <= delay <= 30 for delay in sleeps)
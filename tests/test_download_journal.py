@@ -0,0 +1,62 @@
+import json
+from download_journal import DownloadJournal
+
+
+def entries(*urls):
+    return [{"index": i, "url": url, "title": url.upper()} for i, url in enumerate(urls)]
+
+
+def test_replay_folds_updates_into_entries(tmp_path):
+    journal = DownloadJournal(str(tmp_path / "journal.jsonl"))
+    run_id = journal.start_run(entries("a", "b"), "best", "/out")
+    journal.record(0, "a", status="running", bytes_done=100)
+    journal.record(0, "a", status="done", filename="/out/a.mp4")
+    journal.add_entries([{"index": 2, "url": "c", "title": "C"}])
+    run = journal.replay()
+    assert (run["run"], run["quality"], run["output"]) == (run_id, "best", "/out")
+    assert [(e["url"], e["status"]) for e in run["entries"]] == [
+        ("a", "done"),
+        ("b", "queued"),
+        ("c", "queued"),
+    ]
+    assert run["entries"][0]["filename"] == "/out/a.mp4"
+    assert run["entries"][0]["bytes"] == 100
+
+
+def test_incomplete_and_close(tmp_path):
+    journal = DownloadJournal(str(tmp_path / "journal.jsonl"))
+    journal.start_run(entries("a", "b"), "best", "/out")
+    journal.record(1, "b", status="done")
+    run, pending = journal.incomplete()
+    assert [e["url"] for e in pending] == ["a"]
+    journal.close_run()
+    assert journal.replay() is None
+    assert journal.incomplete() == (None, [])
+
+
+def test_start_run_replaces_the_previous_run(tmp_path):
+    journal = DownloadJournal(str(tmp_path / "journal.jsonl"))
+    journal.start_run(entries("a"), "best", "/out")
+    journal.start_run(entries("x"), "worst", "/other")
+    run = journal.replay()
+    assert [e["url"] for e in run["entries"]] == ["x"]
+    with open(journal.path, encoding="utf-8") as f:
+        assert sum(1 for line in f if json.loads(line)["event"] == "run") == 1
+
+
+def test_torn_last_line_is_ignored_and_resume_appends(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = DownloadJournal(str(path))
+    journal.start_run(entries("a", "b"), "best", "/out")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"event": "update", "run": "')  # Crash mid-write
+    resumed = DownloadJournal(str(path))
+    run, pending = resumed.incomplete()
+    assert len(pending) == 2
+    resumed.resume_run(run["run"])
+    resumed.record(0, "a", status="done")
+    assert [e["url"] for e in resumed.incomplete()[1]] == ["b"]
+
+
+def test_missing_journal(tmp_path):
+    assert DownloadJournal(str(tmp_path / "none.jsonl")).replay() is None
@@ -0,0 +1,31 @@
+from engine import (
+    DOWNLOAD_PROFILES,
+    build_download_opts,
+    load_download_profiles,
+    profile_options_for,
+)
+
+
+def test_custom_profiles_keep_only_known_options():
+    profiles = load_download_profiles(
+        {"Home NAS": {"concurrent_fragment_downloads": 2, "format": "worst"}}
+    )
+    assert profiles[: len(DOWNLOAD_PROFILES)] == DOWNLOAD_PROFILES
+    assert profiles[-1] == ("Home NAS", {"concurrent_fragment_downloads": 2})
+
+
+def test_profile_options_for():
+    assert profile_options_for(" fast (4 fragments) ")["concurrent_fragment_downloads"] == 4
+    assert profile_options_for("Turbo") is None
+
+
+def test_build_download_opts_applies_the_profile():
+    standard = build_download_opts(
+        "best", "/downloads", profile_opts=profile_options_for("Standard")
+    )
+    assert "concurrent_fragment_downloads" not in standard
+    aria2c = build_download_opts(
+        "best", "/downloads", profile_opts=profile_options_for("aria2c (16 connections)")
+    )
+    assert aria2c["external_downloader"] == {"default": "aria2c"}
+    assert aria2c["format"] == "best" and aria2c["outtmpl"] == standard["outtmpl"]
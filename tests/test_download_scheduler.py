@@ -0,0 +1,95 @@
+import time
+import threading
+
+import pytest
+
+pytest.importorskip("PyQt5")
+import main  # noqa: E402
+from PyQt5.QtCore import QCoreApplication  # noqa: E402
+from engine import STATE_DONE, STATE_FAILED, STATE_SKIPPED, DownloadCancelled  # noqa: E402
+from main import DownloadScheduler  # noqa: E402
+
+
+@pytest.fixture(scope="module", autouse=True)
+def app():
+    yield QCoreApplication.instance() or QCoreApplication([])
+
+
+class FakeDownloads:
+    """Stands in for download_video(); counts concurrent downloads and can hold them."""
+
+    def __init__(self, hold=False):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+        self.hold = hold
+
+    def __call__(self, url, quality_format, output_path, is_cancelled=None, **options):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            deadline = time.monotonic() + (5 if self.hold else 0.05)
+            while time.monotonic() < deadline:
+                if is_cancelled():
+                    raise DownloadCancelled()
+                time.sleep(0.01)
+            if "broken" in url:
+                raise Exception("ERROR: Video unavailable. This video has been removed")
+            return [{"filename": f"{output_path}/{url[-1]}.mp4"}]
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+def make_scheduler(monkeypatch, downloads, max_workers=2):
+    monkeypatch.setattr(main, "download_video", downloads)
+    scheduler = DownloadScheduler(max_workers=max_workers)
+    scheduler.pipeline.shutdown()
+    scheduler.pipeline = None  # No look-ahead extraction
+    finished = []
+    scheduler.finished_signal.connect(lambda: finished.append(True))
+    return scheduler, finished
+
+
+def process_events_until(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        QCoreApplication.processEvents()
+        time.sleep(0.005)
+    return condition()
+
+
+def test_runs_the_queue_with_bounded_workers(monkeypatch):
+    downloads = FakeDownloads()
+    scheduler, finished = make_scheduler(monkeypatch, downloads)
+    errors = []
+    scheduler.error_signal.connect(lambda index, message: errors.append(index))
+    for index, name in enumerate(["a", "broken", "c", "d", "e"]):
+        scheduler.enqueue(index, f"https://youtu.be/{name}", "best", "/downloads")
+    scheduler.start()
+    assert process_events_until(lambda: finished)
+    assert downloads.peak == 2
+    assert [scheduler.states[i] for i in range(5)] == [
+        STATE_DONE,
+        STATE_FAILED,
+        STATE_DONE,
+        STATE_DONE,
+        STATE_DONE,
+    ]
+    assert errors == [1] and finished == [True]
+    assert not scheduler.is_active()
+
+
+def test_cancel_skips_running_and_waiting_entries(monkeypatch):
+    downloads = FakeDownloads(hold=True)
+    scheduler, finished = make_scheduler(monkeypatch, downloads)
+    for index in range(4):
+        scheduler.enqueue(index, f"https://youtu.be/{index}", "best", "/downloads")
+    scheduler.start()
+    assert process_events_until(lambda: downloads.running == 2)
+    scheduler.cancel()  # Returns at once
+    assert scheduler.states[2] == scheduler.states[3] == STATE_SKIPPED
+    assert process_events_until(lambda: finished)
+    assert set(scheduler.states.values()) == {STATE_SKIPPED}
+    assert finished == [True] and not scheduler.workers
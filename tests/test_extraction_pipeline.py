@@ -0,0 +1,74 @@
+import threading
+
+import engine
+import pytest
+from engine import ExtractionPipeline, ResolvedInfo
+
+URL = "https://www.youtube.com/watch?v=abcdefghijk"
+
+
+def cache_miss(url, flat, need_streams=False):
+    return None
+
+
+@pytest.fixture
+def extractions(monkeypatch):
+    """Replaces extraction and the metadata cache; yields the URLs extracted."""
+    extracted = []
+
+    def extract_video_info(url, flat=False, use_cache=True):
+        extracted.append(url)
+        if "fails" in url:
+            raise RuntimeError("extraction failed")
+        return {"id": url[-11:], "formats": [{"format_id": "18"}], "requested_formats": []}
+
+    monkeypatch.setattr(engine, "extract_video_info", extract_video_info)
+    monkeypatch.setattr(engine.metadata_cache, "get", cache_miss)
+    return extracted
+
+
+def test_prefetched_info_is_handed_out_once(extractions):
+    pipeline = ExtractionPipeline(max_workers=1)
+    try:
+        pipeline.prefetch(URL)
+        pipeline.prefetch(URL)
+        pipeline.prefetch("https://www.youtube.com/playlist?list=PL1")
+        info = pipeline.resolved_info(URL)
+        assert info == {"id": "abcdefghijk", "formats": [{"format_id": "18"}]}
+        assert extractions == [URL]
+        assert pipeline.resolved_info(URL) is None  # Not prefetched again, not cached
+    finally:
+        pipeline.shutdown()
+
+
+def test_failed_extraction_resolves_to_none(extractions):
+    pipeline = ExtractionPipeline(max_workers=1)
+    try:
+        pipeline.prefetch(URL + "&fails")
+        assert pipeline.resolved_info(URL + "&fails") is None
+    finally:
+        pipeline.shutdown()
+
+
+def test_waiting_stops_on_cancellation(monkeypatch):
+    release = threading.Event()
+
+    def extract_video_info(url, flat=False, use_cache=True):
+        release.wait(5)
+        return None
+
+    monkeypatch.setattr(engine, "extract_video_info", extract_video_info)
+    monkeypatch.setattr(engine.metadata_cache, "get", cache_miss)
+    pipeline = ExtractionPipeline(max_workers=1)
+    try:
+        pipeline.prefetch(URL)
+        assert pipeline.resolved_info(URL, is_cancelled=lambda: True) is None
+    finally:
+        release.set()
+        pipeline.shutdown()
+
+
+def test_resolved_info_stand_in():
+    info = {"id": "abcdefghijk"}
+    assert ResolvedInfo(URL, info).resolved_info(URL) is info
+    assert ResolvedInfo(URL, info).resolved_info(URL + "x") is None
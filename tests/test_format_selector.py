@@ -0,0 +1,59 @@
+from format_selector import (
+    describe_choice,
+    estimate_bytes,
+    limits_for_quality,
+    select_formats,
+)
+
+MB = 1024 * 1024
+
+
+def fmt(format_id, height=None, vcodec="none", acodec="none", size=None, **extra):
+    return dict(
+        format_id=format_id, height=height, vcodec=vcodec, acodec=acodec, filesize=size, **extra
+    )
+
+
+FORMATS = [
+    fmt("18", 360, "avc1.42001E", "mp4a.40.2", 20 * MB),
+    fmt("136", 720, "avc1.4d401f", size=60 * MB),
+    fmt("247", 720, "vp9", size=40 * MB),
+    fmt("137", 1080, "avc1.640028", size=120 * MB),
+    fmt("140", acodec="mp4a.40.2", size=5 * MB, abr=128),
+    fmt("251", acodec="opus", size=4 * MB, abr=128),
+]
+
+
+def test_limits_for_quality():
+    assert limits_for_quality("best[height<=720]") == (720, False)
+    assert limits_for_quality("bestaudio/best") == (None, True)
+    assert limits_for_quality("bestvideo+bestaudio/best") == (None, False)
+
+
+def test_estimate_bytes_from_bitrate():
+    assert estimate_bytes({"tbr": 800}, duration=10) == 1_000_000
+    assert estimate_bytes({"filesize_approx": 5}) == 5
+    assert estimate_bytes({}) == 0
+
+
+def test_prefers_the_smaller_download_at_the_same_height():
+    choice = select_formats(FORMATS, max_height=720)
+    assert choice.format_spec in ("247+140", "247+251")
+    assert choice.fits
+
+
+def test_budget_lowers_the_resolution():
+    assert select_formats(FORMATS, max_bytes=30 * MB).format_spec == "18"
+
+
+def test_nothing_fits_returns_the_smallest_candidate():
+    choice = select_formats(FORMATS, max_bytes=MB)
+    assert choice.format_spec == "18" and not choice.fits
+    assert describe_choice(choice).endswith("(over budget)")
+
+
+def test_audio_only_and_exact_format():
+    assert select_formats(FORMATS, audio_only=True).video is None
+    assert select_formats(FORMATS, format_id="137").format_spec.startswith("137+")
+    assert select_formats(FORMATS, format_id="999") is None
+    assert describe_choice(None) == "No matching format"
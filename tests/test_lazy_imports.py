@@ -0,0 +1,29 @@
+import os
+import sys
+import subprocess
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def imported_after(module):
+    """Imports module in a fresh interpreter; returns whether yt_dlp and PyQt5 got loaded."""
+    code = (
+        f"import sys, {module}; "
+        "print('yt_dlp' in sys.modules, 'PyQt5' in sys.modules)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=REPO_DIR, capture_output=True, text=True, check=True
+    )
+    return tuple(word == "True" for word in result.stdout.split())
+
+
+@pytest.mark.parametrize("module", ["engine", "cli", "subscriptions", "worker_pool"])
+def test_engine_modules_do_not_import_yt_dlp_or_qt(module):
+    assert imported_after(module) == (False, False)
+
+
+def test_main_does_not_import_yt_dlp():
+    pytest.importorskip("PyQt5")
+    assert imported_after("main")[0] is False
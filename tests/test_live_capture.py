@@ -0,0 +1,140 @@
+import io
+
+import pytest
+from live_capture import (
+    LiveCaptureError,
+    LiveRecorder,
+    describe_live,
+    is_live_info,
+    live_format,
+    parse_master_playlist,
+    parse_media_playlist,
+)
+
+BASE = "https://example.com/live/index.m3u8"
+
+
+def media_playlist(first, count, ended=False, duration=2.0):
+    lines = ["#EXTM3U", "#EXT-X-TARGETDURATION:2", f"#EXT-X-MEDIA-SEQUENCE:{first}"]
+    for sequence in range(first, first + count):
+        lines += [f"#EXTINF:{duration},", f"seg{sequence}.ts"]
+    if ended:
+        lines.append("#EXT-X-ENDLIST")
+    return "\n".join(lines) + "\n"
+
+
+def test_parse_master_playlist_orders_by_bandwidth():
+    text = (
+        "#EXTM3U\n"
+        '#EXT-X-STREAM-INF:BANDWIDTH=800000,CODECS="avc1.4d401f,mp4a.40.2"\n'
+        "low/index.m3u8\n"
+        "#EXT-X-STREAM-INF:BANDWIDTH=2500000,RESOLUTION=1280x720\n"
+        "https://cdn.example.com/high/index.m3u8\n"
+    )
+    assert parse_master_playlist(text, BASE) == [
+        "https://cdn.example.com/high/index.m3u8",
+        "https://example.com/live/low/index.m3u8",
+    ]
+
+
+def test_parse_media_playlist():
+    text = media_playlist(40, 2, ended=True).replace(
+        "#EXT-X-MEDIA-SEQUENCE", '#EXT-X-MAP:URI="init.mp4"\n#EXT-X-MEDIA-SEQUENCE'
+    )
+    playlist = parse_media_playlist(text, BASE)
+    assert playlist.target_duration == 2.0
+    assert playlist.ended
+    assert playlist.init_url == "https://example.com/live/init.mp4"
+    assert [(s.sequence, s.url) for s in playlist.segments] == [
+        (40, "https://example.com/live/seg40.ts"),
+        (41, "https://example.com/live/seg41.ts"),
+    ]
+
+
+def test_parse_media_playlist_rejects_encrypted_and_other_files():
+    encrypted = media_playlist(0, 1).replace(
+        "#EXTINF", '#EXT-X-KEY:METHOD=AES-128,URI="key"\n#EXTINF', 1
+    )
+    with pytest.raises(LiveCaptureError):
+        parse_media_playlist(encrypted, BASE)
+    with pytest.raises(LiveCaptureError):
+        parse_media_playlist("<html></html>", BASE)
+
+
+def test_live_format_respects_the_quality_limit():
+    def fmt(format_id, protocol, height):
+        return {
+            "format_id": format_id,
+            "protocol": protocol,
+            "height": height,
+            "vcodec": "avc1",
+            "acodec": "mp4a",
+        }
+
+    formats = [
+        fmt("dash", "https", 720),
+        fmt("93", "m3u8_native", 360),
+        fmt("95", "m3u8_native", 720),
+        fmt("96", "m3u8_native", 1080),
+    ]
+    assert live_format(formats, "best[height<=720]")["format_id"] == "95"
+    assert live_format(formats, "best[height<=240]")["format_id"] == "93"
+    assert live_format(formats, "bestaudio") is None
+
+
+def test_describe_live():
+    assert describe_live({"live_status": "is_live"}) == "Live now"
+    assert describe_live({"live_status": "is_upcoming"}) == "Scheduled"
+    assert describe_live({"live_status": "was_live"}) is None
+    assert is_live_info({"live_status": "is_upcoming"})
+    assert not is_live_info({"live_status": "not_live"})
+
+
+class FakeRecorder(LiveRecorder):
+    """Serves canned playlists (an exception is raised instead) and segments named by URL."""
+
+    def __init__(self, playlists, output, **kwargs):
+        super().__init__(BASE, output, **kwargs)
+        self.playlists = list(playlists)
+
+    def _fetch_text(self, url):
+        text = self.playlists.pop(0)
+        if isinstance(text, Exception):
+            raise text
+        return text
+
+    def _open(self, url):
+        return io.BytesIO(url.rsplit("/", 1)[1].encode() + b";")
+
+    def _sleep(self, seconds):
+        pass
+
+
+def test_recorder_starts_at_the_live_edge_and_survives_failed_reloads(tmp_path):
+    output = str(tmp_path / "live.ts")
+    updates = []
+    recorder = FakeRecorder(
+        [
+            media_playlist(0, 5),  # Manifest request
+            media_playlist(0, 5),
+            OSError("connection reset"),
+            media_playlist(3, 4, ended=True),
+        ],
+        output,
+        progress_hook=updates.append,
+    )
+    assert recorder.record() == output
+    with open(output, "rb") as f:
+        assert f.read() == b"seg2.ts;seg3.ts;seg4.ts;seg5.ts;seg6.ts;"
+    assert (recorder.segments, recorder.missed) == (5, 0)
+    assert updates[-1]["status"] == "finished"
+
+
+def test_recorder_window_keeps_the_newest_segments(tmp_path):
+    output = str(tmp_path / "live.ts")
+    playlist = media_playlist(0, 5, ended=True, duration=1.0)
+    recorder = FakeRecorder([playlist, playlist], output, window=2)
+    assert recorder.record() == output
+    with open(output, "rb") as f:
+        assert f.read() == b"seg3.ts;seg4.ts;"
+    assert not (tmp_path / "live.ts.segments").exists()
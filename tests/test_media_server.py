@@ -0,0 +1,58 @@
+import os
+import sys
+import json
+import urllib.request
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "benchmarks"))
+
+from live_capture import LiveRecorder, parse_media_playlist  # noqa: E402
+from media_server import MediaServer, synthetic_bytes  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def server():
+    with MediaServer() as server:
+        yield server
+
+
+def fetch(url, headers=None):
+    request = urllib.request.Request(url, headers=headers or {})
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return response.status, response.read()
+
+
+def test_synthetic_bytes_are_position_dependent():
+    assert synthetic_bytes(1000, 24) == synthetic_bytes(0, 1024)[1000:]
+
+
+def test_range_requests(server):
+    status, body = fetch(server.base_url + "/video/a.mp4?size=1000")
+    assert (status, body) == (200, synthetic_bytes(0, 1000))
+    status, body = fetch(server.base_url + "/video/a.mp4?size=1000", {"Range": "bytes=990-"})
+    assert (status, body) == (206, synthetic_bytes(990, 10))
+
+
+def test_video_metadata_and_playlist_pages(server):
+    _, body = fetch(server.base_url + "/api/video/abc.json?size=4096")
+    info = json.loads(body)
+    assert [f["format_id"] for f in info["formats"]] == ["18", "137", "140", "hls-720"]
+    assert info["formats"][0]["url"].startswith(server.base_url + "/video/abc.mp4?size=4096")
+
+    _, body = fetch(server.base_url + "/api/playlist/pl.json?count=5&page_size=2&page=2")
+    page = json.loads(body)
+    assert [e["id"] for e in page["entries"]] == ["pl-4"] and not page["next"]
+    _, body = fetch(server.base_url + "/api/playlist/pl.json?count=5&page_size=2&newest=1")
+    assert [e["id"] for e in json.loads(body)["entries"]] == ["pl-4", "pl-3"]
+
+
+def test_hls_playlist_records_end_to_end(server, tmp_path):
+    url = server.base_url + "/hls/v/index.m3u8?segments=4&size=1000"
+    _, body = fetch(url)
+    playlist = parse_media_playlist(body.decode(), url)
+    assert playlist.ended and len(playlist.segments) == 4
+
+    output = str(tmp_path / "v.ts")
+    assert LiveRecorder(url, output).record() == output
+    assert os.path.getsize(output) == 4000
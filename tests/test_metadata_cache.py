@@ -0,0 +1,89 @@
+import os
+import time
+import metadata_cache
+from metadata_cache import MetadataCache, merge_info, split_info, video_key
+
+URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+def info(video_id="dQw4w9WgXcQ", expire=None):
+    stream = "https://rr1.googlevideo.com/videoplayback?itag=18"
+    if expire is not None:
+        stream += f"&expire={int(expire)}"
+    return {
+        "id": video_id,
+        "title": "Video",
+        "formats": [{"format_id": "18", "url": stream, "height": 360}],
+    }
+
+
+def test_video_key():
+    assert video_key(URL) == "youtube:dQw4w9WgXcQ"
+    assert video_key("https://youtu.be/dQw4w9WgXcQ?t=3") == "youtube:dQw4w9WgXcQ"
+    assert video_key(URL + "&list=PL1", playlist=True) == "youtube:list:PL1"
+    assert video_key("https://example.com/x") == "url:https://example.com/x"
+
+
+def test_split_and_merge_round_trip():
+    durable, streams = split_info(info())
+    assert "url" not in durable["formats"][0]
+    assert merge_info(durable, streams) == info()
+
+
+def test_metadata_outlives_stream_urls(tmp_path, monkeypatch):
+    now = time.time()
+    cache = MetadataCache(str(tmp_path), metadata_ttl=1000, stream_ttl=100)
+    cache.put(URL, False, info())
+    assert cache.get(URL, False, need_streams=True) == info()
+    monkeypatch.setattr(metadata_cache.time, "time", lambda: now + 500)
+    assert cache.get(URL, False, need_streams=True) is None
+    assert cache.get(URL, False)["formats"][0].get("url") is None
+    monkeypatch.setattr(metadata_cache.time, "time", lambda: now + 2000)
+    assert cache.get(URL, False) is None
+
+
+def test_stream_urls_expire_with_the_url(tmp_path, monkeypatch):
+    now = time.time()
+    cache = MetadataCache(str(tmp_path), stream_ttl=10000)
+    cache.put(URL, False, info(expire=now + 60))
+    monkeypatch.setattr(metadata_cache.time, "time", lambda: now + 120)
+    assert cache.get(URL, False, need_streams=True) is None
+
+
+def test_evicts_least_recently_used_down_to_the_low_mark(tmp_path):
+    cache = MetadataCache(str(tmp_path), max_bytes=10**9)
+    urls = [f"https://www.youtube.com/watch?v=video{i:06d}" for i in range(10)]
+    for i, url in enumerate(urls):
+        cache.put(url, False, info(f"video{i:06d}"))
+        meta_path = cache._paths(url, False)[0]
+        os.utime(meta_path, (i, i))  # Older entries were used longer ago
+    entry = cache.total_bytes // len(urls)
+    assert cache.get(urls[0], False) is not None  # Now the most recently used
+    cache.max_bytes = entry * 8
+    cache.put(urls[-1], False, info("video000009"))
+    kept = [url for url in urls if cache.get(url, False) is not None]
+    assert urls[0] in kept and urls[1] not in kept
+    assert cache.total_bytes <= cache.max_bytes * metadata_cache.EVICT_TO
+
+
+def test_running_total_matches_the_directory(tmp_path):
+    cache = MetadataCache(str(tmp_path))
+    for i in range(5):
+        cache.put(f"https://youtu.be/video{i:06d}", False, info(f"video{i:06d}"))
+    cache.put("https://youtu.be/video000000", False, info("video000000"))
+    on_disk = sum(os.path.getsize(tmp_path / name) for name in os.listdir(tmp_path))
+    assert cache.total_bytes == on_disk
+    cache.clear()
+    assert cache.total_bytes == 0 and os.listdir(tmp_path) == []
+
+
+def test_flat_listings_expire_after_the_listing_ttl(tmp_path, monkeypatch):
+    now = time.time()
+    playlist = "https://www.youtube.com/playlist?list=PL1"
+    listing = {"id": "PL1", "_type": "playlist", "entries": [{"id": "a", "url": "a"}]}
+    cache = MetadataCache(str(tmp_path), metadata_ttl=10000, listing_ttl=600)
+    cache.put(playlist, True, listing)
+    cache.put(URL, False, info())
+    monkeypatch.setattr(metadata_cache.time, "time", lambda: now + 900)
+    assert cache.get(playlist, True) is None
+    assert cache.get(URL, False) is not None
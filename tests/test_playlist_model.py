@@ -0,0 +1,59 @@
+import pytest
+
+QtCore = pytest.importorskip("PyQt5.QtCore")
+from playlist_model import PlaylistFilterModel, PlaylistModel  # noqa: E402
+
+Qt = QtCore.Qt
+
+
+@pytest.fixture(scope="module", autouse=True)
+def app():
+    yield QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+def videos(first, count):
+    return [
+        {"title": f"Video {i}", "url": f"https://youtu.be/{i}"}
+        for i in range(first, first + count)
+    ]
+
+
+def test_batches_are_appended_as_one_insertion():
+    model = PlaylistModel()
+    inserted = []
+    model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+    model.append_entries(videos(0, 3))
+    model.append_entries(videos(3, 2))
+    model.append_entries([])
+    assert inserted == [(0, 2), (3, 4)]
+    assert model.rowCount() == len(model) == 5
+    assert model.entries()[4] == {"title": "Video 4", "url": "https://youtu.be/4"}
+
+
+def test_tags_prefix_the_display_text_only():
+    model = PlaylistModel()
+    model.set_entries(videos(0, 2))
+    changed = []
+    model.dataChanged.connect(lambda first, last, roles: changed.append(first.row()))
+    model.set_tag(1, "42%")
+    model.set_tag(7, "done")  # Out of range: ignored
+    index = model.index(1)
+    assert model.data(index) == "[42%] Video 1"
+    assert model.data(index, Qt.ToolTipRole) == "Video 1"
+    assert model.data(index, Qt.UserRole) == "https://youtu.be/1"
+    assert changed == [1]
+    model.set_tag(1, None)
+    assert model.data(index) == "Video 1"
+
+
+def test_filter_maps_rows_back_to_the_playlist():
+    model = PlaylistModel()
+    model.set_entries(videos(0, 12))
+    model.set_tag(11, "done")
+    proxy = PlaylistFilterModel()
+    proxy.setSourceModel(model)
+    proxy.setFilterFixedString("video 1")
+    rows = [proxy.source_row(proxy.index(i, 0)) for i in range(proxy.rowCount())]
+    assert rows == [1, 10, 11]
+    assert not proxy.proxy_index(2).isValid()
+    assert model.title(99) == "" and model.url(-1) == ""
@@ -0,0 +1,72 @@
+import threading
+
+import pytest
+
+pytest.importorskip("PyQt5")
+import main  # noqa: E402
+from PyQt5.QtCore import QCoreApplication, Qt  # noqa: E402
+from main import PlaylistPrefetchThread  # noqa: E402
+
+URLS = [f"https://youtu.be/{i}" for i in range(30)]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def app():
+    yield QCoreApplication.instance() or QCoreApplication([])
+
+
+def drain(thread):
+    """Returns the order run() would resolve the queued entries in."""
+    order = []
+    while True:
+        index = thread._next_index(set())
+        if index is None:
+            return order
+        thread.resolved.add(index)
+        order.append(index)
+
+
+def test_moving_the_selection_drops_the_old_window():
+    thread = PlaylistPrefetchThread(URLS, lookahead=3)
+    thread.prioritize(10)
+    assert drain(thread) == [10, 11, 12, 13]
+
+
+def test_without_lookahead_everything_is_resolved_selection_first():
+    thread = PlaylistPrefetchThread(URLS[:6], lookahead=0)
+    thread.resolved.add(1)
+    thread.prioritize(3)
+    assert drain(thread) == [3, 4, 5, 0, 2]
+
+
+def test_streamed_entries_join_the_current_window_only():
+    thread = PlaylistPrefetchThread(URLS[:2], lookahead=3)
+    thread.add_urls(URLS[2:8])
+    assert drain(thread) == [0, 1, 2, 3]
+
+
+def test_run_resolves_entries_and_reports_failures(monkeypatch):
+    def extract_video_info(url, flat=True, use_cache=True):
+        if url.endswith("/2"):
+            raise RuntimeError("Video unavailable")
+        return {"id": url}
+
+    monkeypatch.setattr(main, "extract_video_info", extract_video_info)
+    ready, failed = [], []
+    done = threading.Event()
+    thread = PlaylistPrefetchThread(URLS[:4], max_workers=2, lookahead=0)
+
+    def on_result(index, error=None):
+        (failed if error else ready).append(index)
+        if len(ready) + len(failed) == 4:
+            done.set()
+
+    thread.entry_ready.connect(on_result, Qt.DirectConnection)
+    thread.entry_failed.connect(on_result, Qt.DirectConnection)
+    thread.start()
+    try:
+        assert done.wait(5)
+    finally:
+        thread.cancel()
+        thread.wait()
+    assert sorted(ready) == [0, 1, 3] and failed == [2]
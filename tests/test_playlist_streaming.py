@@ -0,0 +1,45 @@
+import pytest
+import engine
+from metadata_cache import MetadataCache
+
+PLAYLIST = "https://www.youtube.com/playlist?list=PL1"
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = MetadataCache(str(tmp_path))
+    monkeypatch.setattr(engine, "metadata_cache", cache)
+    return cache
+
+
+def listing(count):
+    entries = [{"id": f"video{i:06d}", "title": f"Video {i}"} for i in range(count)]
+    return {"id": "PL1", "_type": "playlist", "entries": entries}
+
+
+def test_cached_listing_is_served_in_batches(cache, monkeypatch):
+    cache.put(PLAYLIST, True, listing(5))
+
+    def no_network(*args, **kwargs):
+        raise AssertionError("the playlist was listed again")
+
+    monkeypatch.setattr(engine.ydl_pool, "lease", no_network)
+    batches = list(engine.iter_playlist_batches(PLAYLIST, batch_size=2))
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert batches[0][0] == {
+        "title": "Video 0",
+        "url": "https://www.youtube.com/watch?v=video000000",
+    }
+
+
+def test_expand_urls_lists_playlists_afresh(monkeypatch):
+    calls = []
+
+    def batches(url, is_cancelled=None, use_cache=True):
+        calls.append(use_cache)
+        yield [{"title": "A", "url": "a"}]
+
+    monkeypatch.setattr(engine, "iter_playlist_batches", batches)
+    videos = list(engine.expand_urls([PLAYLIST, "https://youtu.be/x"]))
+    assert videos == [{"title": "A", "url": "a"}, {"title": "", "url": "https://youtu.be/x"}]
+    assert calls == [False]
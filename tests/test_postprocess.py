@@ -0,0 +1,81 @@
+import postprocess
+import pytest
+from postprocess import (
+    DEFAULT_POSTPROCESS,
+    PostProcessPool,
+    build_ffmpeg_command,
+    needs_processing,
+    output_stem,
+    postprocess_files,
+    target_extension,
+)
+
+VIDEO = {"filename": "/out/Video_1080p.f137.mp4", "has_video": True, "vcodec": "avc1.640028"}
+AUDIO = {"filename": "/out/Video_1080p.f251.webm", "has_audio": True, "acodec": "opus"}
+
+
+def test_output_stem_drops_the_format_suffix():
+    assert output_stem([AUDIO, VIDEO]) == "/out/Video_1080p"
+
+
+def test_target_extension():
+    assert target_extension([VIDEO, AUDIO], DEFAULT_POSTPROCESS) == "mp4"
+    vp8 = dict(VIDEO, vcodec="vp8")
+    assert target_extension([vp8, AUDIO], DEFAULT_POSTPROCESS) == "mkv"
+    assert target_extension([AUDIO], dict(DEFAULT_POSTPROCESS, audio_format="opus")) == "opus"
+
+
+def test_needs_processing():
+    single = [{"filename": "/out/Video.mp4", "has_video": True, "has_audio": True}]
+    assert not needs_processing(single, "mp4", DEFAULT_POSTPROCESS)
+    assert needs_processing(single, "mkv", DEFAULT_POSTPROCESS)
+    assert needs_processing(single, "mp4", dict(DEFAULT_POSTPROCESS, normalize_audio=True))
+    assert needs_processing([VIDEO, AUDIO], "mp4", DEFAULT_POSTPROCESS)
+
+
+def test_merge_copies_streams_the_container_accepts():
+    cmd = build_ffmpeg_command([VIDEO, AUDIO], "/out/Video.mp4", "mp4", DEFAULT_POSTPROCESS)
+    assert cmd[-1] == "/out/Video.mp4"
+    assert ["-map", "0:v:0", "-map", "1:a:0?", "-c", "copy"] == cmd[-7:-1]
+    webm = build_ffmpeg_command([VIDEO, AUDIO], "/out/Video.webm", "webm", DEFAULT_POSTPROCESS)
+    assert "-c:a" not in webm
+
+
+def test_audio_extraction_reencodes_and_embeds_the_thumbnail():
+    options = dict(DEFAULT_POSTPROCESS, embed_thumbnail=True)
+    cmd = build_ffmpeg_command([AUDIO], "/out/Video.mp3", "mp3", options, "/out/Video.thumb")
+    assert cmd[cmd.index("-c:a") + 1] == "libmp3lame"
+    assert "0:v:0" not in cmd
+    assert cmd[cmd.index("-disposition:v:0") + 1] == "attached_pic"
+
+
+def test_finished_file_is_left_alone(tmp_path):
+    path = tmp_path / "Video_720p.mp4"
+    path.write_bytes(b"")
+    files = [{"filename": str(path), "has_video": True, "has_audio": True, "vcodec": "avc1"}]
+    assert postprocess_files(files) == str(path)
+    with pytest.raises(Exception):
+        postprocess_files([{"filename": str(tmp_path / "missing.mp4")}])
+
+
+def test_pool_reports_results_and_errors(monkeypatch):
+    def fake_postprocess(files, options=None):
+        if not files:
+            raise Exception("No downloaded files to post-process")
+        return "/out/Video.mp4"
+
+    monkeypatch.setattr(postprocess, "postprocess_files", fake_postprocess)
+    results = []
+    pool = PostProcessPool(max_workers=2)
+    try:
+        done = pool.submit([VIDEO], on_done=lambda *result: results.append(result[:2]))
+        failed = pool.submit([], on_done=lambda *result: results.append(result[:2]))
+        assert done.result() == "/out/Video.mp4"
+        with pytest.raises(Exception):
+            failed.result()
+    finally:
+        pool.shutdown()
+    assert sorted(results, key=str) == [
+        ("/out/Video.mp4", None),
+        (None, "No downloaded files to post-process"),
+    ]
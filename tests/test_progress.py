@@ -0,0 +1,29 @@
+import engine
+from engine import ProgressCoalescer
+
+
+def test_coalesces_downloading_updates(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(engine.time, "monotonic", lambda: now[0])
+    records = []
+    coalescer = ProgressCoalescer(3, records.append, rate=2)
+    for step in range(20):  # An update every 0.25 s, twice as often as the rate
+        coalescer({"status": "downloading", "downloaded_bytes": step, "total_bytes": 19})
+        now[0] += 0.25
+    coalescer({"status": "finished", "filename": "video.mp4", "downloaded_bytes": 19})
+    downloading = [r for r in records if r.status == "downloading"]
+    assert [r.downloaded_bytes for r in downloading] == list(range(0, 20, 2))
+    assert records[-1].status == "finished"
+    assert records[-1].filename == "video.mp4"
+    assert all(r.index == 3 for r in records)
+
+
+def test_finished_is_never_dropped(monkeypatch):
+    monkeypatch.setattr(engine.time, "monotonic", lambda: 100.0)
+    records = []
+    coalescer = ProgressCoalescer(0, records.append, rate=1)
+    coalescer({"status": "downloading", "total_bytes_estimate": 50})
+    coalescer({"status": "downloading"})
+    coalescer({"status": "finished"})
+    assert [r.status for r in records] == ["downloading", "finished"]
+    assert records[0].total_bytes == 50
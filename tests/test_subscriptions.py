@@ -0,0 +1,86 @@
+import pytest
+import subscriptions
+from download_errors import ERROR_NETWORK, ERROR_REMOVED
+from engine import STATE_DONE, STATE_FAILED, STATE_SKIPPED
+from subscriptions import SubscriptionList, is_newest_first, is_settled, sync_subscription
+
+CHANNEL = "https://www.youtube.com/@channel/videos"
+
+
+def video(n):
+    return {"id": f"v{n}", "title": f"Video {n}", "url": f"https://youtu.be/v{n}"}
+
+
+@pytest.fixture
+def listing(monkeypatch):
+    """Replaces the playlist listing with entries v9..v0, newest first; yields the ids listed."""
+    listed = []
+
+    def iter_playlist_entries(url, is_cancelled=None):
+        for n in range(9, -1, -1):
+            listed.append(f"v{n}")
+            yield video(n)
+
+    monkeypatch.setattr(subscriptions, "iter_playlist_entries", iter_playlist_entries)
+    return listed
+
+
+def test_is_newest_first():
+    assert is_newest_first(CHANNEL)
+    assert not is_newest_first("https://www.youtube.com/playlist?list=PL1")
+
+
+def test_is_settled():
+    assert is_settled(STATE_DONE)
+    assert is_settled(STATE_SKIPPED, reason="archived")
+    assert not is_settled(STATE_SKIPPED, reason="cancelled")
+    assert is_settled(STATE_FAILED, kind=ERROR_REMOVED)
+    assert not is_settled(STATE_FAILED, kind=ERROR_NETWORK)
+
+
+def test_newest_first_sync_stops_at_known_entries(listing):
+    subscription = {"url": CHANNEL, "newest_first": True, "seen": ["v7", "v6", "v5", "v4"]}
+    result = sync_subscription(subscription)
+    assert [v["id"] for v in result.new] == ["v9", "v8"]
+    assert result.stopped_early and result.error is None
+    assert listing == ["v9", "v8", "v7", "v6", "v5"]  # v4 and older never listed
+
+
+def test_appending_sync_lists_everything_and_keeps_pending(listing):
+    subscription = {
+        "url": CHANNEL,
+        "newest_first": False,
+        "seen": [f"v{n}" for n in range(10)],
+        "pending": {"old": {"title": "Old", "url": "https://youtu.be/old"}},
+    }
+    result = sync_subscription(subscription)
+    assert [v["id"] for v in result.new] == ["old"]
+    assert result.checked == 10 and not result.stopped_early
+
+
+def test_sync_reports_listing_errors(monkeypatch):
+    def iter_playlist_entries(url, is_cancelled=None):
+        yield video(1)
+        raise RuntimeError("HTTP Error 500")
+
+    monkeypatch.setattr(subscriptions, "iter_playlist_entries", iter_playlist_entries)
+    result = sync_subscription({"url": CHANNEL, "newest_first": True})
+    assert [v["id"] for v in result.new] == ["v1"]
+    assert result.error == "HTTP Error 500"
+
+
+def test_subscription_list_persists_pending_and_seen(tmp_path, listing):
+    path = str(tmp_path / "subscriptions.json")
+    subs = SubscriptionList(path)
+    assert subs.add(CHANNEL, "/downloads/channel")["newest_first"]
+
+    [result] = subs.sync()
+    assert len(result.new) == 10
+    subs.mark_seen(CHANNEL, ["v9", "v8"])
+
+    reloaded = SubscriptionList(path).get(CHANNEL)
+    assert reloaded["seen"] == ["v9", "v8"]
+    assert set(reloaded["pending"]) == {f"v{n}" for n in range(8)}
+    assert reloaded["last_new"] == 10
+    assert SubscriptionList(path).remove(CHANNEL)
+    assert SubscriptionList(path).get(CHANNEL) is None
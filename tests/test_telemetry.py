@@ -0,0 +1,84 @@
+import csv
+import json
+import pickle
+import telemetry
+from telemetry import METRIC_FIELDS, JobMetrics, MetricsRecorder, summarize
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def downloading(speed=None):
+    return {"status": "downloading", "speed": speed}
+
+
+def test_throughput_counts_the_last_attempt_only(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(telemetry.time, "monotonic", clock)
+    job = JobMetrics("https://youtu.be/x", 0, 2)
+    job.start_attempt()
+    job.on_progress(downloading(), 1000)
+    clock.now += 1
+    job.on_progress(downloading(), 1000)
+    job.retried()
+    clock.now += 5
+    job.start_attempt()
+    clock.now += 1
+    job.on_progress(downloading(), 500)
+    clock.now += 2
+    job.on_progress(downloading(speed=400), 500)
+    record = job.record("done")
+    assert record["bytes_transferred"] == 3000
+    assert record["transfer_s"] == 2
+    assert record["avg_throughput"] == 500
+    assert record["peak_throughput"] == 400
+    assert record["ttfb_s"] == 1
+    assert record["job_retries"] == 1
+
+
+def test_retries_are_counted_from_yt_dlp_messages():
+    job = JobMetrics("https://youtu.be/x")
+    job.on_log("warning", "Retrying fragment 12 (1/10)...")
+    job.on_log("warning", "HTTP Error 503. Retrying (2/5)...")
+    job.on_log("info", "Downloading webpage")
+    record = job.record("done")
+    assert (record["fragment_retries"], record["request_retries"]) == (1, 1)
+
+
+def test_metrics_survive_pickling_and_update_from():
+    remote = JobMetrics("https://youtu.be/x", 3)
+    remote.start_attempt()
+    remote.on_progress(downloading(), 42)
+    local = JobMetrics("https://youtu.be/x", 7)
+    local.update_from(pickle.loads(pickle.dumps(remote)))
+    assert local.index == 7
+    assert local.bytes_transferred == 42
+
+
+def test_recorder_writes_jsonl_and_csv(tmp_path):
+    record = JobMetrics("https://youtu.be/x", 0).record("done")
+    jsonl = tmp_path / "metrics.jsonl"
+    MetricsRecorder(str(jsonl)).write(record)
+    assert json.loads(jsonl.read_text(encoding="utf-8"))["url"] == "https://youtu.be/x"
+    path = tmp_path / "metrics.csv"
+    recorder = MetricsRecorder(str(path))
+    recorder.write(record)
+    recorder.write(record)
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 2 and list(rows[0]) == METRIC_FIELDS
+    assert len(recorder.records()) == 2
+
+
+def test_summarize():
+    done = dict(JobMetrics("a").record("done"), avg_throughput=100, bytes_transferred=10)
+    failed = dict(JobMetrics("b").record("failed"), bytes_transferred=5)
+    summary = summarize([done, failed])
+    assert (summary["jobs"], summary["done"], summary["failed"]) == (2, 1, 1)
+    assert summary["mean_throughput"] == 100
+    assert summary["bytes_transferred"] == 15
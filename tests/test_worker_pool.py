@@ -0,0 +1,25 @@
+from bandwidth import BandwidthGovernor
+from engine import bandwidth_governor
+from worker_pool import ProcessWorkerPool
+
+
+def test_rate_listeners():
+    governor = BandwidthGovernor()
+    rates = []
+    governor.add_listener(rates.append)
+    governor.set_rate(500)
+    governor.remove_listener(rates.append)
+    governor.set_rate(1000)
+    assert rates == [500]
+
+
+def test_pool_shares_the_rate_until_shut_down():
+    rate = bandwidth_governor.rate
+    pool = ProcessWorkerPool(1, 1)
+    try:
+        bandwidth_governor.set_rate(4096)
+        assert pool.job_rate.value == 4096
+    finally:
+        pool.shutdown()
+        bandwidth_governor.set_rate(rate)
+    assert pool.rate_listener not in bandwidth_governor.listeners
@@ -0,0 +1,40 @@
+import pytest
+from clips import ClipRanges
+from ydl_pool import YoutubeDLPool, split_options
+
+
+def sleep(n):
+    return 0
+
+
+def test_split_options_keeps_callables_out_of_the_key():
+    params, per_lease = split_options(
+        {
+            "format": "best",
+            "retries": 5,
+            "extractor_args": {"youtube": {"player_client": ["web"]}},
+            "retry_sleep_functions": {"http": sleep},
+            "download_ranges": sleep,
+            "progress_hooks": [sleep],
+        }
+    )
+    assert params == {
+        "format": "best",
+        "retries": 5,
+        "extractor_args": {"youtube": {"player_client": ["web"]}},
+    }
+    assert per_lease == {"retry_sleep_functions": {"http": sleep}, "download_ranges": sleep}
+
+
+def test_clip_downloads_reuse_pooled_instances():
+    pytest.importorskip("yt_dlp")
+    pool = YoutubeDLPool()
+    for start in (10, 20, 30):
+        clip = {"ranges": [(start, start + 5)], "chapters": [], "split_chapters": False}
+        opts = {"quiet": True, "download_ranges": ClipRanges(clip)}
+        with pool.lease(opts) as ydl:
+            assert ydl.params["download_ranges"] is opts["download_ranges"]
+    with pool.lease({"quiet": True}) as ydl:
+        assert "download_ranges" not in ydl.params
+    assert (pool.created, pool.reused) == (1, 3)
+    pool.clear()
@@ -0,0 +1,246 @@
+import os
+import time
+import logging
+import itertools
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+import engine
+from bandwidth import BandwidthGovernor
+from engine import (
+    DEFAULT_PROGRESS_RATE,
+    PIPELINE_WORKERS,
+    DownloadCancelled,
+    ExtractionPipeline,
+    ProgressCoalescer,
+    ResolvedInfo,
+    bandwidth_governor,
+    content_store,
+    download_video,
+)
+from telemetry import JobMetrics
+
+DEFAULT_PROCESSES = os.cpu_count() or 1
+BYTES_REPORT_INTERVAL = 0.25  # Seconds between byte counts sent from a worker process
+
+# Set in each worker process by _init_worker()
+_events = None  # Queue of (kind, job, payload) tuples read by the parent
+_cancel = None  # Event set by the parent to stop every running download
+_job_rate = None  # Value holding each running download's share of the rate limit
+
+
+class _ReportingGovernor(BandwidthGovernor):
+    """
+    A worker process's governor: throttles locally to the share of the rate limit
+    the parent publishes in _job_rate, and reports received bytes.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.unreported = 0
+        self.last_report = time.monotonic()
+
+    def consume(self, nbytes, is_cancelled=None):
+        rate = _job_rate.value
+        if rate != self.rate:
+            self.set_rate(rate)
+        self.unreported += max(nbytes, 0)
+        now = time.monotonic()
+        if self.unreported and now - self.last_report >= BYTES_REPORT_INTERVAL:
+            _events.put(("bytes", None, self.unreported))
+            self.unreported = 0
+            self.last_report = now
+        return super().consume(nbytes, is_cancelled)
+
+    def flush(self):
+        if self.unreported:
+            _events.put(("bytes", None, self.unreported))
+            self.unreported = 0
+
+
+def _init_worker(events, cancel, job_rate, log_level):
+    global _events, _cancel, _job_rate
+    _events = events
+    _cancel = cancel
+    _job_rate = job_rate
+    logging.basicConfig(level=log_level)
+    # Per-site slots are held by the parent; the rate follows _job_rate
+    engine.bandwidth_governor = _ReportingGovernor()
+    # A re-exported cookies file is picked up here as in the parent
+    engine.cookie_manager.start_watching()
+
+
+def _run_download(job, url, quality_format, output_path, context, options):
+    """Runs download_video() in a worker process; returns (files, JobMetrics)."""
+    governor = engine.bandwidth_governor
+    engine.cookie_manager.refresh()  # Never start a download with stale cookies
+    content_store.set_root(context["store_root"])
+    metrics = JobMetrics(url, context["index"], context["workers"])
+    progress = ProgressCoalescer(
+        context["index"],
+        lambda record: _events.put(("progress", job, record)),
+        context["progress_rate"],
+    )
+    try:
+        files = download_video(
+            url,
+            quality_format,
+            output_path,
+            progress_hook=progress,
+            is_cancelled=_cancel.is_set,
+            quiet=True,
+            metrics=metrics,
+            **options,
+        )
+    finally:
+        governor.flush()
+    return files, metrics
+
+
+class ProcessWorkerPool:
+    """
+    Runs extractions and downloads in worker processes, so yt-dlp's CPU-bound
+    work (JSON parsing, signature and n-challenge solving) uses every core
+    instead of serialising on the GIL. Extraction and download processes are
+    separate pools, so look-ahead extractions never wait behind long transfers.
+    Progress records and received byte counts come back over one queue, read by
+    a thread of this process that calls the jobs' progress hooks and feeds the
+    shared bandwidth_governor. Per-site download slots are taken in this process;
+    the combined rate limit is split evenly between the running jobs, and their
+    share is updated in a shared value whenever a job starts or ends or the limit
+    changes. Worker processes are spawned on first use.
+    """
+
+    def __init__(self, processes=DEFAULT_PROCESSES, extractors=PIPELINE_WORKERS):
+        # Forking a process with running Qt or worker threads is unsafe
+        context = multiprocessing.get_context("spawn")
+        self.events = context.Queue()
+        self.cancel_event = context.Event()
+        self.job_rate = context.Value("q", bandwidth_governor.rate)
+        initargs = (self.events, self.cancel_event, self.job_rate, logging.getLogger().level)
+        self.processes = max(1, int(processes))
+        self.download_executor = ProcessPoolExecutor(
+            self.processes, context, initializer=_init_worker, initargs=initargs
+        )
+        self.extract_executor = ProcessPoolExecutor(
+            max(1, int(extractors)), context, initializer=_init_worker, initargs=initargs
+        )
+        self.jobs = itertools.count()
+        self.hooks = {}  # Job id -> progress hook of a running download
+        self.lock = threading.Lock()
+        self.reader = threading.Thread(target=self._read_events, name="worker-events")
+        self.reader.daemon = True
+        self.reader.start()
+        self.rate_listener = lambda rate: self._share_rate()
+        bandwidth_governor.add_listener(self.rate_listener)
+
+    def _share_rate(self):
+        """Publishes the rate limit divided between the running downloads."""
+        with self.lock:
+            running = max(1, len(self.hooks))
+            self.job_rate.value = bandwidth_governor.rate // running
+
+    def _read_events(self):
+        while True:
+            try:
+                kind, job, payload = self.events.get()
+            except (EOFError, OSError):
+                return
+            if kind == "stop":
+                return
+            if kind == "bytes":
+                bandwidth_governor.record(payload)
+                continue
+            with self.lock:
+                hook = self.hooks.get(job)
+            if hook is not None:
+                try:
+                    hook(payload)
+                except Exception as e:
+                    logging.error("Progress hook failed: %s", e)
+
+    def pipeline(self):
+        """Returns an ExtractionPipeline running its extractions in worker processes."""
+        return ExtractionPipeline(executor=self.extract_executor)
+
+    def extract(self, url):
+        """Starts a full extraction of url; returns a Future of its info (None on failure)."""
+        return self.extract_executor.submit(ExtractionPipeline._extract, url)
+
+    def reset(self):
+        """Lets downloads run again after cancel()."""
+        self.cancel_event.clear()
+
+    def cancel(self):
+        """Stops every download running in the pool; queued ones start cancelled."""
+        self.cancel_event.set()
+
+    def download(
+        self,
+        url,
+        quality_format,
+        output_path,
+        progress_hook=None,
+        is_cancelled=None,
+        index=0,
+        workers=1,
+        progress_rate=DEFAULT_PROGRESS_RATE,
+        metrics=None,
+        pipeline=None,
+        **options
+    ):
+        """
+        download_video() in a worker process: takes the same options, blocks until
+        it is done and returns its files. progress_hook receives ProgressRecords
+        (tagged with index) on the event reader thread; metrics (a JobMetrics) is
+        filled in with what was measured in the worker. is_cancelled is polled
+        while waiting; once true, cancel() stops the whole pool. With pipeline,
+        the info it resolved is handed to the worker.
+        """
+        if pipeline is not None:
+            info = pipeline.resolved_info(url, is_cancelled)
+            options["pipeline"] = ResolvedInfo(url, info) if info is not None else None
+        host = bandwidth_governor.acquire_host(url, is_cancelled)
+        if host is None:
+            raise DownloadCancelled("Download cancelled by user")
+        job = next(self.jobs)
+        with self.lock:
+            self.hooks[job] = progress_hook
+        self._share_rate()
+        context = {
+            "index": index,
+            "workers": workers,
+            "progress_rate": progress_rate,
+            "store_root": content_store.root,
+        }
+        try:
+            future = self.download_executor.submit(
+                _run_download, job, url, quality_format, output_path, context, options
+            )
+            while True:
+                if is_cancelled is not None and is_cancelled():
+                    self.cancel()
+                try:
+                    files, remote = future.result(timeout=0.25)
+                    break
+                except FutureTimeout:
+                    continue
+        finally:
+            bandwidth_governor.release_host(host)
+            with self.lock:
+                self.hooks.pop(job, None)
+            self._share_rate()
+        if metrics is not None:
+            metrics.update_from(remote)
+        return files
+
+    def shutdown(self):
+        bandwidth_governor.remove_listener(self.rate_listener)
+        self.cancel()
+        self.download_executor.shutdown(wait=True, cancel_futures=True)
+        self.extract_executor.shutdown(wait=True, cancel_futures=True)
+        try:
+            self.events.put(("stop", None, None))
+        except (OSError, ValueError):
+            pass
@@ -0,0 +1,163 @@
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from collections import OrderedDict
+
+DEFAULT_MAX_IDLE = 8
+# Types of option values that make up the pool key, also inside lists and dicts
+KEY_TYPES = (str, int, float, bool, type(None))
+
+
+def _is_plain(value):
+    if isinstance(value, KEY_TYPES):
+        return True
+    if isinstance(value, (list, tuple)):
+        return all(_is_plain(item) for item in value)
+    if isinstance(value, dict):
+        return all(isinstance(key, str) and _is_plain(item) for key, item in value.items())
+    return False
+
+
+def split_options(ydl_opts):
+    """
+    Splits a yt-dlp option dict into its plain values, which make up the pool key,
+    and the other options (callables such as download_ranges or the retry sleep
+    functions), which are set on the leased instance for each lease instead.
+    Progress hooks are left out of both: they are swapped on each lease.
+    """
+    plain = {}
+    per_lease = {}
+    for key, value in ydl_opts.items():
+        if key != "progress_hooks":
+            (plain if _is_plain(value) else per_lease)[key] = value
+    return plain, per_lease
+
+
+class PooledInstance:
+    """
+    A long-lived YoutubeDL whose single progress hook and logger forward to the
+    current lease. Log messages go to the lease's log_listener(level, message)
+    (e.g. to count retries) and to the logging module.
+    """
+
+    def __init__(self, yt_dlp, params):
+        self.hook = None
+        self.log_listener = None
+        self.cookie_generation = None  # CookieManager generation in the cookie jar
+        self.ydl = yt_dlp.YoutubeDL(dict(params, logger=self))
+        self.ydl.add_progress_hook(self.dispatch)
+
+    def dispatch(self, d):
+        if self.hook is not None:
+            self.hook(d)
+
+    def _log(self, level, message):
+        if self.log_listener is not None:
+            self.log_listener(level, message)
+
+    def debug(self, message):
+        self._log("debug", message)
+        # yt-dlp sends screen output here too; progress lines would flood the log
+        if not message.startswith("[download]"):
+            logging.debug(message)
+
+    def info(self, message):
+        self._log("info", message)
+        logging.info(message)
+
+    def warning(self, message):
+        self._log("warning", message)
+        logging.warning(message)
+
+    def error(self, message):
+        self._log("error", message)
+        logging.error(message)
+
+    def close(self):
+        try:
+            self.ydl.close()
+        except Exception as e:
+            logging.debug(f"Error closing YoutubeDL instance: {e}")
+
+
+class YoutubeDLPool:
+    """
+    Thread-safe pool of YoutubeDL instances keyed by option set. Reusing an instance
+    keeps its initialized extractors, parsed cookie jar and keep-alive HTTP
+    connections, instead of rebuilding them for every video and every metadata fetch.
+    Each instance is leased to one thread at a time; at most max_idle instances are
+    kept between leases, the least recently used being closed first. With cookies
+    (a CookieManager), every lease gets the manager's current cookies.
+    """
+
+    def __init__(self, max_idle=DEFAULT_MAX_IDLE, cookies=None):
+        self.max_idle = max_idle
+        self.cookies = cookies
+        self.lock = threading.Lock()
+        self.idle = OrderedDict()  # (key, id) -> PooledInstance, oldest first
+        self.created = 0
+        self.reused = 0
+
+    def _acquire(self, key, params):
+        with self.lock:
+            for slot in reversed(self.idle):
+                if slot[0] == key:
+                    self.reused += 1
+                    return self.idle.pop(slot)
+            self.created += 1
+        import yt_dlp
+
+        return PooledInstance(yt_dlp, params)
+
+    def _release(self, key, instance):
+        evicted = []
+        with self.lock:
+            self.idle[(key, id(instance))] = instance
+            while len(self.idle) > self.max_idle:
+                evicted.append(self.idle.popitem(last=False)[1])
+        for old in evicted:
+            old.close()
+
+    @contextmanager
+    def lease(self, ydl_opts, progress_hook=None, log_listener=None):
+        """
+        Yields a YoutubeDL configured with ydl_opts for exclusive use. progress_hook
+        and log_listener (if any) receive this lease's progress updates and log
+        messages only. An instance whose lease ends with an exception is closed
+        rather than returned to the pool; download options keep ignoreerrors off,
+        so a failed download always raises and leaves no error state behind.
+        """
+        params, per_lease = split_options(ydl_opts)
+        key = json.dumps(params, sort_keys=True)
+        instance = self._acquire(key, params)
+        instance.ydl.params.update(per_lease)
+        instance.hook = progress_hook
+        instance.log_listener = log_listener
+        if self.cookies is not None:
+            # Only copied again when the cookies file changed since the last lease
+            instance.cookie_generation = self.cookies.install(
+                instance.ydl.cookiejar, instance.cookie_generation
+            )
+        try:
+            yield instance.ydl
+        except BaseException:
+            instance.hook = instance.log_listener = None
+            instance.close()
+            raise
+        instance.hook = instance.log_listener = None
+        for name in per_lease:
+            instance.ydl.params.pop(name, None)
+        self._release(key, instance)
+
+    def clear(self):
+        """Closes all idle instances."""
+        with self.lock:
+            instances = list(self.idle.values())
+            self.idle.clear()
+        for instance in instances:
+            instance.close()
+
+    def stats(self):
+        with self.lock:
+            return {"created": self.created, "reused": self.reused, "idle": len(self.idle)}